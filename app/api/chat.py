@@ -1,30 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, delete, func, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
+import base64
 import uuid
 from datetime import datetime
 
-from app.db.session import get_db
-from app.models.chat import ChatSession, ChatMessage
+from app.db.session import get_async_db
+from app.models.chat import ChatSession, ChatMessage, ArchivedChatMessage
 from app.schemas.chat import ChatRequest, ChatResponse, ChatSessionResponse
 from app.utils.ticker_parser import TickerParser
 from app.services.market_data import MarketDataService
 from app.services.news_service import NewsService
-from app.services.sentiment import SentimentService
+from app.services.sentiment_aggregate import SentimentAggregator
 from app.services.ai_engine import AIEngine
+from app.services.admission import admission_controller
+from app.services.conversation_store import store_conversation
+from app.services.response_cache import CachedResponse, ResponseCache
+from app.services.export import ExportService
 from app.core.logger import logger
+from app.core.responses import TrustedJSONResponse
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
+# Columns of ChatMessageResponse, read as plain rows instead of ORM objects
+MESSAGE_FIELDS = ("id", "user_query", "ai_response", "ticker_symbol", "sentiment_result", "created_at")
+MESSAGE_COLUMNS = [getattr(ChatMessage, field) for field in MESSAGE_FIELDS]
+
 # Initialize AI Engine
 ai_engine = AIEngine()
 
 
 @router.post("/", response_model=ChatResponse)
-async def chat(request: ChatRequest, db: Session = Depends(get_db)):
+async def chat(request: ChatRequest, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_db)):
     """
     Process a chat message and return AI-powered investment analysis.
     """
+    # Shed before doing any work when the pipeline is saturated (503 + Retry-After)
+    admission_controller.enter("normal")
     try:
         # Generate or use existing session ID
         session_id = request.session_id or str(uuid.uuid4())
@@ -38,45 +53,69 @@ async def chat(request: ChatRequest, db: Session = Depends(get_db)):
         sentiment_result = None
         ai_summary = ""
         
-        # Fetch stock data if ticker detected
-        if detected_ticker:
-            stock_data = MarketDataService.get_stock_data(detected_ticker)
-            
-            # Fetch news if we have valid stock data
-            if stock_data:
-                relevant_news = NewsService.get_stock_news(detected_ticker, limit=3)
+        # Repeated questions about the same ticker reuse the generated analysis
+        cached = ResponseCache.get(request.query, detected_ticker)
+        if cached:
+            ai_summary = cached.ai_summary
+            stock_data = cached.stock_data
+            sentiment_result = cached.sentiment_result
+            relevant_news = cached.relevant_news
+        else:
+            # Fetch stock data if ticker detected; blocking upstream calls run in the
+            # threadpool, where concurrent lookups for the same symbol are coalesced
+            if detected_ticker:
+                stock_data = await run_in_threadpool(MarketDataService.get_stock_data, detected_ticker)
                 
-                # Perform sentiment analysis on news
-                if relevant_news:
-                    news_texts = [f"{news.title} {news.description or ''}" for news in relevant_news]
-                    sentiment_analysis = SentimentService.analyze_news_sentiment(news_texts)
-                    sentiment_result = {
-                        "sentiment": sentiment_analysis["overall_sentiment"],
-                        "confidence": abs(sentiment_analysis["average_polarity"]),
-                        "polarity": sentiment_analysis["average_polarity"]
-                    }
-        
-        # Generate AI summary
-        ai_summary = ai_engine.generate_investment_summary(
-            query=request.query,
-            ticker=detected_ticker,
-            stock_data=stock_data,
-            news_items=relevant_news,
-            sentiment_result=sentiment_result
-        )
+                # Fetch news if we have valid stock data
+                if stock_data:
+                    relevant_news = await run_in_threadpool(NewsService.get_stock_news, detected_ticker, limit=3)
+                    
+                    # Read the rolling per-ticker sentiment instead of rescoring news; it is
+                    # served from memory, and stale entries are reloaded off the event loop
+                    if SentimentAggregator.needs_reload(detected_ticker):
+                        await run_in_threadpool(SentimentAggregator.reload, detected_ticker)
+                    rolling_sentiment = SentimentAggregator.get(detected_ticker)
+                    if relevant_news:
+                        if rolling_sentiment is None:
+                            # Cold ticker: seed the aggregate once on the request path
+                            await run_in_threadpool(SentimentAggregator.ingest, detected_ticker, relevant_news)
+                            rolling_sentiment = SentimentAggregator.get(detected_ticker)
+                        else:
+                            # Fold any new articles in after the response is sent
+                            background_tasks.add_task(SentimentAggregator.ingest, detected_ticker, relevant_news)
+                    
+                    sentiment_result = rolling_sentiment
+            
+            # Generate AI summary off the event loop; degraded to the template summary under load
+            ai_summary = await admission_controller.generate(
+                "normal",
+                ai_engine.generate_investment_summary,
+                request.query,
+                detected_ticker,
+                stock_data,
+                relevant_news,
+                sentiment_result
+            )
+            
+            ResponseCache.put(
+                request.query,
+                detected_ticker,
+                CachedResponse(ai_summary, stock_data, sentiment_result, relevant_news)
+            )
         
         # Store conversation in database
-        _store_conversation(
+        await store_conversation(
             db=db,
             session_id=session_id,
             user_query=request.query,
             ai_response=ai_summary,
             ticker_symbol=detected_ticker,
-            sentiment_result=sentiment_result["sentiment"] if sentiment_result else None
+            sentiment_result=sentiment_result.sentiment if sentiment_result else None,
+            stock_data=stock_data
         )
         
-        # Create response
-        response = ChatResponse(
+        # Create response; every field is already validated, so skip re-validation
+        response = ChatResponse.model_construct(
             query=request.query,
             detected_ticker=detected_ticker,
             stock_data=stock_data,
@@ -87,132 +126,200 @@ async def chat(request: ChatRequest, db: Session = Depends(get_db)):
             session_id=session_id
         )
         
-        logger.info(f"Processed chat request for session {session_id}, ticker: {detected_ticker}")
-        return response
-        
+        logger.info("Processed chat request for session %s, ticker: %s", session_id, detected_ticker)
+        return TrustedJSONResponse(response)
+    
     except Exception as e:
-        logger.error(f"Error processing chat request: {str(e)}")
+        logger.error("Error processing chat request: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
+    finally:
+        admission_controller.leave()
 
 
 @router.get("/sessions/{session_id}", response_model=ChatSessionResponse)
-async def get_session_history(session_id: str, db: Session = Depends(get_db)):
+async def get_session_history(session_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Retrieve chat history for a specific session.
     """
     try:
         # Get session
-        session = db.query(ChatSession).filter(ChatSession.session_id == session_id).first()
+        result = await db.execute(select(ChatSession).where(ChatSession.session_id == session_id))
+        session = result.scalars().first()
         
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        # Get messages for the session
-        messages = db.query(ChatMessage).filter(
-            ChatMessage.session_id == session_id
-        ).order_by(ChatMessage.created_at).all()
-        
-        return ChatSessionResponse(
-            session_id=session.session_id,
-            created_at=session.created_at,
-            updated_at=session.updated_at,
-            messages=messages
+        # Get messages for the session as plain rows; ORM objects and model
+        # validation cost more than the query for long histories
+        result = await db.execute(
+            select(*MESSAGE_COLUMNS).where(
+                ChatMessage.session_id == session_id
+            ).order_by(ChatMessage.created_at)
         )
         
+        return TrustedJSONResponse({
+            "session_id": session.session_id,
+            "created_at": session.created_at,
+            "updated_at": session.updated_at,
+            "message_count": None,
+            "messages": [dict(zip(MESSAGE_FIELDS, row)) for row in result],
+        })
+    
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error retrieving session history: {str(e)}")
+        logger.error("Error retrieving session history: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
 @router.get("/sessions/", response_model=List[ChatSessionResponse])
-async def get_all_sessions(db: Session = Depends(get_db)):
+async def get_all_sessions(
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of sessions to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    summary: bool = Query(False, description="Return message counts without message bodies"),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
-    Retrieve all chat sessions.
+    Retrieve chat sessions, most recently updated first.
+    
+    Results are paginated with a keyset cursor on (updated_at, id); when more
+    sessions exist the next cursor is returned in the X-Next-Cursor header.
     """
     try:
-        sessions = db.query(ChatSession).order_by(ChatSession.updated_at.desc()).all()
+        stmt = select(ChatSession).order_by(ChatSession.updated_at.desc(), ChatSession.id.desc())
         
-        result = []
-        for session in sessions:
-            messages = db.query(ChatMessage).filter(
-                ChatMessage.session_id == session.session_id
-            ).order_by(ChatMessage.created_at).all()
-            
-            result.append(ChatSessionResponse(
-                session_id=session.session_id,
-                created_at=session.created_at,
-                updated_at=session.updated_at,
-                messages=messages
+        if cursor:
+            try:
+                updated_at, last_id = _decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            stmt = stmt.where(or_(
+                ChatSession.updated_at < updated_at,
+                and_(ChatSession.updated_at == updated_at, ChatSession.id < last_id)
             ))
         
-        return result
+        # Fetch one extra row to know whether another page exists
+        stmt = stmt.limit(limit + 1)
         
+        if summary:
+            # Message counts in the same round trip, without loading bodies; the
+            # correlated subquery only counts messages of the sessions on the page
+            message_count = (
+                select(func.count(ChatMessage.id))
+                .where(ChatMessage.session_id == ChatSession.session_id)
+                .scalar_subquery()
+            )
+            stmt = stmt.add_columns(message_count)
+            rows = (await db.execute(stmt)).all()
+            page = [(session, count) for session, count in rows]
+        else:
+            sessions = (await db.execute(stmt)).scalars().all()
+            page = [(session, None) for session in sessions]
+        
+        headers = {}
+        if len(page) > limit:
+            page = page[:limit]
+            last_session = page[-1][0]
+            headers["X-Next-Cursor"] = _encode_cursor(last_session.updated_at, last_session.id)
+        
+        messages = {session.session_id: [] for session, _ in page}
+        if not summary and messages:
+            # All messages for the page in a single extra query, as plain rows
+            result = await db.execute(
+                select(ChatMessage.session_id, *MESSAGE_COLUMNS)
+                .where(ChatMessage.session_id.in_(list(messages)))
+                .order_by(ChatMessage.session_id, ChatMessage.created_at)
+            )
+            for row in result:
+                messages[row[0]].append(dict(zip(MESSAGE_FIELDS, row[1:])))
+        
+        return TrustedJSONResponse(
+            [
+                {
+                    "session_id": session.session_id,
+                    "created_at": session.created_at,
+                    "updated_at": session.updated_at,
+                    "message_count": count if summary else len(messages[session.session_id]),
+                    "messages": messages[session.session_id],
+                }
+                for session, count in page
+            ],
+            headers=headers
+        )
+    
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error retrieving all sessions: {str(e)}")
+        logger.error("Error retrieving all sessions: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+def _encode_cursor(updated_at: datetime, session_pk: int) -> str:
+    """Encode a keyset position as an opaque URL-safe cursor."""
+    raw = f"{updated_at.isoformat()}|{session_pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by _encode_cursor."""
+    try:
+        updated_at, session_pk = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(updated_at), int(session_pk)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+@router.get("/export")
+async def export_history(
+    start: Optional[datetime] = Query(None, description="Only messages created at or after this time (UTC)"),
+    end: Optional[datetime] = Query(None, description="Only messages created before this time (UTC)"),
+    ticker: Optional[str] = Query(None, max_length=10, description="Only messages about this ticker"),
+    session_id: Optional[str] = Query(None, description="Only messages from this session"),
+    include_archived: bool = Query(True, description="Include messages moved to the archive by the retention job")
+):
+    """
+    Stream sessions and messages as newline-delimited JSON.
+    
+    Each session line is followed by its messages. Rows are streamed as they
+    are read from the database, so exports of any size use constant memory.
+    Messages archived by the retention job are included unless
+    include_archived is false, and are marked "archived": true.
+    """
+    if start and end and start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    
+    return StreamingResponse(
+        ExportService.stream_ndjson(
+            start=start, end=end, ticker=ticker, session_id=session_id, include_archived=include_archived
+        ),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=chat_history.ndjson"}
+    )
+
+
 @router.delete("/sessions/{session_id}")
-async def delete_session(session_id: str, db: Session = Depends(get_db)):
+async def delete_session(session_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Delete a chat session and all its messages.
     """
     try:
-        session = db.query(ChatSession).filter(ChatSession.session_id == session_id).first()
+        result = await db.execute(select(ChatSession).where(ChatSession.session_id == session_id))
+        session = result.scalars().first()
         
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        # Delete session (cascade will delete messages)
-        db.delete(session)
-        db.commit()
+        # Delete messages then session in bulk (ORM cascade would lazy-load the collection)
+        await db.execute(delete(ChatMessage).where(ChatMessage.session_id == session_id))
+        await db.execute(delete(ArchivedChatMessage).where(ArchivedChatMessage.session_id == session_id))
+        await db.execute(delete(ChatSession).where(ChatSession.session_id == session_id))
+        await db.commit()
         
-        logger.info(f"Deleted session {session_id}")
+        logger.info("Deleted session %s", session_id)
         return {"message": "Session deleted successfully"}
-        
+    
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error deleting session: {str(e)}")
+        logger.error("Error deleting session: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
-
-
-def _store_conversation(
-    db: Session,
-    session_id: str,
-    user_query: str,
-    ai_response: str,
-    ticker_symbol: str = None,
-    sentiment_result: str = None
-):
-    """Store conversation in database."""
-    try:
-        # Get or create session
-        session = db.query(ChatSession).filter(ChatSession.session_id == session_id).first()
-        if not session:
-            session = ChatSession(session_id=session_id)
-            db.add(session)
-            db.flush()  # Get the ID without committing
-        
-        # Create message
-        message = ChatMessage(
-            session_id=session_id,
-            user_query=user_query,
-            ai_response=ai_response,
-            ticker_symbol=ticker_symbol,
-            sentiment_result=sentiment_result
-        )
-        
-        db.add(message)
-        
-        # Update session timestamp
-        session.updated_at = datetime.utcnow()
-        
-        db.commit()
-        
-    except Exception as e:
-        logger.error(f"Error storing conversation: {str(e)}")
-        db.rollback()
-        raise
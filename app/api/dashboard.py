@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_async_db
+from app.schemas.dashboard import DashboardSummary
+from app.services.dashboard import DashboardService
+from app.core.logger import logger
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+
+@router.get("/summary", response_model=DashboardSummary)
+async def get_summary(
+    days: int = Query(7, ge=1, le=365),
+    limit: int = Query(5, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Return query counts, sentiment distribution and top tickers for recent days.
+    
+    Served from the per-ticker daily rollup, so the cost depends on the window
+    size rather than on the amount of chat history.
+    """
+    try:
+        return await DashboardService.get_summary(db, days=days, limit=limit)
+        
+    except Exception as e:
+        logger.error("Error building dashboard summary: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
@@ -1,97 +1,55 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Query, Response
 from datetime import datetime
-import requests
 
-from app.db.session import get_db
 from app.core.config import settings
-from app.core.logger import logger
 from app.schemas.chat import HealthResponse
+from app.services.health import health_monitor
 
 router = APIRouter(prefix="/health", tags=["health"])
 
 
 @router.get("/", response_model=HealthResponse)
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(details: bool = Query(False, description="Include latency and errors for each probe")):
     """
-    Comprehensive health check for all services.
+    Health of all dependencies, from the most recent background probe round.
     """
-    services = {}
-    overall_status = "healthy"
-    
-    # Check database connection
-    try:
-        db.execute("SELECT 1")
-        services["database"] = "healthy"
-    except Exception as e:
-        logger.error(f"Database health check failed: {str(e)}")
-        services["database"] = "unhealthy"
-        overall_status = "unhealthy"
-    
-    # Check NewsAPI (if configured)
-    if settings.newsapi_key:
-        try:
-            response = requests.get(
-                "https://newsapi.org/v2/top-headlines",
-                params={"country": "us", "pageSize": 1, "apiKey": settings.newsapi_key},
-                timeout=5
-            )
-            if response.status_code == 200:
-                services["newsapi"] = "healthy"
-            else:
-                services["newsapi"] = "unhealthy"
-                overall_status = "unhealthy"
-        except Exception as e:
-            logger.error(f"NewsAPI health check failed: {str(e)}")
-            services["newsapi"] = "unhealthy"
-            overall_status = "unhealthy"
-    else:
-        services["newsapi"] = "not_configured"
-    
-    # Check yfinance (basic test)
-    try:
-        import yfinance as yf
-        stock = yf.Ticker("AAPL")
-        info = stock.info
-        if info:
-            services["yfinance"] = "healthy"
-        else:
-            services["yfinance"] = "unhealthy"
-            overall_status = "unhealthy"
-    except Exception as e:
-        logger.error(f"YFinance health check failed: {str(e)}")
-        services["yfinance"] = "unhealthy"
-        overall_status = "unhealthy"
-    
-    # Check TextBlob
-    try:
-        from textblob import TextBlob
-        blob = TextBlob("Test sentiment analysis")
-        sentiment = blob.sentiment
-        services["textblob"] = "healthy"
-    except Exception as e:
-        logger.error(f"TextBlob health check failed: {str(e)}")
-        services["textblob"] = "unhealthy"
-        overall_status = "unhealthy"
-    
-    # Check Hugging Face Transformers
-    try:
-        from transformers import pipeline
-        # Just check if we can import and create a pipeline (without loading models)
-        services["transformers"] = "healthy"
-    except Exception as e:
-        logger.error(f"Transformers health check failed: {str(e)}")
-        services["transformers"] = "unhealthy"
-        overall_status = "unhealthy"
+    status, services = health_monitor.snapshot()
+    if details:
+        services = health_monitor.details()
     
     return HealthResponse(
-        status=overall_status,
+        status=status,
         timestamp=datetime.utcnow(),
         version=settings.app_version,
-        services=services
+        services=services,
+        checked_at=health_monitor.last_run
     )
 
 
+@router.get("/live")
+async def liveness_check():
+    """
+    Liveness probe: the process is up and its event loop is responsive.
+    """
+    return {"status": "alive", "timestamp": datetime.utcnow()}
+
+
+@router.get("/ready")
+async def readiness_check(response: Response):
+    """
+    Readiness probe: 503 until the database is reachable and models and caches are warm.
+    """
+    ready, checks = health_monitor.readiness()
+    if not ready:
+        response.status_code = 503
+    
+    return {
+        "status": "ready" if ready else "not_ready",
+        "timestamp": datetime.utcnow(),
+        "checks": checks
+    }
+
+
 @router.get("/simple")
 async def simple_health_check():
     """
@@ -0,0 +1,121 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Tuple
+import asyncio
+import uuid
+from datetime import datetime
+
+from app.db.session import get_async_db
+from app.schemas.chat import NewsItem
+from app.schemas.portfolio import PortfolioRequest, PortfolioResponse, TickerAnalysis
+from app.utils.ticker_parser import TickerParser
+from app.services.market_data import MarketDataService
+from app.services.news_service import NewsService
+from app.services.sentiment_aggregate import SentimentAggregator
+from app.services.ai_engine import AIEngine
+from app.services.admission import admission_controller
+from app.services.conversation_store import store_conversation
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.responses import TrustedJSONResponse
+
+router = APIRouter(prefix="/portfolio", tags=["portfolio"])
+
+# Initialize AI Engine
+ai_engine = AIEngine()
+
+
+@router.post("/compare", response_model=PortfolioResponse)
+async def compare(request: PortfolioRequest, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_db)):
+    """
+    Analyse every ticker mentioned in the query and return one combined summary.
+    
+    Quotes, news and sentiment for all symbols are fetched concurrently, so the
+    latency is close to that of the slowest single symbol.
+    """
+    # Shed before fanning out when the pipeline is saturated (503 + Retry-After)
+    admission_controller.enter("normal")
+    try:
+        # Generate or use existing session ID
+        session_id = request.session_id or str(uuid.uuid4())
+        
+        # Extract every ticker from the query
+        tickers = TickerParser.extract_multiple_tickers(request.query)[:settings.portfolio_max_tickers]
+        
+        # Fan out one worker per symbol
+        results = await asyncio.gather(
+            *(run_in_threadpool(_analyze_symbol, ticker) for ticker in tickers)
+        )
+        
+        analyses = []
+        for analysis, fresh_news in results:
+            analyses.append(analysis)
+            if fresh_news:
+                # Fold new articles into the rolling sentiment after the response is sent
+                background_tasks.add_task(SentimentAggregator.ingest, analysis.symbol, fresh_news)
+        
+        # Generate one combined AI summary
+        ai_summary = await admission_controller.generate(
+            "normal", ai_engine.generate_portfolio_summary, request.query, analyses
+        )
+        
+        # Store conversation in database under the first symbol with a quote, so the
+        # dashboard rollup counts portfolio turns as it does chat and query turns
+        primary = next((analysis for analysis in analyses if analysis.stock_data), analyses[0] if analyses else None)
+        await store_conversation(
+            db=db,
+            session_id=session_id,
+            user_query=request.query,
+            ai_response=ai_summary,
+            ticker_symbol=primary.symbol if primary else None,
+            sentiment_result=primary.sentiment_result.sentiment if primary and primary.sentiment_result else None,
+            stock_data=primary.stock_data if primary else None
+        )
+        
+        logger.info("Processed portfolio request for session %s, tickers: %s", session_id, tickers)
+        return TrustedJSONResponse(PortfolioResponse.model_construct(
+            query=request.query,
+            detected_tickers=tickers,
+            analyses=analyses,
+            ai_summary=ai_summary,
+            timestamp=datetime.utcnow(),
+            session_id=session_id
+        ))
+    
+    except Exception as e:
+        logger.error("Error processing portfolio request: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+    finally:
+        admission_controller.leave()
+
+
+def _analyze_symbol(ticker: str) -> Tuple[TickerAnalysis, List[NewsItem]]:
+    """
+    Fetch quote, news and sentiment for one symbol.
+    
+    Returns:
+        The analysis and the news items still to be ingested in the background
+    """
+    analysis = TickerAnalysis(symbol=ticker)
+    pending_news = []
+    
+    analysis.stock_data = MarketDataService.get_stock_data(ticker)
+    if not analysis.stock_data:
+        return analysis, pending_news
+    
+    analysis.relevant_news = NewsService.get_stock_news(ticker, limit=3)
+    
+    if SentimentAggregator.needs_reload(ticker):
+        SentimentAggregator.reload(ticker)
+    sentiment = SentimentAggregator.get(ticker)
+    if analysis.relevant_news:
+        if sentiment is None:
+            # Cold ticker: seed the aggregate once on the request path
+            SentimentAggregator.ingest(ticker, analysis.relevant_news)
+            sentiment = SentimentAggregator.get(ticker)
+        else:
+            pending_news = analysis.relevant_news
+    
+    analysis.sentiment_result = sentiment
+    return analysis, pending_news
@@ -1,18 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 import uuid
 from datetime import datetime
 
-from app.db.session import get_db
-from app.models.chat import ChatSession, ChatMessage
+from app.db.session import get_async_db
 from app.schemas.query import QueryRequest, QueryResponse
 from app.utils.ticker_parser import TickerParser
 from app.services.market_data import MarketDataService
 from app.services.news_service import NewsService
-from app.services.sentiment import SentimentService
+from app.services.sentiment_aggregate import SentimentAggregator
 from app.services.ai_engine import AIEngine
+from app.services.admission import admission_controller
+from app.services.conversation_store import store_conversation
+from app.services.response_cache import CachedResponse, ResponseCache
 from app.core.logger import logger
+from app.core.responses import TrustedJSONResponse
 
 router = APIRouter(prefix="/query", tags=["query"])
 
@@ -21,11 +25,14 @@ ai_engine = AIEngine()
 
 
 @router.post("/", response_model=QueryResponse)
-async def query(request: QueryRequest, db: Session = Depends(get_db)):
+async def query(request: QueryRequest, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_db)):
     """
     Process a query message and return AI-powered investment analysis.
     Matches company specification exactly.
     """
+    # Priority class from the caller's user_id; shed with 503 + Retry-After when saturated
+    priority = admission_controller.priority_for_user(request.user_id)
+    admission_controller.enter(priority)
     try:
         # Generate or use existing session ID
         session_id = request.session_id or str(uuid.uuid4())
@@ -39,93 +46,80 @@ async def query(request: QueryRequest, db: Session = Depends(get_db)):
         sentiment_result = None
         ai_summary = ""
         
-        # Fetch stock data if ticker detected
-        if detected_ticker:
-            stock_data = MarketDataService.get_stock_data(detected_ticker)
-            
-            # Fetch news if we have valid stock data
-            if stock_data:
-                relevant_news = NewsService.get_stock_news(detected_ticker, limit=3)
+        # Repeated questions about the same ticker reuse the generated analysis
+        cached = ResponseCache.get(request.query, detected_ticker)
+        if cached:
+            ai_summary = cached.ai_summary
+            stock_data = cached.stock_data
+            sentiment_result = cached.sentiment_result
+            relevant_news = cached.relevant_news
+        else:
+            # Fetch stock data if ticker detected; blocking upstream calls run in the
+            # threadpool, where concurrent lookups for the same symbol are coalesced
+            if detected_ticker:
+                stock_data = await run_in_threadpool(MarketDataService.get_stock_data, detected_ticker)
                 
-                # Perform sentiment analysis on news
-                if relevant_news:
-                    news_texts = [f"{news.title} {news.description or ''}" for news in relevant_news]
-                    sentiment_analysis = SentimentService.analyze_news_sentiment(news_texts)
-                    sentiment_result = {
-                        "sentiment": sentiment_analysis["overall_sentiment"],
-                        "confidence": abs(sentiment_analysis["average_polarity"]),
-                        "polarity": sentiment_analysis["average_polarity"]
-                    }
-        
-        # Generate AI summary
-        ai_summary = ai_engine.generate_investment_summary(
-            query=request.query,
-            ticker=detected_ticker,
-            stock_data=stock_data,
-            news_items=relevant_news,
-            sentiment_result=sentiment_result
-        )
+                # Fetch news if we have valid stock data
+                if stock_data:
+                    relevant_news = await run_in_threadpool(NewsService.get_stock_news, detected_ticker, limit=3)
+                    
+                    # Read the rolling per-ticker sentiment instead of rescoring news; it is
+                    # served from memory, and stale entries are reloaded off the event loop
+                    if SentimentAggregator.needs_reload(detected_ticker):
+                        await run_in_threadpool(SentimentAggregator.reload, detected_ticker)
+                    rolling_sentiment = SentimentAggregator.get(detected_ticker)
+                    if relevant_news:
+                        if rolling_sentiment is None:
+                            # Cold ticker: seed the aggregate once on the request path
+                            await run_in_threadpool(SentimentAggregator.ingest, detected_ticker, relevant_news)
+                            rolling_sentiment = SentimentAggregator.get(detected_ticker)
+                        else:
+                            # Fold any new articles in after the response is sent
+                            background_tasks.add_task(SentimentAggregator.ingest, detected_ticker, relevant_news)
+                    
+                    sentiment_result = rolling_sentiment
+            
+            # Generate AI summary off the event loop; degraded to the template summary under load
+            ai_summary = await admission_controller.generate(
+                priority,
+                ai_engine.generate_investment_summary,
+                request.query,
+                detected_ticker,
+                stock_data,
+                relevant_news,
+                sentiment_result
+            )
+            
+            ResponseCache.put(
+                request.query,
+                detected_ticker,
+                CachedResponse(ai_summary, stock_data, sentiment_result, relevant_news)
+            )
         
         # Store conversation in database
-        _store_conversation(
+        await store_conversation(
             db=db,
             session_id=session_id,
             user_query=request.query,
             ai_response=ai_summary,
             ticker_symbol=detected_ticker,
-            sentiment_result=sentiment_result["sentiment"] if sentiment_result else None
+            sentiment_result=sentiment_result.sentiment if sentiment_result else None,
+            stock_data=stock_data
         )
         
         # Create response matching company format
-        response = QueryResponse(
+        response = QueryResponse.model_construct(
             response=ai_summary,
             sources=["Yahoo Finance", "NewsAPI"],
             user_id=request.user_id,
             timestamp=datetime.utcnow()
         )
         
-        logger.info(f"Processed query for user {request.user_id}, ticker: {detected_ticker}")
-        return response
-        
+        logger.info("Processed query for user %s, ticker: %s", request.user_id, detected_ticker)
+        return TrustedJSONResponse(response)
+    
     except Exception as e:
-        logger.error(f"Error processing query: {str(e)}")
+        logger.error("Error processing query: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
-
-
-def _store_conversation(
-    db: Session,
-    session_id: str,
-    user_query: str,
-    ai_response: str,
-    ticker_symbol: str = None,
-    sentiment_result: str = None
-):
-    """Store conversation in database."""
-    try:
-        # Get or create session
-        session = db.query(ChatSession).filter(ChatSession.session_id == session_id).first()
-        if not session:
-            session = ChatSession(session_id=session_id)
-            db.add(session)
-            db.flush()  # Get the ID without committing
-        
-        # Create message
-        message = ChatMessage(
-            session_id=session_id,
-            user_query=user_query,
-            ai_response=ai_response,
-            ticker_symbol=ticker_symbol,
-            sentiment_result=sentiment_result
-        )
-        
-        db.add(message)
-        
-        # Update session timestamp
-        session.updated_at = datetime.utcnow()
-        
-        db.commit()
-        
-    except Exception as e:
-        logger.error(f"Error storing conversation: {str(e)}")
-        db.rollback()
-        raise
+    finally:
+        admission_controller.leave()
@@ -0,0 +1,94 @@
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
+from typing import List, Optional
+import asyncio
+import orjson
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.services.quote_stream import QuoteSubscriber, quote_hub
+
+router = APIRouter(prefix="/stream", tags=["stream"])
+
+
+@router.websocket("/quotes")
+async def stream_quotes(
+    websocket: WebSocket,
+    tickers: Optional[str] = Query(None, description="Comma-separated tickers to subscribe to on connect")
+):
+    """
+    Push live quotes for subscribed tickers.
+    
+    Clients send {"action": "subscribe" | "unsubscribe", "tickers": [...]}
+    and receive {"type": "quote", "ticker", "data", "fetched_at"} messages.
+    Quotes come from one shared poller per symbol; a client that reads
+    slower than quotes arrive only gets the latest one per ticker.
+    """
+    await websocket.accept()
+    subscriber = quote_hub.connect()
+    sender = asyncio.create_task(_send_quotes(websocket, subscriber))
+    try:
+        if tickers:
+            await _apply(websocket, subscriber, "subscribe", tickers.split(","))
+        
+        while True:
+            try:
+                message = orjson.loads(await websocket.receive_text())
+                action, symbols = message["action"], message["tickers"]
+                if action not in ("subscribe", "unsubscribe") or not isinstance(symbols, list):
+                    raise ValueError
+            except (orjson.JSONDecodeError, KeyError, TypeError, ValueError):
+                await _send(websocket, {
+                    "type": "error",
+                    "detail": 'Expected {"action": "subscribe" | "unsubscribe", "tickers": [...]}'
+                })
+                continue
+            await _apply(websocket, subscriber, action, symbols)
+    
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        quote_hub.disconnect(subscriber)
+
+
+async def _apply(websocket: WebSocket, subscriber: QuoteSubscriber, action: str, symbols: List):
+    """Subscribe or unsubscribe, then acknowledge with the connection's current tickers."""
+    invalid = []
+    for raw in symbols:
+        symbol = quote_hub.normalize(raw) if isinstance(raw, str) else None
+        if symbol is None:
+            invalid.append(raw)
+        elif action == "unsubscribe":
+            quote_hub.unsubscribe(subscriber, symbol)
+        elif symbol in subscriber.symbols or len(subscriber.symbols) < settings.quote_stream_max_symbols:
+            quote_hub.subscribe(subscriber, symbol)
+        else:
+            invalid.append(raw)
+    
+    reply = {"type": "subscribed", "tickers": sorted(subscriber.symbols)}
+    if invalid:
+        reply["rejected"] = invalid
+        reply["max_tickers"] = settings.quote_stream_max_symbols
+    await _send(websocket, reply)
+
+
+async def _send_quotes(websocket: WebSocket, subscriber: QuoteSubscriber):
+    """Deliver pending quotes; close the connection if the client stops reading."""
+    try:
+        while True:
+            updates = await subscriber.next_updates()
+            for symbol, (quote, fetched_at) in updates.items():
+                await asyncio.wait_for(
+                    _send(websocket, {"type": "quote", "ticker": symbol, "data": quote.model_dump(), "fetched_at": fetched_at}),
+                    timeout=settings.quote_stream_send_timeout_seconds
+                )
+    except asyncio.TimeoutError:
+        logger.warning("Closing quote stream for a client that stopped reading")
+        await websocket.close(code=1008, reason="Client is not reading quotes")
+    except (WebSocketDisconnect, RuntimeError):
+        # The client went away mid-send; the receive loop cleans up
+        pass
+
+
+async def _send(websocket: WebSocket, message: dict):
+    await websocket.send_text(orjson.dumps(message).decode())
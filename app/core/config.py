@@ -10,6 +10,69 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str = "sqlite:///./investai.db"
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kb: int = 65536
+    
+    # Write-behind conversation persistence
+    write_behind_enabled: bool = False
+    write_behind_batch_size: int = 100
+    write_behind_flush_ms: int = 200
+    write_behind_queue_size: int = 1000
+    write_behind_enqueue_timeout_ms: int = 1000
+    write_behind_retry_max_seconds: float = 5.0  # cap of the backoff between failed flushes
+    write_behind_dead_letter_path: str = "./data/write_behind_dead_letter.jsonl"  # turns unsaved at shutdown
+    
+    # Chat history retention (messages older than the max age move to chat_messages_archive)
+    retention_enabled: bool = False
+    retention_max_age_days: int = 90
+    retention_batch_size: int = 500
+    retention_interval_minutes: int = 60
+    
+    # History export (rows fetched per server-side cursor round trip)
+    export_yield_per: int = 500
+    
+    # Logging (records are written as JSON lines by a background thread)
+    log_level: str = "INFO"
+    log_format: str = "json"  # "json" or "text"
+    log_queue_size: int = 10000  # records beyond this are dropped rather than blocking requests
+    
+    # Observability
+    metrics_enabled: bool = True
+    server_timing_enabled: bool = True
+    profiling_enabled: bool = False
+    profiling_sample_rate: float = 0.01
+    profiling_token: Optional[str] = None  # X-Profile header value that forces profiling
+    profiling_interval_ms: float = 5.0
+    profiling_dir: str = "./profiles"
+    
+    # Traffic recording for replay (python -m benchmarks.replay_traffic)
+    traffic_record_enabled: bool = False
+    traffic_record_path: str = "./recordings/traffic.jsonl"
+    traffic_record_sample_rate: float = 1.0
+    traffic_record_max_body_bytes: int = 16384  # larger bodies are recorded without content
+    traffic_record_queue_size: int = 10000
+    traffic_record_exclude: str = "/metrics,/health,/docs,/redoc,/openapi.json,/stream"  # path prefixes
+    
+    # Admission control for the chat pipeline (priority classes: high, normal, low)
+    admission_enabled: bool = True
+    admission_max_concurrency: int = 2  # concurrent model generations
+    admission_queue_timeout_ms: int = 2000  # wait for a generation slot before degrading to the template summary
+    admission_max_queue: int = 32  # requests waiting for a slot; further requests degrade immediately
+    admission_max_inflight: int = 128  # requests in the pipeline before new ones are shed with 503
+    admission_retry_after_seconds: int = 5
+    admission_high_priority_users: str = ""  # comma-separated /query/ user_ids
+    admission_low_priority_users: str = ""
+    
+    # Health Probes
+    health_probe_interval_seconds: int = 60
+    health_probe_timeout_seconds: float = 5.0
+    health_upstream_probes_enabled: bool = True  # NewsAPI/yfinance probes; off in all but one server worker
     
     # API Keys
     newsapi_key: Optional[str] = None
@@ -18,6 +81,34 @@ class Settings(BaseSettings):
     huggingface_model: str = "gpt2"
     max_tokens: int = 150
     temperature: float = 0.7
+    warm_models_on_startup: bool = True  # otherwise models load on first use
+    
+    # Sentiment Settings
+    sentiment_cache_size: int = 10000
+    sentiment_persist: bool = True
+    sentiment_backend: str = "textblob"  # "textblob" or "transformer"
+    sentiment_model: str = "ProsusAI/finbert"
+    sentiment_batch_size: int = 16
+    sentiment_max_length: int = 128
+    sentiment_quantize: bool = True
+    sentiment_half_life_hours: float = 24.0
+    sentiment_state_ttl_seconds: int = 30
+    
+    # Response Cache: repeated questions about a ticker reuse the generated analysis
+    response_cache_enabled: bool = True
+    response_cache_size: int = 2048
+    response_cache_epoch_seconds: int = 300  # market-data freshness window
+    
+    # Live Quote Streaming (/stream/quotes WebSocket)
+    quote_stream_interval_seconds: float = 5.0
+    quote_stream_max_symbols: int = 20  # per connection
+    quote_stream_send_timeout_seconds: float = 10.0  # close connections that stop reading
+    
+    # Ticker Parsing
+    company_tickers_file: Optional[str] = None  # CSV (name,ticker) or JSON {name: ticker}
+    
+    # Portfolio Analysis
+    portfolio_max_tickers: int = 10
     
     # Environment Settings
     tf_enable_onednn_opts: Optional[str] = None
@@ -26,6 +117,14 @@ class Settings(BaseSettings):
     api_host: str = "0.0.0.0"
     api_port: int = 8000
     
+    # Production server (python -m app.server): prefork workers sharing preloaded models
+    server_workers: int = 0  # 0 = one per CPU
+    server_max_requests: int = 5000  # recycle a worker after this many requests; 0 = never
+    server_max_requests_jitter: int = 500  # staggers recycling across workers
+    server_graceful_timeout_seconds: int = 30
+    server_memory_report_seconds: int = 60
+    server_torch_threads: int = 0  # intra-op threads per worker; 0 = CPUs / workers
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
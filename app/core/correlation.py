@@ -0,0 +1,59 @@
+import re
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+
+# Correlation ID of the request being served; copied into every log record
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Accept caller-supplied IDs only if they are short and header/log safe
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:\-]{1,128}$")
+
+
+def get_request_id() -> Optional[str]:
+    return request_id_var.get()
+
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware assigning each request a correlation ID.
+    
+    A valid incoming X-Request-ID header is reused so IDs can be traced across
+    services; otherwise a new one is generated. The ID is stored in a context
+    variable (inherited by threadpool calls) for the logging pipeline and
+    echoed in the X-Request-ID response header.
+    """
+    
+    HEADER = b"x-request-id"
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+        
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == self.HEADER:
+                candidate = value.decode("latin-1")
+                if _VALID_REQUEST_ID.match(candidate):
+                    request_id = candidate
+                break
+        if request_id is None:
+            request_id = uuid.uuid4().hex
+        
+        encoded = request_id.encode("latin-1")
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(self.HEADER, encoded)]
+            await send(message)
+        
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
@@ -1,26 +1,151 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+from datetime import datetime, timezone
 from typing import Optional
+from app.core.config import settings
+from app.core.correlation import get_request_id
+from app.core.metrics import LOG_RECORDS_DROPPED, QUEUE_DEPTH
 
 
-def setup_logger(name: str, level: str = "INFO") -> logging.Logger:
-    """Set up a logger with console and file handlers."""
+class JsonFormatter(logging.Formatter):
+    """Render a record as one JSON object per line."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        request_id = getattr(record, "request_id", None)
+        return f"{message} [request_id={request_id}]" if request_id else message
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that never blocks the calling thread.
+    
+    The caller only merges the message arguments, captures the correlation ID
+    and exception text, and enqueues the record; JSON encoding and the write
+    to stdout happen on the listener thread. When the bounded queue is full
+    the record is dropped and counted rather than waiting on a slow stream.
+    """
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve everything that depends on the calling thread or on mutable
+        # arguments now; leave formatting to the listener
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        record.request_id = get_request_id()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+    
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """Owns the log queue and the background listener that drains it to stdout."""
+    
+    def __init__(self):
+        self.queue: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+        self.handler = NonBlockingQueueHandler(self.queue)
+        self._listener: Optional[logging.handlers.QueueListener] = None
+    
+    @property
+    def running(self) -> bool:
+        return self._listener is not None
+    
+    def start(self):
+        """Start the listener thread; safe to call again, e.g. in a forked worker."""
+        if self.running:
+            return
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(JsonFormatter() if settings.log_format == "json" else TextFormatter())
+        self._listener = logging.handlers.QueueListener(self.queue, stream_handler, respect_handler_level=False)
+        self._listener.start()
+    
+    def stop(self):
+        """Flush queued records and stop the listener thread."""
+        if not self.running:
+            return
+        self._listener.stop()
+        self._listener = None
+    
+    def depth(self) -> int:
+        return self.queue.qsize()
+    
+    def reset_after_fork(self):
+        """
+        Give a forked child its own queue and listener.
+        
+        The listener thread does not survive fork, and the inherited queue may
+        hold records (or a lock) from the parent, so start over with a new one.
+        """
+        was_running = self.running
+        self._listener = None
+        self.queue = queue.Queue(maxsize=settings.log_queue_size)
+        self.handler.queue = self.queue
+        self.handler.dropped = 0
+        if was_running:
+            self.start()
+
+
+log_pipeline = LogPipeline()
+atexit.register(log_pipeline.stop)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=log_pipeline.reset_after_fork)
+QUEUE_DEPTH.set_function(log_pipeline.depth, "log")
+LOG_RECORDS_DROPPED.set_function(lambda: log_pipeline.handler.dropped)
+
+
+def setup_logger(name: str, level: Optional[str] = None) -> logging.Logger:
+    """
+    Set up a logger that hands records to the shared background pipeline.
+    
+    Use %-style arguments (logger.debug("x %s", value)) so messages below the
+    configured level are never formatted.
+    """
     
     logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, level.upper()))
+    logger.setLevel(getattr(logging, (level or settings.log_level).upper()))
     
     # Avoid adding handlers multiple times
     if logger.handlers:
         return logger
     
-    # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
-    console_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
+    logger.addHandler(log_pipeline.handler)
+    logger.propagate = False
+    log_pipeline.start()
     
     return logger
 
@@ -0,0 +1,393 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from app.core.config import settings
+
+
+# Seconds; covers in-memory lookups through slow upstream calls and CPU generation
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Items per batch
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+class Metric(ABC):
+    """
+    Base class for in-process metrics rendered in the Prometheus text format.
+    
+    Counters and histograms are plain dicts guarded by a lock, so recording a
+    value costs well under a microsecond; gauges are callbacks evaluated only
+    when /metrics is scraped. Values are per process.
+    """
+    
+    type = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+    
+    def _format_labels(self, values: Tuple, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, values))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+        return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+    
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Sample lines for this metric, without the HELP and TYPE header."""
+    
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing count per label combination."""
+    
+    type = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+    
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+    
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{self._format_labels(labels)} {value}" for labels, value in values]
+
+
+class Histogram(Metric):
+    """Bucketed distribution of observed values per label combination."""
+    
+    type = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last is +Inf), sum, count]
+        self._values: Dict[Tuple, list] = {}
+    
+    def observe(self, value: float, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = [(labels, (list(state[0]), state[1], state[2])) for labels, state in self._values.items()]
+        
+        lines = []
+        for labels, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{self._format_labels(labels, ('le', le))} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format_labels(labels)} {total}")
+            lines.append(f"{self.name}_count{self._format_labels(labels)} {count}")
+        return lines
+
+
+class Gauge(Metric):
+    """Value read from a callback at scrape time; costs nothing on the request path."""
+    
+    type = "gauge"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._callbacks: Dict[Tuple, Callable[[], float]] = {}
+    
+    def set_function(self, callback: Callable[[], float], *labels):
+        self._callbacks[labels] = callback
+    
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, callback in list(self._callbacks.items()):
+            try:
+                value = callback()
+            except Exception:
+                continue
+            lines.append(f"{self.name}{self._format_labels(labels)} {value}")
+        return lines
+
+
+class CounterFunction(Gauge):
+    """Counter whose value is read from a callback, e.g. hits tracked by a cache itself."""
+    
+    type = "counter"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[Metric] = []
+    
+    def register(self, metric: Metric):
+        self._metrics.append(metric)
+    
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format (0.0.4)."""
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# Pipeline stages and upstream dependencies
+STAGE_DURATION = Histogram(
+    "investai_stage_duration_seconds",
+    "Duration of each chat pipeline stage.",
+    ["stage"]
+)
+UPSTREAM_ERRORS = Counter(
+    "investai_upstream_errors_total",
+    "Failed calls to upstream dependencies.",
+    ["upstream"]
+)
+
+# HTTP requests
+REQUEST_DURATION = Histogram(
+    "investai_http_request_duration_seconds",
+    "HTTP request latency by route.",
+    ["method", "route", "status"]
+)
+
+# Caches
+CACHE_HITS = CounterFunction("investai_cache_hits_total", "Cache hits.", ["cache"])
+CACHE_MISSES = CounterFunction("investai_cache_misses_total", "Cache misses.", ["cache"])
+CACHE_HIT_RATIO = Gauge("investai_cache_hit_ratio", "Cache hits divided by lookups since start.", ["cache"])
+CACHE_ENTRIES = Gauge("investai_cache_entries", "Entries currently held in a cache.", ["cache"])
+SENTIMENT_LOOKUPS = Counter(
+    "investai_sentiment_lookups_total",
+    "Sentiment scores by where they were found: memory, database or model.",
+    ["source"]
+)
+
+# Coalesced upstream lookups
+SINGLE_FLIGHT_CALLS = CounterFunction(
+    "investai_single_flight_calls_total",
+    "Calls to coalesced lookups: leaders ran the upstream call, followers shared one already in flight.",
+    ["group", "role"]
+)
+SINGLE_FLIGHT_RATIO = Gauge(
+    "investai_single_flight_coalesced_ratio",
+    "Share of calls served by another caller's in-flight request since start.",
+    ["group"]
+)
+SINGLE_FLIGHT_IN_FLIGHT = Gauge("investai_single_flight_in_flight", "Distinct upstream calls currently running.", ["group"])
+
+# Batching and queues
+BATCH_SIZE = Histogram(
+    "investai_batch_size",
+    "Items per batch for inference and database writes.",
+    ["operation"],
+    buckets=SIZE_BUCKETS
+)
+QUEUE_DEPTH = Gauge("investai_queue_depth", "Items waiting in an in-process queue.", ["queue"])
+WRITE_BEHIND_FAILURES = Counter(
+    "investai_write_behind_failures_total",
+    "Chat turns in failed write-behind flushes: retried, written to the dead-letter file at shutdown, or lost when that failed.",
+    ["outcome"]
+)
+
+# Admission control
+ADMISSION_DECISIONS = Counter(
+    "investai_admission_decisions_total",
+    "Chat pipeline admission outcomes: admitted to the model, degraded to the template summary, or shed with 503.",
+    ["decision", "priority"]
+)
+ADMISSION_INFLIGHT = Gauge("investai_admission_inflight", "Requests currently in the chat pipeline.")
+
+# Live quote streaming
+QUOTE_STREAM_CLIENTS = Gauge("investai_quote_stream_clients", "Open quote streaming WebSocket connections.")
+QUOTE_STREAM_SYMBOLS = Gauge("investai_quote_stream_symbols", "Symbols with an active upstream poller.")
+QUOTE_STREAM_POLLS = Counter(
+    "investai_quote_stream_polls_total",
+    "Upstream quote fetches made by stream pollers, by whether a quote came back.",
+    ["result"]
+)
+QUOTE_STREAM_UPDATES = Counter(
+    "investai_quote_stream_updates_total",
+    "Quote updates sent to clients, or replaced by a newer quote before a slow client took them.",
+    ["outcome"]
+)
+
+TRAFFIC_RECORDS = Counter(
+    "investai_traffic_records_total",
+    "Requests captured by the traffic recorder: written to the file or dropped.",
+    ["outcome"]
+)
+LOG_RECORDS_DROPPED = CounterFunction(
+    "investai_log_records_dropped_total",
+    "Log records dropped because the logging queue was full."
+)
+
+
+def register_cache(name: str, cache):
+    """Expose an LRUCache's hit, miss, ratio and size metrics under the given cache label."""
+    CACHE_HITS.set_function(lambda: cache.hits, name)
+    CACHE_MISSES.set_function(lambda: cache.misses, name)
+    CACHE_HIT_RATIO.set_function(
+        lambda: round(cache.hits / (cache.hits + cache.misses), 4) if cache.hits + cache.misses else 0.0,
+        name
+    )
+    CACHE_ENTRIES.set_function(lambda: len(cache), name)
+
+
+def register_single_flight(group):
+    """Expose a SingleFlight group's leader/follower counts and coalescing ratio."""
+    SINGLE_FLIGHT_CALLS.set_function(lambda: group.leaders, group.name, "leader")
+    SINGLE_FLIGHT_CALLS.set_function(lambda: group.followers, group.name, "follower")
+    SINGLE_FLIGHT_RATIO.set_function(
+        lambda: round(group.followers / (group.leaders + group.followers), 4) if group.leaders + group.followers else 0.0,
+        group.name
+    )
+    SINGLE_FLIGHT_IN_FLIGHT.set_function(group.in_flight, group.name)
+
+
+# Stage durations of the current request, collected for the Server-Timing header
+_request_timings: ContextVar[Optional[list]] = ContextVar("request_timings", default=None)
+
+
+class stage:
+    """Context manager timing a block as one pipeline stage."""
+    
+    __slots__ = ("name", "started")
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.started = 0.0
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, traceback):
+        elapsed = time.perf_counter() - self.started
+        if settings.metrics_enabled:
+            STAGE_DURATION.observe(elapsed, self.name)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((self.name, elapsed))
+        return False
+
+
+def timed(name: str):
+    """Decorator form of stage()."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_upstream_error(upstream: str):
+    UPSTREAM_ERRORS.inc(upstream)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency by method, route template and status."""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.metrics_enabled:
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        status = [500]
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            # Route templates keep label cardinality bounded; unmatched paths share one label
+            path = getattr(route, "path", None) or "unmatched"
+            REQUEST_DURATION.observe(time.perf_counter() - started, scope["method"], path, str(status[0]))
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware adding a Server-Timing header with per-stage durations.
+    
+    Stages timed with stage() while the request runs (including in the
+    threadpool, which inherits the request context) are summed by name;
+    repeated stages, such as one quote fetch per portfolio ticker, report
+    their count in desc. A total entry covers the time until the response
+    started.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.server_timing_enabled:
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        timings = []
+        token = _request_timings.set(timings)
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                header = self.format_header(timings, time.perf_counter() - started)
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header.encode("latin-1"))]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_timings.reset(token)
+    
+    @staticmethod
+    def format_header(timings: List[Tuple[str, float]], total: float) -> str:
+        totals: Dict[str, List[float]] = {}
+        for name, elapsed in timings:
+            entry = totals.setdefault(name, [0.0, 0])
+            entry[0] += elapsed
+            entry[1] += 1
+        
+        parts = [
+            f'{name};dur={elapsed * 1000:.1f}' + (f';desc="x{count}"' if count > 1 else "")
+            for name, (elapsed, count) in totals.items()
+        ]
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
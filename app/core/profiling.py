@@ -0,0 +1,127 @@
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.logger import logger
+
+
+class StackSampler:
+    """
+    Statistical profiler that samples the Python stacks of all threads.
+    
+    A daemon thread records sys._current_frames() every interval, so both the
+    event loop and threadpool workers serving the request are captured.
+    Samples are aggregated as folded stacks ("thread;outer;...;inner count"),
+    the input format of flamegraph.pl and speedscope.
+    """
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+    
+    def start(self):
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+    
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[";".join(reversed(stack))] += 1
+            self.sample_count += 1
+    
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common()) + "\n"
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles a sample of requests and writes the result to disk.
+    
+    A request is profiled when profiling_enabled is set and it is picked at
+    profiling_sample_rate, or when it carries an X-Profile header matching
+    profiling_token. Only one request is profiled at a time. When neither
+    applies the cost is a flag check and a header lookup.
+    """
+    
+    HEADER = b"x-profile"
+    
+    def __init__(self, app):
+        self.app = app
+        self._busy = threading.Lock()
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        
+        if not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+        
+        profile_id = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+        
+        sampler = StackSampler(settings.profiling_interval_ms / 1000)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            elapsed = time.perf_counter() - started
+            try:
+                await run_in_threadpool(self._write, profile_id, scope, sampler, elapsed)
+            finally:
+                self._busy.release()
+    
+    def _should_profile(self, scope) -> bool:
+        if settings.profiling_token:
+            for name, value in scope.get("headers", ()):
+                if name == self.HEADER:
+                    return hmac.compare_digest(value.decode("latin-1"), settings.profiling_token)
+        return settings.profiling_enabled and random.random() < settings.profiling_sample_rate
+    
+    @staticmethod
+    def _write(profile_id: str, scope, sampler: StackSampler, elapsed: float):
+        path_slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        filename = os.path.join(
+            settings.profiling_dir,
+            f"{profile_id}-{scope['method']}-{path_slug}-{elapsed * 1000:.0f}ms.folded"
+        )
+        try:
+            os.makedirs(settings.profiling_dir, exist_ok=True)
+            with open(filename, "w", encoding="utf-8") as f:
+                f.write(sampler.folded())
+            logger.info("Wrote request profile %s (%.1fms, %s samples)", filename, elapsed * 1000, sampler.sample_count)
+        except OSError as e:
+            logger.error("Could not write request profile %s: %s", filename, e)
@@ -0,0 +1,220 @@
+import hashlib
+import hmac
+import os
+import queue
+import random
+import re
+import secrets
+import threading
+import time
+import uuid
+from functools import lru_cache
+from typing import Any, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+import orjson
+from app.core.config import settings
+from app.core.correlation import get_request_id
+from app.core.logger import logger
+from app.core.metrics import QUEUE_DEPTH, TRAFFIC_RECORDS
+
+# Pseudonyms are keyed on a secret generated at import, so they are stable
+# within a recording (a pre-fork parent passes it to its workers) but cannot
+# be reversed or joined with another recording
+_SALT = secrets.token_bytes(16)
+
+# Free text that may identify a person: e-mail addresses and long digit runs
+# (phone, account and card numbers)
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_DIGITS = re.compile(r"\d[\d \-]{5,}\d")
+
+
+@lru_cache(maxsize=8)
+def _parse_prefixes(value: str) -> Tuple[str, ...]:
+    return tuple(prefix.strip() for prefix in value.split(",") if prefix.strip())
+
+
+def _digest(value: str) -> bytes:
+    return hmac.new(_SALT, value.encode("utf-8"), hashlib.sha256).digest()
+
+
+def pseudonymize_session(session_id: str) -> str:
+    """Replace a session ID with a stable UUID-shaped pseudonym."""
+    return str(uuid.UUID(bytes=_digest(f"session:{session_id}")[:16]))
+
+
+def pseudonymize_user(user_id: Any) -> int:
+    """Replace a user ID with a stable integer pseudonym."""
+    return int.from_bytes(_digest(f"user:{user_id}")[:4], "big") % 1_000_000 + 1
+
+
+def scrub_text(text: str) -> str:
+    return _DIGITS.sub("[number]", _EMAIL.sub("[email]", text))
+
+
+def sanitize(value: Any, key: Optional[str] = None) -> Any:
+    """Sanitise a decoded JSON request body for recording."""
+    if isinstance(value, dict):
+        return {k: sanitize(v, k) for k, v in value.items()}
+    if isinstance(value, list):
+        return [sanitize(item) for item in value]
+    if value is None:
+        return None
+    if key == "session_id":
+        return pseudonymize_session(str(value))
+    if key == "user_id":
+        return pseudonymize_user(value)
+    if isinstance(value, str):
+        return scrub_text(value)
+    return value
+
+
+def sanitize_path(path: str) -> str:
+    """Pseudonymise the session ID in /chat/sessions/{session_id} paths."""
+    segments = path.split("/")
+    for i in range(1, len(segments)):
+        if segments[i - 1] == "sessions" and segments[i]:
+            segments[i] = pseudonymize_session(segments[i])
+    return "/".join(segments)
+
+
+class TrafficRecorder:
+    """
+    Appends request records to a JSONL file from a background thread.
+    
+    Records are queued without blocking and dropped (and counted) when the
+    queue is full. Each line is written with a single append, so workers of
+    the pre-fork server can share one file. The writer thread is started in
+    the process that records, on first use.
+    """
+    
+    def __init__(self):
+        self.queue: queue.Queue = queue.Queue(maxsize=settings.traffic_record_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+    
+    def record(self, entry: dict):
+        if self._pid != os.getpid():
+            self._start()
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            TRAFFIC_RECORDS.inc("dropped")
+    
+    def depth(self) -> int:
+        return self.queue.qsize()
+    
+    def _start(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # A forked child inherits the queue but not the writer thread
+            self.queue = queue.Queue(maxsize=settings.traffic_record_queue_size)
+            self._thread = threading.Thread(target=self._run, name="traffic-recorder", daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+    
+    def _run(self):
+        path = settings.traffic_record_path
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        except OSError as e:
+            logger.error("Traffic recording disabled, cannot open %s: %s", path, e)
+            return
+        
+        logger.info("Recording traffic to %s", path)
+        while True:
+            entry = self.queue.get()
+            try:
+                os.write(fd, orjson.dumps(entry) + b"\n")
+                TRAFFIC_RECORDS.inc("written")
+            except (OSError, TypeError) as e:
+                TRAFFIC_RECORDS.inc("dropped")
+                logger.warning("Could not record request: %s", e)
+
+
+traffic_recorder = TrafficRecorder()
+QUEUE_DEPTH.set_function(traffic_recorder.depth, "traffic")
+
+
+class TrafficRecorderMiddleware:
+    """
+    ASGI middleware recording sanitised requests for later replay.
+    
+    Opt-in through traffic_record_enabled. Each sampled request is written as
+    one JSON line with its arrival time, method, path, query string, JSON
+    body, status and duration; python -m benchmarks.replay_traffic re-issues
+    the file. No headers are kept, session and user IDs are replaced with
+    stable pseudonyms, and e-mail addresses and long numbers in text are
+    masked. Bodies larger than traffic_record_max_body_bytes are omitted.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.traffic_record_enabled
+            or scope["path"].startswith(_parse_prefixes(settings.traffic_record_exclude))
+            or random.random() >= settings.traffic_record_sample_rate
+        ):
+            await self.app(scope, receive, send)
+            return
+        
+        arrived = time.time()
+        started = time.perf_counter()
+        chunks = []
+        size = 0
+        status = None
+        
+        async def receive_wrapper():
+            nonlocal size
+            message = await receive()
+            if message["type"] == "http.request":
+                body = message.get("body", b"")
+                size += len(body)
+                if size <= settings.traffic_record_max_body_bytes:
+                    chunks.append(body)
+            return message
+        
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            entry = {
+                "ts": round(arrived, 6),
+                "method": scope["method"],
+                "path": sanitize_path(scope["path"]),
+                "query": self._query(scope),
+                "body": None,
+                "status": status,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                "request_id": get_request_id(),
+            }
+            if size > settings.traffic_record_max_body_bytes:
+                entry["body_omitted"] = True
+            elif size:
+                try:
+                    entry["body"] = sanitize(orjson.loads(b"".join(chunks)))
+                except orjson.JSONDecodeError:
+                    entry["body_omitted"] = True
+            traffic_recorder.record(entry)
+    
+    @staticmethod
+    def _query(scope) -> str:
+        raw = scope.get("query_string", b"").decode("latin-1")
+        if not raw:
+            return ""
+        pairs = [
+            (name, pseudonymize_session(value) if name == "session_id" else scrub_text(value))
+            for name, value in parse_qsl(raw, keep_blank_values=True)
+        ]
+        return urlencode(pairs)
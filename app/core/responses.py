@@ -0,0 +1,26 @@
+from typing import Any
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def _default(value: Any):
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class TrustedJSONResponse(ORJSONResponse):
+    """
+    JSON response for data the application assembled itself.
+    
+    Returning a Response from an endpoint skips FastAPI's response_model
+    handling (dump, re-validation and jsonable_encoder), which dominates CPU
+    time for large histories; the route's response_model still documents the
+    schema. Content may be plain dicts and lists or pydantic models, including
+    ones built with model_construct; orjson encodes datetimes natively in the
+    same ISO format pydantic uses.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
@@ -1,26 +1,9 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import declarative_base
 
-from app.core.config import settings
-
-# Create database engine
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
-)
-
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Engine and sessions live in app.db.session; re-exported here for existing imports
+from app.db.session import engine, SessionLocal, get_db, async_engine, AsyncSessionLocal, get_async_db
 
 # Create Base class for models
 Base = declarative_base()
 
-
-def get_db():
-    """Dependency to get database session."""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+__all__ = ["Base", "engine", "SessionLocal", "get_db", "async_engine", "AsyncSessionLocal", "get_async_db"]
@@ -0,0 +1,99 @@
+from sqlalchemy import case, func, inspect, insert, select
+from sqlalchemy.engine import Engine
+from app.core.logger import logger
+from app.db.base import Base
+
+# Register every model on Base.metadata
+import app.models.sentiment  # noqa: F401
+from app.models.chat import ChatMessage
+from app.models.dashboard import TickerDailyRollup
+
+
+def upgrade_schema(engine: Engine):
+    """
+    Bring an existing database up to the current schema.
+    
+    create_all only creates missing tables, so indexes added to tables that
+    already exist are created here. Every step is idempotent and safe to run
+    on each startup.
+    
+    Args:
+        engine: Database engine to migrate
+    """
+    new_rollup = not inspect(engine).has_table(TickerDailyRollup.__tablename__)
+    
+    Base.metadata.create_all(bind=engine)
+    created = ensure_indexes(engine)
+    if created:
+        logger.info("Created indexes: %s", ", ".join(created))
+    
+    if new_rollup:
+        backfill_ticker_rollup(engine)
+
+
+def ensure_indexes(engine: Engine) -> list:
+    """
+    Create any index declared on the models that is missing from the database.
+    
+    Args:
+        engine: Database engine
+    
+    Returns:
+        Names of the indexes that were created
+    """
+    inspector = inspect(engine)
+    created = []
+    
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            index.create(bind=engine, checkfirst=True)
+            created.append(index.name)
+    
+    return created
+
+
+def backfill_ticker_rollup(engine: Engine) -> int:
+    """
+    Seed the per-ticker daily rollup from existing chat messages.
+    
+    Runs once, when the rollup table is first created. Prices were never
+    stored on messages, so backfilled days have counts but no price snapshot.
+    
+    Args:
+        engine: Database engine
+    
+    Returns:
+        Number of rollup rows inserted
+    """
+    day = func.date(ChatMessage.created_at)
+    
+    def count_of(sentiment: str):
+        return func.sum(case((ChatMessage.sentiment_result == sentiment, 1), else_=0))
+    
+    source = (
+        select(
+            ChatMessage.ticker_symbol,
+            day,
+            func.count(ChatMessage.id),
+            count_of("Positive"),
+            count_of("Negative"),
+            count_of("Neutral"),
+            func.max(ChatMessage.created_at),
+        )
+        .where(ChatMessage.ticker_symbol.isnot(None), ChatMessage.created_at.isnot(None))
+        .group_by(ChatMessage.ticker_symbol, day)
+    )
+    stmt = insert(TickerDailyRollup).from_select(
+        ["ticker", "day", "query_count", "positive_count", "negative_count", "neutral_count", "updated_at"],
+        source
+    )
+    
+    with engine.begin() as connection:
+        inserted = connection.execute(stmt).rowcount
+    
+    if inserted:
+        logger.info("Backfilled %s ticker rollup rows from chat history", inserted)
+    return inserted
@@ -1,12 +1,142 @@
-from sqlalchemy import create_engine
+import importlib.util
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
 from app.core.config import settings
 
-# Create the database engine
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
-)
+
+def is_sqlite(url: str) -> bool:
+    """Return True if the database URL points at SQLite."""
+    return url.startswith("sqlite")
+
+
+def engine_options(url: str, use_async: bool = False) -> dict:
+    """
+    Build create_engine keyword arguments for a database URL.
+    
+    Args:
+        url: SQLAlchemy database URL
+        use_async: Whether the options are for an async engine
+    
+    Returns:
+        Dictionary of pool and connection options
+    """
+    if is_sqlite(url):
+        if url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url:
+            # A single shared connection, otherwise every checkout sees an empty database
+            return {"connect_args": {"check_same_thread": False}, "poolclass": StaticPool}
+        return {
+            "connect_args": {"check_same_thread": False},
+            # aiosqlite defaults to NullPool, which reopens (and re-tunes) a connection per request
+            **({"poolclass": AsyncAdaptedQueuePool} if use_async else {}),
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_timeout": settings.db_pool_timeout,
+        }
+    
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": True,
+    }
+
+
+def apply_sqlite_pragmas(engine: Engine, journal_mode: str = None):
+    """Tune every new SQLite connection for concurrent readers and writers."""
+    journal_mode = journal_mode or settings.sqlite_journal_mode
+    
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # WAL lets readers proceed while a writer commits
+        cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+        # Safe with WAL; fsync only at checkpoints instead of every commit
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        # Wait for a competing writer instead of failing with "database is locked"
+        cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+        # Negative value is in KiB
+        cursor.execute(f"PRAGMA cache_size=-{settings.sqlite_cache_size_kb}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+
+def create_db_engine(url: str = None, journal_mode: str = None) -> Engine:
+    """
+    Create a configured database engine.
+    
+    Args:
+        url: Database URL; defaults to settings.database_url
+        journal_mode: SQLite journal mode override (e.g. "DELETE" for benchmarks)
+    
+    Returns:
+        SQLAlchemy Engine
+    """
+    url = url or settings.database_url
+    engine = create_engine(url, **engine_options(url))
+    if is_sqlite(url):
+        apply_sqlite_pragmas(engine, journal_mode)
+    return engine
+
+
+# Async drivers used for the request path, keyed by database backend; only
+# aiosqlite is in requirements.txt, the others are installed with their database
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+    "mysql": "aiomysql",
+}
+
+
+def async_database_url(url: str) -> str:
+    """
+    Translate a synchronous database URL to its async-driver equivalent.
+    
+    Args:
+        url: SQLAlchemy database URL, e.g. sqlite:///./investai.db
+    
+    Returns:
+        URL using an async driver, e.g. sqlite+aiosqlite:///./investai.db
+    
+    Raises:
+        ValueError: when the backend has no async driver or it is not installed
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend: {backend}")
+    driver = ASYNC_DRIVERS[backend]
+    if importlib.util.find_spec(driver) is None:
+        raise ValueError(
+            f"DATABASE_URL points at {backend}, which needs the {driver} async driver; "
+            f"install it with: pip install {driver}"
+        )
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def create_async_db_engine(url: str = None, journal_mode: str = None) -> AsyncEngine:
+    """
+    Create a configured async database engine for the same database as create_db_engine.
+    
+    Args:
+        url: Synchronous database URL; defaults to settings.database_url
+        journal_mode: SQLite journal mode override
+    
+    Returns:
+        SQLAlchemy AsyncEngine
+    """
+    url = url or settings.database_url
+    engine = create_async_engine(async_database_url(url), **engine_options(url, use_async=True))
+    if is_sqlite(url):
+        apply_sqlite_pragmas(engine.sync_engine, journal_mode)
+    return engine
+
+
+# The single database engine shared by the whole application (startup, background jobs, services)
+engine = create_db_engine()
 
 # Create a configured "Session" class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -19,3 +149,15 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Async engine and sessions used by the API routers so database I/O does not block the event loop
+async_engine = create_async_db_engine()
+
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db():
+    """Dependency function to get an async DB session."""
+    async with AsyncSessionLocal() as db:
+        yield db
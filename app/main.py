@@ -1,28 +1,65 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
+from fastapi.concurrency import run_in_threadpool
 from contextlib import asynccontextmanager
+import asyncio
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.core.logger import logger
-from app.api import chat, health, query
-from app.db.base import Base, engine
+from app.core.correlation import RequestIdMiddleware
+from app.core.metrics import MetricsMiddleware, ServerTimingMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.recorder import TrafficRecorderMiddleware
+from app.api import chat, dashboard, health, metrics, portfolio, query, stream
+from app.db.base import engine, async_engine
+from app.db.migrations import upgrade_schema
+from app.utils.ticker_parser import TickerParser
+from app.services.conversation_store import conversation_writer
+from app.services.retention import retention_job
+from app.services.health import health_monitor
+from app.services.sentiment import SentimentService
+from app.services.ai_engine import AIEngine
+from app.services.admission import Overloaded
+from app.services.quote_stream import quote_hub
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
-    logger.info(f"Starting {settings.app_name} v{settings.app_version}")
-    logger.info(f"Debug mode: {settings.debug}")
+    logger.info("Starting %s v%s", settings.app_name, settings.app_version)
+    logger.info("Debug mode: %s", settings.debug)
+    # Already compiled when a pre-fork parent (app.server) loaded it before forking
+    if not TickerParser.is_loaded():
+        TickerParser.load()
+    # Load models off the event loop; /health/ready reports them until warm
+    warmups = []
+    if settings.warm_models_on_startup:
+        warmups = [
+            asyncio.create_task(run_in_threadpool(AIEngine().warm)),
+            asyncio.create_task(run_in_threadpool(SentimentService.warm)),
+        ]
+    health_monitor.start()
+    if settings.write_behind_enabled:
+        conversation_writer.start()
+    if settings.retention_enabled:
+        retention_job.start()
     logger.info("Application startup complete")
     
     yield
     
     # Shutdown
+    await health_monitor.stop()
+    await quote_hub.stop()
+    await asyncio.gather(*warmups)
+    await retention_job.stop()
+    await conversation_writer.stop()
+    await async_engine.dispose()
     logger.info("Application shutdown")
 
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create database tables and any indexes missing from an existing database
+upgrade_schema(engine)
 
 # Create FastAPI application
 app = FastAPI(
@@ -32,6 +69,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -42,12 +80,42 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing", "X-Profile-Id", "X-Request-ID"],
 )
 
+# Request latency by route for /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Per-stage durations in the Server-Timing response header
+app.add_middleware(ServerTimingMiddleware)
+
+# Opt-in sampled profiling (PROFILING_ENABLED or an X-Profile header matching PROFILING_TOKEN)
+app.add_middleware(ProfilingMiddleware)
+
+# Opt-in sanitised request recording for replay load tests (TRAFFIC_RECORD_ENABLED)
+app.add_middleware(TrafficRecorderMiddleware)
+
+# Correlation ID for log records and the X-Request-ID response header (outermost, so every layer logs with it)
+app.add_middleware(RequestIdMiddleware)
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    """Shed requests get 503 with Retry-After so clients back off instead of timing out."""
+    return ORJSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
 # Include routers
 app.include_router(chat.router)
 app.include_router(health.router)
 app.include_router(query.router)
+app.include_router(portfolio.router)
+app.include_router(dashboard.router)
+app.include_router(metrics.router)
+app.include_router(stream.router)
 
 
 @app.get("/")
@@ -64,7 +132,7 @@ async def root():
 if __name__ == "__main__":
     import uvicorn
     
-    logger.info(f"Starting server on {settings.api_host}:{settings.api_port}")
+    logger.info("Starting server on %s:%s", settings.api_host, settings.api_port)
     uvicorn.run(
         "app.main:app",
         host=settings.api_host,
@@ -1,12 +1,18 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from datetime import datetime
+import json
+import zlib
 
 from app.db.base import Base
 
 
 class ChatSession(Base):
     __tablename__ = "chat_sessions"
+    __table_args__ = (
+        # Keyset pagination over sessions ordered by recency
+        Index("ix_chat_sessions_updated_at_id", "updated_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(String(100), unique=True, index=True, nullable=False)
@@ -14,11 +20,24 @@ class ChatSession(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationship with messages
-    messages = relationship("ChatMessage", back_populates="session", cascade="all, delete-orphan")
+    messages = relationship(
+        "ChatMessage",
+        back_populates="session",
+        cascade="all, delete-orphan",
+        order_by="ChatMessage.created_at"
+    )
 
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # Session history: WHERE session_id = ? ORDER BY created_at
+        Index("ix_chat_messages_session_id_created_at", "session_id", "created_at"),
+        # Per-ticker analysis and time-bounded scans
+        Index("ix_chat_messages_ticker_symbol_created_at", "ticker_symbol", "created_at"),
+        # Retention sweeps select the oldest rows first
+        Index("ix_chat_messages_created_at", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(String(100), ForeignKey("chat_sessions.session_id"), nullable=False)
@@ -30,3 +49,40 @@ class ChatMessage(Base):
     
     # Relationship with session
     session = relationship("ChatSession", back_populates="messages")
+
+
+class ArchivedChatMessage(Base):
+    """Chat message moved out of chat_messages by the retention job, with its text compressed."""
+    
+    __tablename__ = "chat_messages_archive"
+    __table_args__ = (
+        Index("ix_chat_messages_archive_session_id_created_at", "session_id", "created_at"),
+    )
+    
+    # Keeps the original chat_messages primary key
+    id = Column(Integer, primary_key=True)
+    session_id = Column(String(100), nullable=False)
+    ticker_symbol = Column(String(10), nullable=True)
+    created_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+    # zlib-compressed JSON of user_query, ai_response and sentiment_result
+    payload = Column(LargeBinary, nullable=False)
+    
+    @staticmethod
+    def pack(message: ChatMessage) -> bytes:
+        return zlib.compress(json.dumps({
+            "user_query": message.user_query,
+            "ai_response": message.ai_response,
+            "sentiment_result": message.sentiment_result,
+        }).encode("utf-8"))
+    
+    def unpack(self) -> dict:
+        """Return the archived message as a dictionary shaped like a chat message."""
+        data = json.loads(zlib.decompress(self.payload).decode("utf-8"))
+        data.update(
+            id=self.id,
+            session_id=self.session_id,
+            ticker_symbol=self.ticker_symbol,
+            created_at=self.created_at,
+        )
+        return data
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, Float, Index
+from datetime import datetime
+
+from app.db.base import Base
+
+
+class TickerDailyRollup(Base):
+    __tablename__ = "ticker_daily_rollup"
+    __table_args__ = (
+        # Dashboard reads a trailing window of days
+        Index("ix_ticker_daily_rollup_day", "day"),
+    )
+    
+    # One row per ticker per UTC day, incremented as chat turns are stored
+    ticker = Column(String(10), primary_key=True)
+    day = Column(Date, primary_key=True)
+    query_count = Column(Integer, nullable=False, default=0)
+    positive_count = Column(Integer, nullable=False, default=0)
+    negative_count = Column(Integer, nullable=False, default=0)
+    neutral_count = Column(Integer, nullable=False, default=0)
+    last_price = Column(Float, nullable=True)
+    last_change_percent = Column(Float, nullable=True)
+    last_price_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
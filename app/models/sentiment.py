@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float, UniqueConstraint
+from datetime import datetime
+
+from app.db.base import Base
+
+
+class SentimentScore(Base):
+    __tablename__ = "sentiment_scores"
+    __table_args__ = (
+        UniqueConstraint("content_hash", "scorer_version", name="uq_sentiment_scores_hash_version"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), nullable=False)
+    scorer_version = Column(String(100), nullable=False)
+    sentiment = Column(String(20), nullable=False)
+    confidence = Column(Float, nullable=False)
+    polarity = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class TickerSentimentState(Base):
+    __tablename__ = "ticker_sentiment_state"
+    
+    # Decayed sums are expressed as of updated_at; scaling them uniformly keeps ratios intact
+    ticker = Column(String(10), primary_key=True)
+    weighted_polarity = Column(Float, nullable=False, default=0.0)
+    total_weight = Column(Float, nullable=False, default=0.0)
+    positive_weight = Column(Float, nullable=False, default=0.0)
+    negative_weight = Column(Float, nullable=False, default=0.0)
+    neutral_weight = Column(Float, nullable=False, default=0.0)
+    article_count = Column(Integer, nullable=False, default=0)
+    last_article_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow)
@@ -57,6 +57,7 @@ class ChatSessionResponse(BaseModel):
     session_id: str
     created_at: datetime
     updated_at: datetime
+    message_count: Optional[int] = None
     messages: List[ChatMessageResponse] = []
 
     class Config:
@@ -68,3 +69,4 @@ class HealthResponse(BaseModel):
     timestamp: datetime
     version: str
     services: dict
+    checked_at: Optional[datetime] = None
@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import Optional, List, Dict
+from datetime import date, datetime
+
+
+class TickerSummary(BaseModel):
+    symbol: str
+    query_count: int
+    positive: int = 0
+    negative: int = 0
+    neutral: int = 0
+    last_price: Optional[float] = None
+    change_percent: Optional[float] = None
+    last_price_at: Optional[datetime] = None
+
+
+class DashboardSummary(BaseModel):
+    days: int
+    since: date
+    total_queries: int
+    tickers_tracked: int
+    sentiment_distribution: Dict[str, int]
+    top_tickers: List[TickerSummary]
+    top_movers: List[TickerSummary]
+    generated_at: datetime
@@ -0,0 +1,26 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import datetime
+
+from app.schemas.chat import StockData, NewsItem, SentimentResult
+
+
+class PortfolioRequest(BaseModel):
+    query: str = Field(..., min_length=1, max_length=500, description="Comparison or portfolio query, e.g. 'compare AAPL, MSFT and NVDA'")
+    session_id: Optional[str] = Field(None, description="Session ID for conversation continuity")
+
+
+class TickerAnalysis(BaseModel):
+    symbol: str
+    stock_data: Optional[StockData] = None
+    sentiment_result: Optional[SentimentResult] = None
+    relevant_news: List[NewsItem] = []
+
+
+class PortfolioResponse(BaseModel):
+    query: str
+    detected_tickers: List[str] = []
+    analyses: List[TickerAnalysis] = []
+    ai_summary: str
+    timestamp: datetime
+    session_id: str
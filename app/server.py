@@ -0,0 +1,331 @@
+import argparse
+import gc
+import os
+import random
+import signal
+import socket
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from app.core.config import settings
+from app.core.logger import logger
+
+
+def memory_usage(pid: int) -> Dict[str, Optional[float]]:
+    """
+    Read a process's memory from /proc (Linux), in MiB.
+    
+    RSS counts every resident page, including pages still shared with the
+    parent after fork; PSS divides shared pages among the processes sharing
+    them, so summing PSS over parent and workers gives the node's real usage;
+    USS is memory private to the process.
+    
+    Returns:
+        {"rss_mib", "pss_mib", "uss_mib"}, None where unavailable
+    """
+    fields: Dict[str, int] = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[0].endswith(":"):
+                    fields[parts[0][:-1]] = int(parts[1])
+    except (OSError, ValueError):
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        fields["Rss"] = int(line.split()[1])
+        except (OSError, ValueError):
+            pass
+    
+    def mib(*keys) -> Optional[float]:
+        if not all(key in fields for key in keys):
+            return None
+        return round(sum(fields[key] for key in keys) / 1024, 1)
+    
+    return {
+        "rss_mib": mib("Rss"),
+        "pss_mib": mib("Pss"),
+        "uss_mib": mib("Private_Clean", "Private_Dirty"),
+    }
+
+
+@dataclass
+class Worker:
+    slot: int
+    pid: int
+    started_at: float = field(default_factory=time.monotonic)
+
+
+class PreforkServer:
+    """
+    Pre-forking launcher for production.
+    
+    The parent imports the application and loads the GPT-2 and sentiment
+    models once, freezes the garbage collector's view of those objects
+    (gc.freeze) so collections in the workers do not write to their pages,
+    binds the listening socket and forks the workers. Model weights therefore
+    stay shared copy-on-write instead of being loaded once per worker.
+    
+    Each worker runs uvicorn on the inherited socket and exits after
+    max_requests (plus jitter) so slow leaks cannot accumulate; the parent
+    forks a replacement from its still-warm state. SIGTERM/SIGINT stop the
+    workers gracefully, SIGHUP recycles all of them. Per-worker RSS/PSS/USS
+    is logged every memory_report_seconds.
+    """
+    
+    def __init__(
+        self,
+        workers: int,
+        host: str,
+        port: int,
+        max_requests: int,
+        max_requests_jitter: int,
+        graceful_timeout: int,
+        memory_report_seconds: int
+    ):
+        self.worker_count = workers
+        self.host = host
+        self.port = port
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.memory_report_seconds = memory_report_seconds
+        self.workers: Dict[int, Worker] = {}
+        self.socket: Optional[socket.socket] = None
+        self.app = None
+        self._stopping = False
+        self._recycle = False
+    
+    def run(self):
+        # No collections while the long-lived objects are created; they are frozen below
+        gc.disable()
+        self.app = self._preload()
+        self.socket = self._bind()
+        # Collections resume for everything allocated from here on, in the parent and the workers
+        gc.freeze()
+        gc.enable()
+        
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_recycle)
+        
+        logger.info(
+            "Starting %s workers on %s:%s (max requests %s, parent pid %s)",
+            self.worker_count, self.host, self.port, self.max_requests or "unlimited", os.getpid()
+        )
+        for slot in range(self.worker_count):
+            self._spawn(slot)
+        
+        self._supervise()
+    
+    def _preload(self):
+        """Import the app and load everything workers should share."""
+        from app.main import app
+        from app.services.ai_engine import AIEngine
+        from app.services.health import health_monitor
+        from app.services.sentiment import SentimentService
+        from app.utils.ticker_parser import TickerParser
+        
+        started = time.perf_counter()
+        TickerParser.load()
+        AIEngine().warm()
+        SentimentService.warm()
+        health_monitor.share()
+        logger.info(
+            "Preloaded models in %.1fs (parent %s)",
+            time.perf_counter() - started, self._format_memory(memory_usage(os.getpid()))
+        )
+        return app
+    
+    def _bind(self) -> socket.socket:
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return sock
+    
+    def _spawn(self, slot: int):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._run_worker(slot)
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else 1
+            except BaseException:
+                logger.exception("Worker %s crashed", os.getpid())
+                code = 1
+            finally:
+                from app.core.logger import log_pipeline
+                log_pipeline.stop()
+                os._exit(code)
+        self.workers[pid] = Worker(slot=slot, pid=pid)
+    
+    def _run_worker(self, slot: int):
+        import uvicorn
+        from app.db.session import engine, async_engine
+        
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(sig, signal.SIG_DFL)
+        random.seed()
+        
+        # Connections opened by the parent (schema upgrade) must not be shared
+        engine.dispose(close=False)
+        async_engine.sync_engine.dispose(close=False)
+        
+        if "torch" in sys.modules:
+            import torch
+            threads = settings.server_torch_threads or max(1, (os.cpu_count() or 1) // self.worker_count)
+            torch.set_num_threads(threads)
+        
+        # Periodic chat archival and upstream health probes should run in exactly one worker
+        if slot != 0:
+            settings.retention_enabled = False
+            settings.health_upstream_probes_enabled = False
+        
+        limit = None
+        if self.max_requests:
+            limit = self.max_requests + random.randint(0, self.max_requests_jitter)
+        
+        logger.info("Worker %s started in slot %s (recycles after %s requests)", os.getpid(), slot, limit or "unlimited")
+        config = uvicorn.Config(
+            self.app,
+            lifespan="on",
+            log_level="info",
+            limit_max_requests=limit,
+            timeout_graceful_shutdown=self.graceful_timeout
+        )
+        uvicorn.Server(config).run(sockets=[self.socket])
+    
+    def _supervise(self):
+        next_report = time.monotonic() + self.memory_report_seconds
+        while self.workers:
+            if self._recycle:
+                self._recycle = False
+                logger.info("Recycling all workers")
+                self._signal_workers(signal.SIGTERM)
+            
+            self._reap()
+            
+            if not self._stopping and self.memory_report_seconds and time.monotonic() >= next_report:
+                self.report_memory()
+                next_report = time.monotonic() + self.memory_report_seconds
+            
+            if self._stopping:
+                self._shutdown()
+                break
+            time.sleep(0.25)
+        logger.info("All workers stopped")
+    
+    def _reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker = self.workers.pop(pid, None)
+            if worker is None or self._stopping:
+                continue
+            
+            uptime = time.monotonic() - worker.started_at
+            code = os.waitstatus_to_exitcode(status)
+            # uvicorn re-raises the stop signal after a graceful shutdown
+            if code == 0 or -code in (signal.SIGTERM, signal.SIGINT):
+                logger.info("Worker %s exited after %.0fs; starting a replacement", pid, uptime)
+            else:
+                logger.warning("Worker %s died with status %s after %.0fs; starting a replacement", pid, code, uptime)
+                if uptime < 1:
+                    # Back off instead of fork-looping on a startup failure
+                    time.sleep(1)
+            self._spawn(worker.slot)
+    
+    def _shutdown(self):
+        logger.info("Stopping %s workers", len(self.workers))
+        self._signal_workers(signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        if self.workers:
+            logger.warning("Killing %s workers that did not stop in time", len(self.workers))
+            self._signal_workers(signal.SIGKILL)
+            while self.workers:
+                self._reap()
+                time.sleep(0.1)
+    
+    def _signal_workers(self, sig: int):
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                self.workers.pop(pid, None)
+    
+    def _handle_stop(self, signum, frame):
+        self._stopping = True
+    
+    def _handle_recycle(self, signum, frame):
+        self._recycle = True
+    
+    def report_memory(self) -> List[dict]:
+        """Log and return memory usage of the parent and every worker."""
+        now = time.monotonic()
+        rows = [{"role": "parent", "pid": os.getpid(), **memory_usage(os.getpid())}]
+        for worker in sorted(self.workers.values(), key=lambda w: w.slot):
+            rows.append({
+                "role": f"worker-{worker.slot}",
+                "pid": worker.pid,
+                "uptime_seconds": round(now - worker.started_at),
+                **memory_usage(worker.pid),
+            })
+        
+        for row in rows:
+            logger.info("Memory %s (pid %s): %s", row["role"], row["pid"], self._format_memory(row))
+        pss = [row["pss_mib"] for row in rows if row["pss_mib"] is not None]
+        if len(pss) == len(rows):
+            logger.info("Memory total PSS for %s workers and parent: %.1f MiB", len(rows) - 1, sum(pss))
+        return rows
+    
+    @staticmethod
+    def _format_memory(usage: dict) -> str:
+        return ", ".join(
+            f"{name} {usage[key]:.1f} MiB" if usage.get(key) is not None else f"{name} n/a"
+            for name, key in (("rss", "rss_mib"), ("pss", "pss_mib"), ("uss", "uss_mib"))
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run InvestAI with pre-forked workers that share preloaded models."
+    )
+    parser.add_argument("--workers", type=int, default=settings.server_workers, help="0 = one per CPU")
+    parser.add_argument("--host", default=settings.api_host)
+    parser.add_argument("--port", type=int, default=settings.api_port)
+    parser.add_argument("--max-requests", type=int, default=settings.server_max_requests, help="0 = never recycle")
+    parser.add_argument("--max-requests-jitter", type=int, default=settings.server_max_requests_jitter)
+    parser.add_argument("--graceful-timeout", type=int, default=settings.server_graceful_timeout_seconds)
+    parser.add_argument("--memory-report-seconds", type=int, default=settings.server_memory_report_seconds)
+    args = parser.parse_args()
+    
+    if not hasattr(os, "fork"):
+        sys.exit("The pre-fork server needs os.fork(); use `uvicorn app.main:app` on this platform")
+    
+    PreforkServer(
+        workers=args.workers or os.cpu_count() or 1,
+        host=args.host,
+        port=args.port,
+        max_requests=args.max_requests,
+        max_requests_jitter=args.max_requests_jitter,
+        graceful_timeout=args.graceful_timeout,
+        memory_report_seconds=args.memory_report_seconds
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
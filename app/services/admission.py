@@ -0,0 +1,148 @@
+import asyncio
+import heapq
+import itertools
+from functools import lru_cache
+from typing import Callable, FrozenSet, List, Optional
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.metrics import ADMISSION_DECISIONS, ADMISSION_INFLIGHT, QUEUE_DEPTH, stage
+from app.services.ai_engine import AIEngine, Summary
+
+# Lower rank is served first when waiting for a generation slot
+PRIORITY_RANK = {"high": 0, "normal": 1, "low": 2}
+
+# Fraction of admission_max_inflight at which each class starts being shed,
+# so lower classes give way before high-priority callers are turned away
+SHED_AT = {"high": 1.0, "normal": 0.8, "low": 0.5}
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed; answered with 503 and Retry-After."""
+    
+    def __init__(self, priority: str, retry_after: int):
+        super().__init__(f"Server overloaded, {priority} priority request shed")
+        self.priority = priority
+        self.retry_after = retry_after
+
+
+@lru_cache(maxsize=8)
+def _parse_user_ids(value: str) -> FrozenSet[int]:
+    return frozenset(int(part) for part in value.split(",") if part.strip())
+
+
+class AdmissionController:
+    """
+    Admission control for the chat pipeline.
+    
+    Two limits apply. Requests entering the pipeline are counted, and once
+    admission_max_inflight is reached new requests are shed with 503 before
+    any work is done (lower priority classes earlier, see SHED_AT). Model
+    generation is limited to admission_max_concurrency at a time; requests
+    wait for a slot in priority order, and when none frees up within
+    admission_queue_timeout_ms, or admission_max_queue requests are already
+    waiting, they are degraded to the template summary instead of queueing
+    until the client gives up.
+    
+    State is per process and only touched from the event loop.
+    """
+    
+    def __init__(self):
+        self.inflight = 0
+        self.active = 0
+        self.waiting = 0
+        self._waiters: List[list] = []
+        self._sequence = itertools.count()
+    
+    @staticmethod
+    def priority_for_user(user_id: Optional[int]) -> str:
+        """Priority class of a /query/ caller, from the configured user ID lists."""
+        if user_id is not None:
+            if user_id in _parse_user_ids(settings.admission_high_priority_users):
+                return "high"
+            if user_id in _parse_user_ids(settings.admission_low_priority_users):
+                return "low"
+        return "normal"
+    
+    def enter(self, priority: str = "normal"):
+        """
+        Count a request into the pipeline; every successful call must be paired with leave().
+        
+        Raises:
+            Overloaded: when the in-flight limit for this priority is reached
+        """
+        if settings.admission_enabled and self.inflight >= settings.admission_max_inflight * SHED_AT[priority]:
+            ADMISSION_DECISIONS.inc("shed", priority)
+            logger.warning("Shedding %s priority request (%s in flight)", priority, self.inflight)
+            raise Overloaded(priority, settings.admission_retry_after_seconds)
+        self.inflight += 1
+    
+    def leave(self):
+        self.inflight -= 1
+    
+    async def generate(self, priority: str, generate: Callable[..., Summary], *args) -> Summary:
+        """
+        Run a summary generator in the threadpool under the concurrency limit.
+        
+        Args:
+            priority: Priority class of the request
+            generate: AIEngine.generate_* method; called with use_model=False when degraded
+            *args: Positional arguments for generate
+        
+        Returns:
+            The generated summary; its fallback flag is set when it is the
+            template summary, including when the request was degraded
+        """
+        # The template fallback is cheap, so only real model calls take a slot
+        if not settings.admission_enabled or AIEngine.model_status() == "fallback":
+            return await run_in_threadpool(generate, *args)
+        
+        if not await self._acquire(priority):
+            ADMISSION_DECISIONS.inc("degraded", priority)
+            return generate(*args, use_model=False)
+        
+        ADMISSION_DECISIONS.inc("admitted", priority)
+        try:
+            return await run_in_threadpool(generate, *args)
+        finally:
+            self._release()
+    
+    async def _acquire(self, priority: str) -> bool:
+        """Take a generation slot, waiting up to the queue deadline; False means degrade."""
+        if self.active < settings.admission_max_concurrency and not self.waiting:
+            self.active += 1
+            return True
+        if self.waiting >= settings.admission_max_queue:
+            return False
+        
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, [PRIORITY_RANK[priority], next(self._sequence), future])
+        self.waiting += 1
+        try:
+            with stage("admission_wait"):
+                await asyncio.wait_for(future, timeout=settings.admission_queue_timeout_ms / 1000)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        except asyncio.CancelledError:
+            # The client went away; hand on a slot that was granted meanwhile
+            if future.done() and not future.cancelled():
+                self._release()
+            raise
+        finally:
+            self.waiting -= 1
+    
+    def _release(self):
+        """Pass the slot to the best waiter still waiting, or free it."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(True)
+                return
+        self.active -= 1
+
+
+# Shared controller for the chat, query and portfolio endpoints
+admission_controller = AdmissionController()
+ADMISSION_INFLIGHT.set_function(lambda: admission_controller.inflight)
+QUEUE_DEPTH.set_function(lambda: admission_controller.waiting, "admission")
@@ -1,20 +1,34 @@
 import os
-from transformers import pipeline, GPT2LMHeadModel, GPT2Tokenizer
+import threading
 from typing import List, Dict, Optional
-import torch
 from app.core.config import settings
 from app.core.logger import logger
+from app.core.metrics import record_upstream_error, stage, timed
 from app.schemas.chat import StockData, NewsItem, SentimentResult
+from app.schemas.portfolio import TickerAnalysis
 
 # Suppress TensorFlow warnings
 os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0'
 
 
+class Summary(str):
+    """Summary text; fallback is True when it is the template summary rather than model output."""
+    
+    fallback: bool
+    
+    def __new__(cls, text: str, fallback: bool = False):
+        summary = super().__new__(cls, text)
+        summary.fallback = fallback
+        return summary
+
+
 class AIEngine:
     """Service for generating AI-powered investment summaries using GPT-2."""
     
     _instance = None
     _initialized = False
+    _loaded = False
+    _load_lock = threading.Lock()
     
     def __new__(cls):
         if cls._instance is None:
@@ -27,13 +41,36 @@ class AIEngine:
             self.model_name = settings.huggingface_model
             self.max_tokens = settings.max_tokens
             self.temperature = settings.temperature
-            self._initialize_model()
             AIEngine._initialized = True
     
+    @classmethod
+    def model_status(cls) -> str:
+        """Return "loaded", "fallback" (load failed, template summaries) or "not_loaded"."""
+        if not cls._loaded:
+            return "not_loaded"
+        return "loaded" if cls._instance.generator is not None else "fallback"
+    
+    def warm(self):
+        """
+        Load the model if it has not been loaded yet.
+        
+        torch and transformers are imported here rather than at module import,
+        so the API starts quickly; the lifespan calls this in the background and
+        the first generation otherwise pays for it.
+        """
+        if AIEngine._loaded:
+            return
+        with AIEngine._load_lock:
+            if not AIEngine._loaded:
+                self._initialize_model()
+                AIEngine._loaded = True
+    
     def _initialize_model(self):
         """Initialize GPT-2 model and tokenizer."""
         try:
-            logger.info(f"Loading GPT-2 model: {self.model_name}")
+            from transformers import pipeline, GPT2LMHeadModel, GPT2Tokenizer
+            
+            logger.info("Loading GPT-2 model: %s", self.model_name)
             
             # Load tokenizer and model
             self.tokenizer = GPT2Tokenizer.from_pretrained(self.model_name)
@@ -58,9 +95,9 @@ class AIEngine:
             )
             
             logger.info("GPT-2 model loaded successfully")
-            
+        
         except Exception as e:
-            logger.error(f"Error loading GPT-2 model: {str(e)}")
+            logger.error("Error loading GPT-2 model: %s", e)
             self.generator = None
     
     def generate_investment_summary(
@@ -69,18 +106,29 @@ class AIEngine:
         ticker: Optional[str],
         stock_data: Optional[StockData],
         news_items: List[NewsItem],
-        sentiment_result: Optional[SentimentResult]
-    ) -> str:
-        """Generate an AI-powered investment summary."""
+        sentiment_result: Optional[SentimentResult],
+        use_model: bool = True
+    ) -> Summary:
+        """
+        Generate an AI-powered investment summary.
+        
+        use_model=False skips the model and returns the template summary; the
+        admission controller uses it to degrade requests under load. The
+        result's fallback flag tells callers whether the model wrote it.
+        """
+        if not use_model:
+            return self._generate_fallback_summary(query, ticker, stock_data, news_items, sentiment_result)
         
         # Always try to generate a response, even if AI model fails
         try:
+            self.warm()
             if self.generator:
                 logger.info("Attempting AI generation...")
                 prompt = self._build_prompt(query, ticker, stock_data, news_items, sentiment_result)
                 
                 # Generate text
-                generated_texts = self.generator(prompt, max_new_tokens=100, pad_token_id=self.tokenizer.eos_token_id)
+                with stage("generation"):
+                    generated_texts = self.generator(prompt, max_new_tokens=100, pad_token_id=self.tokenizer.eos_token_id)
                 
                 if generated_texts and len(generated_texts) > 0:
                     generated_text = generated_texts[0]['generated_text']
@@ -96,8 +144,8 @@ class AIEngine:
                     
                     # Ensure we have a meaningful response
                     if len(summary) > 20:  # At least 20 characters
-                        logger.info(f"Successfully generated AI summary: {len(summary)} characters")
-                        return summary
+                        logger.info("Successfully generated AI summary: %s characters", len(summary))
+                        return Summary(summary)
                     else:
                         logger.warning("AI generated too short response, using fallback")
                         return self._generate_fallback_summary(query, ticker, stock_data, news_items, sentiment_result)
@@ -107,11 +155,49 @@ class AIEngine:
             else:
                 logger.info("AI model not available, using fallback")
                 return self._generate_fallback_summary(query, ticker, stock_data, news_items, sentiment_result)
-                
+        
         except Exception as e:
-            logger.error(f"Error in AI generation: {str(e)}")
+            logger.error("Error in AI generation: %s", e)
+            record_upstream_error("model")
             return self._generate_fallback_summary(query, ticker, stock_data, news_items, sentiment_result)
     
+    def generate_portfolio_summary(self, query: str, analyses: List[TickerAnalysis], use_model: bool = True) -> Summary:
+        """Generate one combined summary comparing several tickers (template only when use_model is False)."""
+        if not use_model:
+            return self._generate_portfolio_fallback(query, analyses)
+        
+        try:
+            self.warm()
+            if self.generator:
+                logger.info("Attempting AI generation for %s tickers...", len(analyses))
+                prompt = self._build_portfolio_prompt(query, analyses)
+                
+                with stage("generation"):
+                    generated_texts = self.generator(prompt, max_new_tokens=150, pad_token_id=self.tokenizer.eos_token_id)
+                
+                if generated_texts and len(generated_texts) > 0:
+                    generated_text = generated_texts[0]['generated_text']
+                    if generated_text.startswith(prompt):
+                        summary = generated_text[len(prompt):].strip()
+                    else:
+                        summary = generated_text.strip()
+                    
+                    summary = self._clean_summary(summary)
+                    
+                    if len(summary) > 20:
+                        logger.info("Successfully generated portfolio summary: %s characters", len(summary))
+                        return Summary(summary)
+                
+                logger.warning("AI generated no usable portfolio summary, using fallback")
+            
+            return self._generate_portfolio_fallback(query, analyses)
+        
+        except Exception as e:
+            logger.error("Error in portfolio AI generation: %s", e)
+            record_upstream_error("model")
+            return self._generate_portfolio_fallback(query, analyses)
+    
+    @timed("prompt_build")
     def _build_prompt(
         self,
         query: str,
@@ -147,6 +233,27 @@ class AIEngine:
         
         return prompt
     
+    @timed("prompt_build")
+    def _build_portfolio_prompt(self, query: str, analyses: List[TickerAnalysis]) -> str:
+        """Build a prompt comparing several tickers."""
+        
+        prompt = f"As an investment analyst, compare the following stocks for the query: '{query}'.\\n\\n"
+        
+        for analysis in analyses:
+            prompt += f"Stock: {analysis.symbol}\\n"
+            if analysis.stock_data:
+                prompt += f"Current Price: ${analysis.stock_data.current_price}\\n"
+                prompt += f"Change: {analysis.stock_data.change_percent}%\\n"
+            if analysis.sentiment_result:
+                prompt += f"Sentiment: {analysis.sentiment_result.sentiment}\\n"
+            if analysis.relevant_news:
+                prompt += f"Top Headline: {analysis.relevant_news[0].title}\\n"
+            prompt += "\\n"
+        
+        prompt += "Comparison Summary:\\n"
+        
+        return prompt
+    
     def _clean_summary(self, summary: str) -> str:
         """Clean and format the generated summary."""
         # Remove incomplete sentences
@@ -172,7 +279,7 @@ class AIEngine:
         stock_data: Optional[StockData],
         news_items: List[NewsItem],
         sentiment_result: Optional[SentimentResult]
-    ) -> str:
+    ) -> Summary:
         """Generate a fallback summary when AI model is unavailable."""
         
         summary_parts = []
@@ -180,9 +287,9 @@ class AIEngine:
         # Handle general queries without specific stocks
         if not ticker:
             if "hello" in query.lower() or "hi" in query.lower():
-                return "Hello! I'm InvestAI, your AI-powered investment research assistant. Ask me about any stock or investment topic, and I'll provide you with real-time data, news analysis, and AI insights. For example, try asking 'How is Apple stock doing today?' or 'Tell me about Tesla's recent performance.'"
+                return Summary("Hello! I'm InvestAI, your AI-powered investment research assistant. Ask me about any stock or investment topic, and I'll provide you with real-time data, news analysis, and AI insights. For example, try asking 'How is Apple stock doing today?' or 'Tell me about Tesla's recent performance.'", fallback=True)
             else:
-                return f"I understand you're asking about: '{query}'. To provide you with detailed investment analysis, please mention a specific stock ticker (like AAPL, TSLA, MSFT) or company name. I can then give you real-time prices, recent news, sentiment analysis, and AI-powered insights."
+                return Summary(f"I understand you're asking about: '{query}'. To provide you with detailed investment analysis, please mention a specific stock ticker (like AAPL, TSLA, MSFT) or company name. I can then give you real-time prices, recent news, sentiment analysis, and AI-powered insights.", fallback=True)
         
         # Handle queries with tickers
         if ticker:
@@ -213,4 +320,35 @@ class AIEngine:
             else:
                 summary_parts.append("I'm here to help with investment research. Please ask about specific stocks or investment topics, and I'll provide detailed analysis with real-time data.")
         
-        return " ".join(summary_parts)
+        return Summary(" ".join(summary_parts), fallback=True)
+    
+    def _generate_portfolio_fallback(self, query: str, analyses: List[TickerAnalysis]) -> Summary:
+        """Generate a comparison summary without the AI model."""
+        
+        if not analyses:
+            return self._generate_fallback_summary(query, None, None, [], None)
+        
+        summary_parts = []
+        priced = [analysis for analysis in analyses if analysis.stock_data]
+        
+        for analysis in analyses:
+            summary_parts.append(
+                self._generate_fallback_summary(
+                    query,
+                    analysis.symbol,
+                    analysis.stock_data,
+                    analysis.relevant_news,
+                    analysis.sentiment_result
+                )
+            )
+        
+        if len(priced) > 1:
+            best = max(priced, key=lambda analysis: analysis.stock_data.change_percent)
+            worst = min(priced, key=lambda analysis: analysis.stock_data.change_percent)
+            summary_parts.append(
+                f"Of the {len(priced)} stocks compared, {best.symbol} is the strongest today "
+                f"({best.stock_data.change_percent:+}%) and {worst.symbol} the weakest "
+                f"({worst.stock_data.change_percent:+}%)."
+            )
+        
+        return Summary(" ".join(summary_parts), fallback=True)
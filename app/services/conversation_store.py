@@ -0,0 +1,311 @@
+import asyncio
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+import orjson
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.metrics import BATCH_SIZE, QUEUE_DEPTH, WRITE_BEHIND_FAILURES, record_upstream_error, stage
+from app.db.session import AsyncSessionLocal
+from app.models.chat import ChatSession, ChatMessage
+from app.schemas.chat import StockData
+from app.services.dashboard import DashboardService
+
+
+class ChatTurn:
+    """One user query and AI response waiting to be persisted."""
+    
+    __slots__ = (
+        "session_id", "user_query", "ai_response", "ticker_symbol", "sentiment_result",
+        "stock_price", "change_percent", "created_at"
+    )
+    
+    def __init__(
+        self,
+        session_id: str,
+        user_query: str,
+        ai_response: str,
+        ticker_symbol: Optional[str] = None,
+        sentiment_result: Optional[str] = None,
+        stock_price: Optional[float] = None,
+        change_percent: Optional[float] = None,
+        created_at: Optional[datetime] = None
+    ):
+        self.session_id = session_id
+        self.user_query = user_query
+        self.ai_response = ai_response
+        self.ticker_symbol = ticker_symbol
+        self.sentiment_result = sentiment_result
+        self.stock_price = stock_price
+        self.change_percent = change_percent
+        self.created_at = created_at or datetime.utcnow()
+
+
+async def write_turns(db: AsyncSession, turns: List[ChatTurn]):
+    """
+    Persist chat turns in a single transaction.
+    
+    Missing sessions are inserted (ignoring ones created concurrently), each
+    touched session's updated_at is advanced, all messages are bulk inserted
+    and the per-ticker daily rollup is incremented.
+    
+    Args:
+        db: Async database session
+        turns: Chat turns to store
+    """
+    if not turns:
+        return
+    
+    BATCH_SIZE.observe(len(turns), "db_write")
+    
+    # Latest activity per session
+    latest: Dict[str, datetime] = {}
+    for turn in turns:
+        if turn.session_id not in latest or turn.created_at > latest[turn.session_id]:
+            latest[turn.session_id] = turn.created_at
+    
+    with stage("db_write"):
+        try:
+            await _insert_missing_sessions(db, latest)
+            
+            for session_id, updated_at in latest.items():
+                await db.execute(
+                    update(ChatSession)
+                    .where(ChatSession.session_id == session_id)
+                    .values(updated_at=updated_at)
+                )
+            
+            await db.execute(
+                insert(ChatMessage),
+                [
+                    {
+                        "session_id": turn.session_id,
+                        "user_query": turn.user_query,
+                        "ai_response": turn.ai_response,
+                        "ticker_symbol": turn.ticker_symbol,
+                        "sentiment_result": turn.sentiment_result,
+                        "created_at": turn.created_at,
+                    }
+                    for turn in turns
+                ]
+            )
+            
+            await DashboardService.apply_turns(db, turns)
+            
+            await db.commit()
+        
+        except Exception as e:
+            logger.error("Error storing conversation: %s", e)
+            record_upstream_error("database")
+            await db.rollback()
+            raise
+
+
+async def _insert_missing_sessions(db: AsyncSession, latest: Dict[str, datetime]):
+    """Insert sessions that do not exist yet, tolerating concurrent creators."""
+    rows = [
+        {"session_id": session_id, "created_at": created_at, "updated_at": created_at}
+        for session_id, created_at in latest.items()
+    ]
+    dialect = db.bind.dialect.name
+    
+    if dialect == "sqlite":
+        await db.execute(sqlite.insert(ChatSession).on_conflict_do_nothing(index_elements=["session_id"]), rows)
+    elif dialect == "postgresql":
+        await db.execute(postgresql.insert(ChatSession).on_conflict_do_nothing(index_elements=["session_id"]), rows)
+    else:
+        result = await db.execute(
+            select(ChatSession.session_id).where(ChatSession.session_id.in_(list(latest)))
+        )
+        existing = set(result.scalars().all())
+        rows = [row for row in rows if row["session_id"] not in existing]
+        if rows:
+            await db.execute(insert(ChatSession), rows)
+
+
+class ConversationWriter:
+    """
+    Optional write-behind persister for chat turns.
+    
+    Requests enqueue turns into a bounded in-memory queue and return without
+    waiting for a commit. A background task flushes the queue in one
+    transaction every write_behind_batch_size turns or write_behind_flush_ms
+    milliseconds, whichever comes first. When the queue is full, submit waits
+    up to write_behind_enqueue_timeout_ms (backpressure) and then falls back to
+    a direct write so no turn is dropped.
+    
+    A failed flush is retried with backoff capped at
+    write_behind_retry_max_seconds until it succeeds; the queue fills up
+    meanwhile, so new turns go through the backpressure path above. Only at
+    shutdown are turns that still cannot be written given up on, and they
+    are appended to write_behind_dead_letter_path rather than discarded.
+    """
+    
+    _STOP = object()
+    
+    # Flush attempts per batch once shutdown has begun
+    STOP_ATTEMPTS = 3
+    
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    @property
+    def depth(self) -> int:
+        """Number of turns waiting to be flushed."""
+        return self._queue.qsize() if self._queue is not None else 0
+    
+    def start(self):
+        """Start the background flush task on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=settings.write_behind_queue_size)
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            "Write-behind conversation persistence enabled (batch %s, every %sms)",
+            settings.write_behind_batch_size,
+            settings.write_behind_flush_ms
+        )
+    
+    async def stop(self):
+        """Flush everything still queued and stop the background task."""
+        if not self.running:
+            return
+        # Lets a flush that is retrying give up, so the stop marker can be queued
+        self._stopping = True
+        await self._queue.put(self._STOP)
+        await self._task
+        self._task = None
+        logger.info("Write-behind conversation queue flushed")
+    
+    async def submit(self, turn: ChatTurn):
+        """Queue a turn for persistence, applying backpressure when the queue is full."""
+        try:
+            await asyncio.wait_for(
+                self._queue.put(turn),
+                timeout=settings.write_behind_enqueue_timeout_ms / 1000
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Write-behind queue full, storing conversation synchronously")
+            async with AsyncSessionLocal() as db:
+                await write_turns(db, [turn])
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        
+        while not stopping:
+            item = await self._queue.get()
+            if item is self._STOP:
+                break
+            batch = [item]
+            
+            # Collect until the batch is full or the flush interval elapses
+            deadline = loop.time() + settings.write_behind_flush_ms / 1000
+            while len(batch) < settings.write_behind_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is self._STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            await self._flush(batch)
+        
+        # Drain anything queued behind the stop marker
+        remaining = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not self._STOP:
+                remaining.append(item)
+        if remaining:
+            await self._flush(remaining)
+    
+    async def _flush(self, batch: List[ChatTurn]):
+        """Write a batch, retrying until it succeeds; dead-letter it only during shutdown."""
+        delay = 0.1
+        attempt = 0
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await write_turns(db, batch)
+                return
+            except asyncio.CancelledError:
+                self._dead_letter(batch)
+                raise
+            except Exception as e:
+                attempt += 1
+                if self._stopping and attempt >= self.STOP_ATTEMPTS:
+                    logger.error("Write-behind flush of %s turns failed at shutdown: %s", len(batch), e)
+                    self._dead_letter(batch)
+                    return
+                WRITE_BEHIND_FAILURES.inc("retried", amount=len(batch))
+                logger.warning(
+                    "Write-behind flush of %s turns failed (attempt %s), retrying in %.1fs: %s",
+                    len(batch), attempt, delay, e
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, settings.write_behind_retry_max_seconds)
+    
+    @staticmethod
+    def _dead_letter(batch: List[ChatTurn]):
+        """Append turns that could not be stored to the dead-letter file, one JSON object per line."""
+        path = settings.write_behind_dead_letter_path
+        lines = b"".join(
+            orjson.dumps({name: getattr(turn, name) for name in ChatTurn.__slots__}) + b"\n"
+            for turn in batch
+        )
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "ab") as f:
+                f.write(lines)
+            WRITE_BEHIND_FAILURES.inc("dead_lettered", amount=len(batch))
+            logger.error("Wrote %s unsaved chat turns to %s", len(batch), path)
+        except OSError as e:
+            WRITE_BEHIND_FAILURES.inc("lost", amount=len(batch))
+            logger.error("Lost %s chat turns, cannot write %s: %s", len(batch), path, e)
+
+
+# Shared write-behind writer, started from the application lifespan when enabled
+conversation_writer = ConversationWriter()
+QUEUE_DEPTH.set_function(lambda: conversation_writer.depth, "write_behind")
+
+
+async def store_conversation(
+    db: AsyncSession,
+    session_id: str,
+    user_query: str,
+    ai_response: str,
+    ticker_symbol: str = None,
+    sentiment_result: str = None,
+    stock_data: Optional[StockData] = None
+):
+    """Store conversation in database, through the write-behind queue when enabled."""
+    turn = ChatTurn(
+        session_id=session_id,
+        user_query=user_query,
+        ai_response=ai_response,
+        ticker_symbol=ticker_symbol,
+        sentiment_result=sentiment_result,
+        stock_price=stock_data.current_price if stock_data else None,
+        change_percent=stock_data.change_percent if stock_data else None
+    )
+    
+    if conversation_writer.running:
+        await conversation_writer.submit(turn)
+    else:
+        await write_turns(db, [turn])
@@ -0,0 +1,160 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple
+from sqlalchemy import and_, case, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.dashboard import TickerDailyRollup
+from app.schemas.dashboard import DashboardSummary, TickerSummary
+
+
+class DashboardService:
+    """Maintains the per-ticker daily rollup and serves dashboard aggregates from it."""
+    
+    SENTIMENT_COLUMNS = {
+        "Positive": "positive_count",
+        "Negative": "negative_count",
+        "Neutral": "neutral_count",
+    }
+    
+    @classmethod
+    async def apply_turns(cls, db: AsyncSession, turns: list):
+        """
+        Fold stored chat turns into the rollup, in the caller's transaction.
+        
+        Args:
+            db: Async database session
+            turns: ChatTurn objects being persisted; turns without a ticker are skipped
+        """
+        rows = cls._group_turns(turns)
+        if not rows:
+            return
+        
+        dialect = db.bind.dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            await db.execute(cls._upsert_statement(insert), rows)
+            return
+        
+        for row in rows:
+            existing = await db.get(TickerDailyRollup, (row["ticker"], row["day"]))
+            if existing is None:
+                db.add(TickerDailyRollup(**row))
+                continue
+            existing.query_count += row["query_count"]
+            existing.positive_count += row["positive_count"]
+            existing.negative_count += row["negative_count"]
+            existing.neutral_count += row["neutral_count"]
+            if row["last_price_at"] and (existing.last_price_at is None or row["last_price_at"] >= existing.last_price_at):
+                existing.last_price = row["last_price"]
+                existing.last_change_percent = row["last_change_percent"]
+                existing.last_price_at = row["last_price_at"]
+    
+    @classmethod
+    def _group_turns(cls, turns: list) -> List[dict]:
+        """Collapse turns into one increment row per (ticker, day)."""
+        groups: Dict[Tuple[str, date], dict] = {}
+        
+        for turn in turns:
+            if not turn.ticker_symbol:
+                continue
+            key = (turn.ticker_symbol, turn.created_at.date())
+            row = groups.get(key)
+            if row is None:
+                row = groups[key] = {
+                    "ticker": key[0],
+                    "day": key[1],
+                    "query_count": 0,
+                    "positive_count": 0,
+                    "negative_count": 0,
+                    "neutral_count": 0,
+                    "last_price": None,
+                    "last_change_percent": None,
+                    "last_price_at": None,
+                    "updated_at": datetime.utcnow(),
+                }
+            row["query_count"] += 1
+            column = cls.SENTIMENT_COLUMNS.get(turn.sentiment_result)
+            if column:
+                row[column] += 1
+            if turn.stock_price is not None and (row["last_price_at"] is None or turn.created_at >= row["last_price_at"]):
+                row["last_price"] = turn.stock_price
+                row["last_change_percent"] = turn.change_percent
+                row["last_price_at"] = turn.created_at
+        
+        return list(groups.values())
+    
+    @staticmethod
+    def _upsert_statement(insert):
+        """INSERT ... ON CONFLICT that adds counts and keeps the most recent price snapshot."""
+        table = TickerDailyRollup.__table__
+        stmt = insert(table)
+        excluded = stmt.excluded
+        newer = and_(
+            excluded.last_price_at.isnot(None),
+            or_(table.c.last_price_at.is_(None), excluded.last_price_at >= table.c.last_price_at)
+        )
+        return stmt.on_conflict_do_update(
+            index_elements=["ticker", "day"],
+            set_={
+                "query_count": table.c.query_count + excluded.query_count,
+                "positive_count": table.c.positive_count + excluded.positive_count,
+                "negative_count": table.c.negative_count + excluded.negative_count,
+                "neutral_count": table.c.neutral_count + excluded.neutral_count,
+                "last_price": case((newer, excluded.last_price), else_=table.c.last_price),
+                "last_change_percent": case((newer, excluded.last_change_percent), else_=table.c.last_change_percent),
+                "last_price_at": case((newer, excluded.last_price_at), else_=table.c.last_price_at),
+                "updated_at": excluded.updated_at,
+            }
+        )
+    
+    @staticmethod
+    async def get_summary(db: AsyncSession, days: int = 7, limit: int = 5) -> DashboardSummary:
+        """
+        Build dashboard aggregates for a trailing window of days.
+        
+        Args:
+            db: Async database session
+            days: Number of UTC days to include, today included
+            limit: Number of tickers in each ranking
+        
+        Returns:
+            DashboardSummary computed from the rollup rows in the window
+        """
+        since = datetime.utcnow().date() - timedelta(days=days - 1)
+        result = await db.execute(
+            select(TickerDailyRollup)
+            .where(TickerDailyRollup.day >= since)
+            .order_by(TickerDailyRollup.day)
+        )
+        
+        tickers: Dict[str, TickerSummary] = {}
+        for row in result.scalars():
+            summary = tickers.get(row.ticker)
+            if summary is None:
+                summary = tickers[row.ticker] = TickerSummary(symbol=row.ticker, query_count=0)
+            summary.query_count += row.query_count
+            summary.positive += row.positive_count
+            summary.negative += row.negative_count
+            summary.neutral += row.neutral_count
+            if row.last_price_at and (summary.last_price_at is None or row.last_price_at >= summary.last_price_at):
+                summary.last_price = row.last_price
+                summary.change_percent = row.last_change_percent
+                summary.last_price_at = row.last_price_at
+        
+        summaries = list(tickers.values())
+        priced = [summary for summary in summaries if summary.change_percent is not None]
+        
+        return DashboardSummary(
+            days=days,
+            since=since,
+            total_queries=sum(summary.query_count for summary in summaries),
+            tickers_tracked=len(summaries),
+            sentiment_distribution={
+                "Positive": sum(summary.positive for summary in summaries),
+                "Negative": sum(summary.negative for summary in summaries),
+                "Neutral": sum(summary.neutral for summary in summaries),
+            },
+            top_tickers=sorted(summaries, key=lambda summary: summary.query_count, reverse=True)[:limit],
+            top_movers=sorted(priced, key=lambda summary: summary.change_percent, reverse=True)[:limit],
+            generated_at=datetime.utcnow()
+        )
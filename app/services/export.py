@@ -0,0 +1,157 @@
+import json
+import zlib
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from sqlalchemy import LargeBinary, Text, cast, false, null, select, true, union_all
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.chat import ArchivedChatMessage, ChatSession, ChatMessage
+
+
+class ExportService:
+    """
+    Streams chat history as newline-delimited JSON without materialising it.
+    
+    Messages moved to chat_messages_archive by the retention job are included
+    by default, decompressed and in their place in the session.
+    """
+    
+    @staticmethod
+    def build_query(
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        ticker: Optional[str] = None,
+        session_id: Optional[str] = None,
+        include_archived: bool = True
+    ):
+        """
+        Build the export query, ordered so each session's messages are contiguous.
+        
+        Args:
+            start: Only messages created at or after this time
+            end: Only messages created before this time
+            ticker: Only messages about this ticker
+            session_id: Only messages from this session
+            include_archived: Also read messages from chat_messages_archive
+        
+        Returns:
+            SQLAlchemy select of message and session columns; archived rows carry
+            their compressed payload instead of the text columns
+        """
+        live = select(
+            ChatMessage.id,
+            ChatMessage.session_id,
+            ChatMessage.user_query,
+            ChatMessage.ai_response,
+            ChatMessage.ticker_symbol,
+            ChatMessage.sentiment_result,
+            ChatMessage.created_at,
+            cast(null(), LargeBinary).label("payload"),
+            false().label("archived"),
+        )
+        live = ExportService._filter(live, ChatMessage, start, end, ticker, session_id)
+        
+        if include_archived:
+            archived = select(
+                ArchivedChatMessage.id,
+                ArchivedChatMessage.session_id,
+                cast(null(), Text).label("user_query"),
+                cast(null(), Text).label("ai_response"),
+                ArchivedChatMessage.ticker_symbol,
+                cast(null(), Text).label("sentiment_result"),
+                ArchivedChatMessage.created_at,
+                ArchivedChatMessage.payload,
+                true().label("archived"),
+            )
+            archived = ExportService._filter(archived, ArchivedChatMessage, start, end, ticker, session_id)
+            messages = union_all(live, archived).subquery("messages")
+        else:
+            messages = live.subquery("messages")
+        
+        return (
+            select(
+                messages,
+                ChatSession.created_at.label("session_created_at"),
+                ChatSession.updated_at.label("session_updated_at"),
+            )
+            .join(ChatSession, ChatSession.session_id == messages.c.session_id)
+            .order_by(messages.c.session_id, messages.c.created_at, messages.c.id)
+        )
+    
+    @staticmethod
+    def _filter(stmt, model, start, end, ticker, session_id):
+        """Apply the export filters to a select over ChatMessage or ArchivedChatMessage."""
+        if start:
+            stmt = stmt.where(model.created_at >= start)
+        if end:
+            stmt = stmt.where(model.created_at < end)
+        if ticker:
+            stmt = stmt.where(model.ticker_symbol == ticker.upper())
+        if session_id:
+            stmt = stmt.where(model.session_id == session_id)
+        return stmt
+    
+    @staticmethod
+    async def stream_ndjson(
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        ticker: Optional[str] = None,
+        session_id: Optional[str] = None,
+        include_archived: bool = True
+    ) -> AsyncIterator[bytes]:
+        """
+        Yield the export as NDJSON chunks.
+        
+        A {"type": "session"} line precedes the {"type": "message"} lines of
+        each session. Rows are read through a server-side cursor in
+        partitions of settings.export_yield_per, and each partition is sent as
+        soon as it is fetched, so memory use does not grow with the export.
+        Archived messages are decompressed and marked "archived": true.
+        
+        The generator opens its own database session because it runs after
+        the request's dependencies have been closed.
+        """
+        stmt = ExportService.build_query(start, end, ticker, session_id, include_archived).execution_options(
+            yield_per=settings.export_yield_per
+        )
+        current_session = None
+        
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(stmt)
+            async for partition in result.partitions():
+                lines = []
+                for row in partition:
+                    if row.session_id != current_session:
+                        current_session = row.session_id
+                        lines.append(json.dumps({
+                            "type": "session",
+                            "session_id": row.session_id,
+                            "created_at": _isoformat(row.session_created_at),
+                            "updated_at": _isoformat(row.session_updated_at),
+                        }))
+                    text = (
+                        json.loads(zlib.decompress(row.payload))
+                        if row.archived
+                        else {
+                            "user_query": row.user_query,
+                            "ai_response": row.ai_response,
+                            "sentiment_result": row.sentiment_result,
+                        }
+                    )
+                    lines.append(json.dumps({
+                        "type": "message",
+                        "id": row.id,
+                        "session_id": row.session_id,
+                        "user_query": text["user_query"],
+                        "ai_response": text["ai_response"],
+                        "ticker_symbol": row.ticker_symbol,
+                        "sentiment_result": text["sentiment_result"],
+                        "created_at": _isoformat(row.created_at),
+                        "archived": bool(row.archived),
+                    }))
+                lines.append("")
+                yield "\n".join(lines).encode("utf-8")
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
@@ -0,0 +1,261 @@
+import asyncio
+import importlib.util
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+import orjson
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.logger import logger
+from app.db.session import AsyncSessionLocal
+from app.services.ai_engine import AIEngine
+from app.services.sentiment import SentimentService
+from app.utils.ticker_parser import TickerParser
+
+# Room for the upstream probe results shared between pre-fork workers
+SHARED_RESULTS_BYTES = 16384
+
+
+class ProbeError(RuntimeError):
+    """Probe failure whose message is written by the probe itself and safe to expose."""
+
+
+def redact_error(error: Exception) -> str:
+    """
+    Describe a probe failure without its exception text.
+    
+    Exception messages from HTTP clients and drivers can embed request URLs,
+    credentials or connection strings, and probe results are logged and served
+    by the unauthenticated /health/ endpoint, so only the exception type and
+    the host it concerned are kept.
+    """
+    if isinstance(error, ProbeError):
+        return str(error)
+    description = type(error).__name__
+    url = getattr(getattr(error, "request", None), "url", None)
+    if url:
+        host = urlsplit(str(url)).hostname
+        if host:
+            description += f" ({host})"
+    return description
+
+
+async def _check_database() -> Optional[str]:
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("SELECT 1"))
+
+
+def _check_newsapi() -> Optional[str]:
+    if not settings.newsapi_key:
+        return "not_configured"
+    import requests
+    response = requests.get(
+        "https://newsapi.org/v2/top-headlines",
+        params={"country": "us", "pageSize": 1},
+        headers={"X-Api-Key": settings.newsapi_key},
+        timeout=settings.health_probe_timeout_seconds
+    )
+    if response.status_code != 200:
+        raise ProbeError(f"NewsAPI returned HTTP {response.status_code}")
+
+
+def _check_yfinance() -> Optional[str]:
+    import yfinance as yf
+    if yf.Ticker("AAPL").history(period="1d").empty:
+        raise ProbeError("No quote data returned")
+
+
+def _check_textblob() -> Optional[str]:
+    from textblob import TextBlob
+    TextBlob("Test sentiment analysis").sentiment
+
+
+def _check_transformers() -> Optional[str]:
+    if importlib.util.find_spec("transformers") is None:
+        raise ProbeError("transformers is not installed")
+
+
+class HealthMonitor:
+    """
+    Runs dependency probes on a background schedule and caches the results.
+    
+    All probes run concurrently, each bounded by health_probe_timeout_seconds,
+    every health_probe_interval_seconds. Health endpoints read the cached
+    results, so load balancer polling never reaches NewsAPI or Yahoo Finance.
+    
+    Upstream probes only run where health_upstream_probes_enabled is set.
+    The pre-fork server enables them in one worker, which publishes their
+    results through a buffer shared with the other workers (see share()).
+    """
+    
+    # Probe name -> check; a check raises on failure or returns an alternative status
+    PROBES: Dict[str, Callable] = {
+        "database": _check_database,
+        "newsapi": _check_newsapi,
+        "yfinance": _check_yfinance,
+        "textblob": _check_textblob,
+        "transformers": _check_transformers,
+    }
+    
+    # Probes whose failure makes the instance unable to serve requests
+    CRITICAL = {"database"}
+    
+    # Probes that call third-party services, so they run in one process only
+    UPSTREAM = {"newsapi", "yfinance"}
+    
+    def __init__(self):
+        self._results: Dict[str, dict] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._shared = None
+        self.last_run: Optional[datetime] = None
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def start(self):
+        """Start the probe schedule on the running event loop; the first round runs immediately."""
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if not self.running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+    
+    def share(self):
+        """Allocate the buffer for upstream probe results; call in the pre-fork parent."""
+        from multiprocessing import Array
+        
+        self._shared = Array("c", SHARED_RESULTS_BYTES)
+    
+    async def _run(self):
+        while True:
+            await self.run_probes()
+            await asyncio.sleep(settings.health_probe_interval_seconds)
+    
+    async def run_probes(self):
+        """Run every probe concurrently and replace the cached results."""
+        upstream = settings.health_upstream_probes_enabled
+        results = dict(await asyncio.gather(*(
+            self._probe(name, check) for name, check in self.PROBES.items()
+            if upstream or name not in self.UPSTREAM
+        )))
+        if upstream:
+            self._publish(results)
+        self._results = results
+        self.last_run = datetime.utcnow()
+    
+    def _publish(self, results: Dict[str, dict]):
+        """Hand upstream probe results to the other workers."""
+        if self._shared is None:
+            return
+        data = orjson.dumps({name: result for name, result in results.items() if name in self.UPSTREAM})
+        if len(data) >= SHARED_RESULTS_BYTES:
+            logger.warning("Upstream probe results too large to share (%s bytes)", len(data))
+            return
+        with self._shared.get_lock():
+            self._shared.value = data
+    
+    def _current(self) -> Dict[str, dict]:
+        """This process's probe results plus upstream results published by another worker."""
+        if settings.health_upstream_probes_enabled or self._shared is None or not self._results:
+            return self._results
+        with self._shared.get_lock():
+            data = self._shared.value
+        if not data:
+            return self._results
+        
+        shared = orjson.loads(data)
+        for result in shared.values():
+            result["checked_at"] = datetime.fromisoformat(result["checked_at"])
+        return {**self._results, **shared}
+    
+    async def _probe(self, name: str, check: Callable) -> Tuple[str, dict]:
+        started = time.perf_counter()
+        error = None
+        try:
+            call = check() if asyncio.iscoroutinefunction(check) else run_in_threadpool(check)
+            status = await asyncio.wait_for(call, timeout=settings.health_probe_timeout_seconds) or "healthy"
+        except asyncio.TimeoutError:
+            status, error = "timeout", f"No response within {settings.health_probe_timeout_seconds}s"
+        except Exception as e:
+            status, error = "unhealthy", redact_error(e)
+        
+        if error:
+            logger.warning("%s health probe failed: %s", name, error)
+        
+        return name, {
+            "status": status,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            "checked_at": datetime.utcnow(),
+            "error": error,
+        }
+    
+    def snapshot(self) -> Tuple[str, Dict[str, str]]:
+        """
+        Return the overall status and per-service statuses from the last probe round.
+        
+        Returns:
+            ("starting" before the first round, else "healthy"/"unhealthy") and the service map
+        """
+        results = self._current()
+        if not results:
+            return "starting", {}
+        
+        services = {name: result["status"] for name, result in results.items()}
+        healthy = all(status in ("healthy", "not_configured") for status in services.values())
+        return ("healthy" if healthy else "unhealthy"), services
+    
+    def details(self) -> Dict[str, dict]:
+        """Return the full cached result of every probe."""
+        return dict(self._current())
+    
+    def readiness(self) -> Tuple[bool, dict]:
+        """
+        Decide whether this instance should receive traffic.
+        
+        Ready once critical probes pass, the ticker name matcher is compiled
+        and, when models are warmed at startup, the AI model load has finished
+        (a failed load still serves template summaries) and the sentiment
+        backend is warm.
+        
+        Returns:
+            (ready, checks) where checks describes each condition
+        """
+        critical = {
+            name: self._results.get(name, {}).get("status", "pending")
+            for name in self.CRITICAL
+        }
+        model = AIEngine.model_status()
+        sentiment_ready = SentimentService.get_backend().ready
+        matcher_ready = TickerParser.is_loaded()
+        
+        checks = {
+            **critical,
+            "ai_model": model,
+            "sentiment_backend": "warm" if sentiment_ready else "warming",
+            "ticker_matcher": "warm" if matcher_ready else "cold",
+            "sentiment_cache_entries": len(SentimentService._cache),
+            "probes_checked_at": self.last_run,
+        }
+        # Without startup warm-up the models load on first use, so they cannot gate readiness
+        models_ready = not settings.warm_models_on_startup or (model != "not_loaded" and sentiment_ready)
+        ready = (
+            all(status == "healthy" for status in critical.values())
+            and models_ready
+            and matcher_ready
+        )
+        return ready, checks
+
+
+# Shared monitor, started from the application lifespan
+health_monitor = HealthMonitor()
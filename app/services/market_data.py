@@ -1,24 +1,36 @@
-import yfinance as yf
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
 from app.core.logger import logger
+from app.core.metrics import record_upstream_error, register_single_flight, timed
 from app.schemas.chat import StockData
+from app.utils.single_flight import SingleFlight, single_flight
+
+# Concurrent requests for the same symbol share one Yahoo Finance call
+_quote_flights = SingleFlight("quote")
+register_single_flight(_quote_flights)
 
 
 class MarketDataService:
     """Service for fetching real-time and historical market data."""
     
     @staticmethod
+    @timed("quote_fetch")
+    @single_flight(_quote_flights, key=lambda ticker: ticker.upper())
     def get_stock_data(ticker: str) -> Optional[StockData]:
         """
         Fetch current stock data for a given ticker.
         
+        Concurrent calls for the same ticker are coalesced into one upstream
+        request and share its result.
+        
         Args:
             ticker: Stock ticker symbol
             
         Returns:
             StockData object with current price and change information
         """
+        import yfinance as yf
+        
         try:
             stock = yf.Ticker(ticker.upper())
             
@@ -26,7 +38,7 @@ class MarketDataService:
             hist = stock.history(period="2d")
             
             if hist.empty:
-                logger.warning(f"No data found for ticker: {ticker}")
+                logger.warning("No data found for ticker: %s", ticker)
                 return None
             
             # Get the most recent data
@@ -50,11 +62,12 @@ class MarketDataService:
                 market_cap=info.get('marketCap') if info else None
             )
             
-            logger.info(f"Successfully fetched data for {ticker}: {stock_data.current_price}")
+            logger.info("Successfully fetched data for %s: %s", ticker, stock_data.current_price)
             return stock_data
             
         except Exception as e:
-            logger.error(f"Error fetching market data for {ticker}: {str(e)}")
+            logger.error("Error fetching market data for %s: %s", ticker, e)
+            record_upstream_error("yfinance")
             return None
     
     @staticmethod
@@ -69,6 +82,8 @@ class MarketDataService:
         Returns:
             Dictionary with historical data
         """
+        import yfinance as yf
+        
         try:
             stock = yf.Ticker(ticker.upper())
             hist = stock.history(period=period)
@@ -88,7 +103,7 @@ class MarketDataService:
             return data
             
         except Exception as e:
-            logger.error(f"Error fetching historical data for {ticker}: {str(e)}")
+            logger.error("Error fetching historical data for %s: %s", ticker, e)
             return None
     
     @staticmethod
@@ -102,6 +117,8 @@ class MarketDataService:
         Returns:
             True if ticker is valid, False otherwise
         """
+        import yfinance as yf
+        
         try:
             stock = yf.Ticker(ticker.upper())
             info = stock.info
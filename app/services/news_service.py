@@ -1,9 +1,14 @@
-import requests
 from typing import List, Optional
 from datetime import datetime, timedelta
 from app.core.config import settings
 from app.core.logger import logger
+from app.core.metrics import record_upstream_error, register_single_flight, timed
 from app.schemas.chat import NewsItem
+from app.utils.single_flight import SingleFlight, single_flight
+
+# Concurrent requests for the same news query share one NewsAPI call
+_news_flights = SingleFlight("news")
+register_single_flight(_news_flights)
 
 
 class NewsService:
@@ -11,16 +16,29 @@ class NewsService:
     
     BASE_URL = "https://newsapi.org/v2"
     
+    @staticmethod
+    def _auth_headers() -> dict:
+        """API key as a header, so it never appears in request URLs logged with errors."""
+        return {"X-Api-Key": settings.newsapi_key}
+    
     @classmethod
+    @timed("news_fetch")
+    @single_flight(
+        _news_flights,
+        key=lambda cls, ticker, company_name=None, limit=5: (ticker.upper(), company_name, limit)
+    )
     def get_stock_news(cls, ticker: str, company_name: Optional[str] = None, limit: int = 5) -> List[NewsItem]:
         """
         Fetch recent news related to a stock ticker.
         
+        Concurrent calls for the same query are coalesced into one upstream
+        request and share its result.
+        
         Args:
             ticker: Stock ticker symbol
             company_name: Optional company name for broader search
             limit: Maximum number of articles to return
-            
+        
         Returns:
             List of NewsItem objects
         """
@@ -28,6 +46,8 @@ class NewsService:
             logger.warning("NewsAPI key not configured. Returning empty news list.")
             return []
         
+        import requests
+        
         try:
             # Search for both ticker and company name if provided
             search_queries = [ticker]
@@ -42,11 +62,10 @@ class NewsService:
                     'category': 'business',
                     'language': 'en',
                     'sortBy': 'publishedAt',
-                    'pageSize': limit,
-                    'apiKey': settings.newsapi_key
+                    'pageSize': limit
                 }
                 
-                response = requests.get(f"{cls.BASE_URL}/everything", params=params, timeout=10)
+                response = requests.get(f"{cls.BASE_URL}/everything", params=params, headers=cls._auth_headers(), timeout=10)
                 response.raise_for_status()
                 
                 data = response.json()
@@ -72,12 +91,14 @@ class NewsService:
             
             # Return the most recent articles
             return unique_articles[:limit]
-            
+        
         except requests.exceptions.RequestException as e:
-            logger.error(f"Error fetching news for {ticker}: {str(e)}")
+            logger.error("Error fetching news for %s: %s", ticker, e)
+            record_upstream_error("newsapi")
             return []
         except Exception as e:
-            logger.error(f"Unexpected error in news service: {str(e)}")
+            logger.error("Unexpected error in news service: %s", e)
+            record_upstream_error("newsapi")
             return []
     
     @classmethod
@@ -87,7 +108,7 @@ class NewsService:
         
         Args:
             limit: Maximum number of articles to return
-            
+        
         Returns:
             List of NewsItem objects
         """
@@ -95,15 +116,16 @@ class NewsService:
             logger.warning("NewsAPI key not configured. Returning empty news list.")
             return []
         
+        import requests
+        
         try:
             params = {
                 'country': 'us',
                 'category': 'business',
-                'pageSize': limit,
-                'apiKey': settings.newsapi_key
+                'pageSize': limit
             }
             
-            response = requests.get(f"{cls.BASE_URL}/top-headlines", params=params, timeout=10)
+            response = requests.get(f"{cls.BASE_URL}/top-headlines", params=params, headers=cls._auth_headers(), timeout=10)
             response.raise_for_status()
             
             data = response.json()
@@ -121,10 +143,10 @@ class NewsService:
                     articles.append(news_item)
             
             return articles
-            
+        
         except requests.exceptions.RequestException as e:
-            logger.error(f"Error fetching market news: {str(e)}")
+            logger.error("Error fetching market news: %s", e)
             return []
         except Exception as e:
-            logger.error(f"Unexpected error in news service: {str(e)}")
+            logger.error("Unexpected error in news service: %s", e)
             return []
@@ -0,0 +1,136 @@
+import asyncio
+import re
+from datetime import datetime
+from typing import Dict, Optional, Set, Tuple
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.metrics import QUOTE_STREAM_CLIENTS, QUOTE_STREAM_POLLS, QUOTE_STREAM_SYMBOLS, QUOTE_STREAM_UPDATES
+from app.schemas.chat import StockData
+from app.services.market_data import MarketDataService
+
+SYMBOL_PATTERN = re.compile(r"^[A-Z0-9][A-Z0-9.\-^=]{0,11}$")
+
+
+class QuoteSubscriber:
+    """
+    Pending quote updates for one WebSocket connection.
+    
+    Holds at most one undelivered quote per symbol: a new quote replaces one
+    the client has not been sent yet, so a slow client receives the latest
+    price and its buffer is bounded by the number of symbols it watches.
+    """
+    
+    def __init__(self):
+        self.symbols: Set[str] = set()
+        self._pending: Dict[str, Tuple[StockData, datetime]] = {}
+        self._ready = asyncio.Event()
+    
+    def offer(self, symbol: str, quote: StockData, fetched_at: datetime):
+        if symbol in self._pending:
+            QUOTE_STREAM_UPDATES.inc("superseded")
+        self._pending[symbol] = (quote, fetched_at)
+        self._ready.set()
+    
+    async def next_updates(self) -> Dict[str, Tuple[StockData, datetime]]:
+        """Wait for at least one update and take everything pending."""
+        await self._ready.wait()
+        self._ready.clear()
+        updates, self._pending = self._pending, {}
+        QUOTE_STREAM_UPDATES.inc("delivered", amount=len(updates))
+        return updates
+
+
+class QuoteHub:
+    """
+    Fans quotes out from one poller per symbol to every subscribed connection.
+    
+    The first subscriber to a symbol starts a poller that fetches it through
+    MarketDataService every quote_stream_interval_seconds; the last one to
+    leave stops it. However many clients watch a symbol, each process makes
+    one upstream fetch per interval for it. New subscribers get the last
+    quote immediately instead of waiting for the next poll.
+    
+    State is per process and only touched from the event loop.
+    """
+    
+    def __init__(self):
+        self._subscribers: Dict[str, Set[QuoteSubscriber]] = {}
+        self._pollers: Dict[str, asyncio.Task] = {}
+        self._latest: Dict[str, Tuple[StockData, datetime]] = {}
+        self.clients = 0
+    
+    @staticmethod
+    def normalize(symbol: str) -> Optional[str]:
+        """Upper-case a requested symbol, or None if it cannot be a ticker."""
+        symbol = symbol.strip().upper()
+        return symbol if SYMBOL_PATTERN.match(symbol) else None
+    
+    def connect(self) -> QuoteSubscriber:
+        self.clients += 1
+        return QuoteSubscriber()
+    
+    def disconnect(self, subscriber: QuoteSubscriber):
+        for symbol in list(subscriber.symbols):
+            self.unsubscribe(subscriber, symbol)
+        self.clients -= 1
+    
+    def subscribe(self, subscriber: QuoteSubscriber, symbol: str):
+        if symbol in subscriber.symbols:
+            return
+        subscriber.symbols.add(symbol)
+        self._subscribers.setdefault(symbol, set()).add(subscriber)
+        
+        if symbol in self._latest:
+            subscriber.offer(symbol, *self._latest[symbol])
+        if symbol not in self._pollers:
+            self._pollers[symbol] = asyncio.create_task(self._poll(symbol))
+    
+    def unsubscribe(self, subscriber: QuoteSubscriber, symbol: str):
+        subscriber.symbols.discard(symbol)
+        watchers = self._subscribers.get(symbol)
+        if watchers is None:
+            return
+        watchers.discard(subscriber)
+        if not watchers:
+            del self._subscribers[symbol]
+            self._latest.pop(symbol, None)
+            poller = self._pollers.pop(symbol, None)
+            if poller:
+                poller.cancel()
+    
+    def symbol_count(self) -> int:
+        return len(self._pollers)
+    
+    async def stop(self):
+        """Cancel every poller; called on shutdown."""
+        pollers = list(self._pollers.values())
+        self._pollers.clear()
+        for poller in pollers:
+            poller.cancel()
+        await asyncio.gather(*pollers, return_exceptions=True)
+    
+    async def _poll(self, symbol: str):
+        while True:
+            try:
+                quote = await run_in_threadpool(MarketDataService.get_stock_data, symbol)
+            except Exception as e:
+                logger.error("Error polling quote for %s: %s", symbol, e)
+                quote = None
+            
+            if quote is None:
+                QUOTE_STREAM_POLLS.inc("empty")
+            else:
+                QUOTE_STREAM_POLLS.inc("ok")
+                update = (quote, datetime.utcnow())
+                self._latest[symbol] = update
+                for subscriber in self._subscribers.get(symbol, ()):
+                    subscriber.offer(symbol, *update)
+            
+            await asyncio.sleep(settings.quote_stream_interval_seconds)
+
+
+# Shared hub for the /stream/quotes WebSocket
+quote_hub = QuoteHub()
+QUOTE_STREAM_CLIENTS.set_function(lambda: quote_hub.clients)
+QUOTE_STREAM_SYMBOLS.set_function(quote_hub.symbol_count)
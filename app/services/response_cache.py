@@ -0,0 +1,116 @@
+import re
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+from app.core.config import settings
+from app.core.metrics import register_cache
+from app.schemas.chat import NewsItem, SentimentResult, StockData
+from app.services.ai_engine import Summary
+from app.utils.cache import LRUCache
+from app.utils.ticker_parser import TickerParser
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Words that do not change what is being asked, including the filler of
+# "how is X doing today" style questions, which all ask for an overview
+STOPWORDS = frozenset({
+    "a", "about", "an", "and", "any", "are", "as", "at", "be", "can", "could", "do", "does",
+    "doing", "for", "from", "give", "going", "hey", "hi", "how", "i", "in", "is", "it", "its",
+    "look", "looking", "me", "my", "now", "of", "on", "please", "right", "s", "share", "shares",
+    "so", "stock", "stocks", "tell", "that", "the", "there", "this", "to", "today", "up", "us",
+    "what", "whats", "with", "would", "you",
+})
+
+
+@dataclass
+class CachedResponse:
+    """Generated analysis and the data it was generated from."""
+    ai_summary: Summary
+    stock_data: Optional[StockData] = None
+    sentiment_result: Optional[SentimentResult] = None
+    relevant_news: List[NewsItem] = field(default_factory=list)
+
+
+class ResponseCache:
+    """
+    Full-response cache for the analysis pipeline.
+    
+    Queries that ask the same thing about the same ticker ("how is Apple
+    doing today", "AAPL today?") share one entry, so a hit skips the quote,
+    news, sentiment and generation steps; "should I buy AAPL" and "should I
+    sell AAPL" do not. Entries are keyed on (intent, ticker, epoch): the
+    epoch advances every
+    response_cache_epoch_seconds, so answers are never older than one
+    market-data refresh window and stale epochs age out of the LRU.
+    """
+    
+    _cache = LRUCache(maxsize=settings.response_cache_size)
+    
+    @staticmethod
+    def intent(query: str, ticker: Optional[str]) -> str:
+        """
+        Normalise a query to the intent it expresses, ignoring how the ticker was named.
+        
+        Args:
+            query: User's natural language query
+            ticker: Ticker detected in the query
+        
+        Returns:
+            The query's remaining content words, sorted, or "overview" when none are left
+        """
+        matcher = TickerParser.get_matcher()
+        text = matcher.normalize(query)
+        
+        # Blank out company names so "Apple" and "AAPL" phrase the same question
+        for start, end, _ in reversed(matcher.find_all(query)):
+            text = text[:start] + " " + text[end:]
+        
+        symbol = ticker.lower() if ticker else None
+        words = {
+            word for word in TOKEN_PATTERN.findall(text)
+            if word != symbol and word not in STOPWORDS
+        }
+        return " ".join(sorted(words)) or "overview"
+    
+    @classmethod
+    def key(cls, query: str, ticker: str) -> tuple:
+        epoch = int(time.time() // max(1, settings.response_cache_epoch_seconds))
+        return (cls.intent(query, ticker), ticker, epoch)
+    
+    @classmethod
+    def get(cls, query: str, ticker: Optional[str]) -> Optional[CachedResponse]:
+        """
+        Look up the cached analysis for a query.
+        
+        Args:
+            query: User's natural language query
+            ticker: Ticker detected in the query
+        
+        Returns:
+            CachedResponse for the current epoch, or None
+        """
+        if not settings.response_cache_enabled or ticker is None:
+            return None
+        return cls._cache.get(cls.key(query, ticker))
+    
+    @classmethod
+    def put(cls, query: str, ticker: Optional[str], response: CachedResponse):
+        """
+        Cache a generated analysis.
+        
+        Only model-written analyses of a ticker whose quote was fetched are
+        cached, so a template summary or an upstream outage is not served
+        for the rest of the epoch. Queries without a ticker are not cached.
+        """
+        if not settings.response_cache_enabled or ticker is None:
+            return
+        if response.stock_data is None or response.ai_summary.fallback:
+            return
+        cls._cache.set(cls.key(query, ticker), response)
+    
+    @classmethod
+    def clear(cls):
+        cls._cache.clear()
+
+
+register_cache("response", ResponseCache._cache)
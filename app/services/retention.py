@@ -0,0 +1,120 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, select
+from app.core.config import settings
+from app.core.logger import logger
+from app.db.session import SessionLocal
+from app.models.chat import ChatMessage, ArchivedChatMessage
+
+
+class RetentionService:
+    """Moves old chat messages into the compressed archive table so chat_messages stays small."""
+    
+    @staticmethod
+    def archive_old_messages(max_age_days: Optional[int] = None, batch_size: Optional[int] = None) -> int:
+        """
+        Archive messages older than the retention age, one batch per transaction.
+        
+        Args:
+            max_age_days: Age after which messages are archived; defaults to settings.retention_max_age_days
+            batch_size: Messages moved per transaction; defaults to settings.retention_batch_size
+        
+        Returns:
+            Number of messages archived
+        """
+        max_age_days = max_age_days if max_age_days is not None else settings.retention_max_age_days
+        batch_size = batch_size or settings.retention_batch_size
+        cutoff = datetime.utcnow() - timedelta(days=max_age_days)
+        archived = 0
+        
+        while True:
+            moved = RetentionService._archive_batch(cutoff, batch_size)
+            archived += moved
+            if moved < batch_size:
+                break
+        
+        if archived:
+            logger.info("Archived %s chat messages older than %s", archived, cutoff.isoformat())
+        return archived
+    
+    @staticmethod
+    def _archive_batch(cutoff: datetime, batch_size: int) -> int:
+        """Copy one batch of the oldest expired messages to the archive and delete them."""
+        db = SessionLocal()
+        try:
+            messages = db.execute(
+                select(ChatMessage)
+                .where(ChatMessage.created_at < cutoff)
+                .order_by(ChatMessage.created_at, ChatMessage.id)
+                .limit(batch_size)
+            ).scalars().all()
+            
+            if not messages:
+                return 0
+            
+            db.add_all([
+                ArchivedChatMessage(
+                    id=message.id,
+                    session_id=message.session_id,
+                    ticker_symbol=message.ticker_symbol,
+                    created_at=message.created_at,
+                    payload=ArchivedChatMessage.pack(message)
+                )
+                for message in messages
+            ])
+            db.execute(delete(ChatMessage).where(ChatMessage.id.in_([message.id for message in messages])))
+            db.commit()
+            return len(messages)
+        
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+class RetentionJob:
+    """Runs RetentionService.archive_old_messages on a fixed interval in the background."""
+    
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def start(self):
+        """Start the periodic sweep on the running event loop."""
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            "Chat retention enabled (archive after %s days, every %s minutes)",
+            settings.retention_max_age_days,
+            settings.retention_interval_minutes
+        )
+    
+    async def stop(self):
+        """Cancel the sweep; an in-flight batch commits or rolls back on its own."""
+        if not self.running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+    
+    async def _run(self):
+        while True:
+            try:
+                await run_in_threadpool(RetentionService.archive_old_messages)
+            except Exception as e:
+                logger.error("Chat retention sweep failed: %s", e)
+            await asyncio.sleep(settings.retention_interval_minutes * 60)
+
+
+# Shared retention job, started from the application lifespan when enabled
+retention_job = RetentionJob()
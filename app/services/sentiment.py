@@ -1,55 +1,182 @@
-from textblob import TextBlob
-from typing import List, Dict
+from typing import List, Dict, Optional
+from sqlalchemy.exc import IntegrityError
+from app.core.config import settings
 from app.core.logger import logger
+from app.core.metrics import BATCH_SIZE, SENTIMENT_LOOKUPS, register_cache, timed
+from app.db.session import SessionLocal
+from app.models.sentiment import SentimentScore
 from app.schemas.chat import SentimentResult
+from app.services.sentiment_backends import SentimentBackend, create_backend
+from app.utils.cache import LRUCache, content_hash
 
 
 class SentimentService:
     """Service for analyzing sentiment of financial news and text."""
     
+    # Active scoring backend, created from settings on first use
+    _backend: Optional[SentimentBackend] = None
+    
+    # In-memory cache of scores keyed by (scorer version, content hash)
+    _cache = LRUCache(maxsize=settings.sentiment_cache_size)
+    
+    @classmethod
+    def get_backend(cls) -> SentimentBackend:
+        """Return the active sentiment backend."""
+        if cls._backend is None:
+            cls._backend = create_backend()
+            logger.info("Using sentiment backend: %s", cls._backend.version)
+        return cls._backend
+    
+    @classmethod
+    def set_backend(cls, backend: SentimentBackend):
+        """Replace the active sentiment backend."""
+        cls._backend = backend
+    
+    @classmethod
+    def scorer_version(cls) -> str:
+        """Version tag of the active backend; cached scores are keyed on it."""
+        return cls.get_backend().version
+    
+    @classmethod
+    def warm(cls):
+        """Load the active backend's model so the first request does not pay for it."""
+        try:
+            cls.get_backend().warm()
+        except Exception as e:
+            logger.error("Error warming sentiment backend: %s", e)
+    
     @staticmethod
     def analyze_sentiment(text: str) -> SentimentResult:
         """
         Analyze sentiment of a given text.
         
+        Scores are memoized by content hash in memory and in the database,
+        so the same text is only scored once per scorer version.
+        
         Args:
             text: Text to analyze
             
         Returns:
             SentimentResult object with sentiment classification and confidence
         """
-        try:
-            blob = TextBlob(text)
-            polarity = blob.sentiment.polarity
-            
-            # Classify sentiment based on polarity
-            if polarity > 0.1:
-                sentiment = "Positive"
-            elif polarity < -0.1:
-                sentiment = "Negative"
-            else:
-                sentiment = "Neutral"
-            
-            # Calculate confidence (absolute polarity as confidence score)
-            confidence = abs(polarity)
-            
-            result = SentimentResult(
-                sentiment=sentiment,
-                confidence=round(confidence, 3),
-                polarity=round(polarity, 3)
-            )
-            
-            logger.debug(f"Sentiment analysis: '{text[:50]}...' -> {sentiment} ({polarity:.3f})")
-            return result
+        return SentimentService.analyze_batch([text])[0]
+    
+    @staticmethod
+    @timed("sentiment")
+    def analyze_batch(texts: List[str]) -> List[SentimentResult]:
+        """
+        Analyze sentiment of several texts, reusing cached scores where possible.
+        
+        Args:
+            texts: Texts to analyze
             
+        Returns:
+            List of SentimentResult objects in the same order as texts
+        """
+        backend = SentimentService.get_backend()
+        version = backend.version
+        hashes = [content_hash(text) for text in texts]
+        results: Dict[str, SentimentResult] = {}
+        
+        # 1. In-memory LRU
+        for digest in hashes:
+            if digest not in results:
+                cached = SentimentService._cache.get((version, digest))
+                if cached is not None:
+                    results[digest] = cached
+        
+        memory_hits = len(results)
+        
+        # 2. Persisted scores shared across restarts and workers
+        missing = [digest for digest in dict.fromkeys(hashes) if digest not in results]
+        if missing:
+            for digest, result in SentimentService._load_scores(missing, version).items():
+                results[digest] = result
+                SentimentService._cache.set((version, digest), result)
+        database_hits = len(results) - memory_hits
+        
+        # 3. Score whatever is left in one backend batch and remember it
+        pending = {digest: text for text, digest in zip(texts, hashes) if digest not in results}
+        if pending:
+            BATCH_SIZE.observe(len(pending), "sentiment_inference")
+        scored: Dict[str, SentimentResult] = {}
+        for digest, result in zip(pending, backend.score_batch(list(pending.values()))):
+            if result is None:
+                # Do not memoize failures; fall back to neutral for this call only
+                results[digest] = SentimentResult(sentiment="Neutral", confidence=0.0, polarity=0.0)
+                continue
+            results[digest] = result
+            scored[digest] = result
+            SentimentService._cache.set((version, digest), result)
+        
+        if scored:
+            SentimentService._save_scores(scored, version)
+        
+        SENTIMENT_LOOKUPS.inc("memory", amount=memory_hits)
+        SENTIMENT_LOOKUPS.inc("database", amount=database_hits)
+        SENTIMENT_LOOKUPS.inc("model", amount=len(pending))
+        
+        return [results[digest] for digest in hashes]
+    
+    @staticmethod
+    def _load_scores(hashes: List[str], version: str) -> Dict[str, SentimentResult]:
+        """Load persisted scores for the given content hashes."""
+        if not settings.sentiment_persist or not hashes:
+            return {}
+        
+        db = SessionLocal()
+        try:
+            rows = db.query(SentimentScore).filter(
+                SentimentScore.scorer_version == version,
+                SentimentScore.content_hash.in_(hashes)
+            ).all()
+            return {
+                row.content_hash: SentimentResult(
+                    sentiment=row.sentiment,
+                    confidence=row.confidence,
+                    polarity=row.polarity
+                )
+                for row in rows
+            }
         except Exception as e:
-            logger.error(f"Error analyzing sentiment: {str(e)}")
-            # Return neutral sentiment on error
-            return SentimentResult(
-                sentiment="Neutral",
-                confidence=0.0,
-                polarity=0.0
+            logger.warning("Could not load persisted sentiment scores: %s", e)
+            return {}
+        finally:
+            db.close()
+    
+    @staticmethod
+    def _save_scores(scores: Dict[str, SentimentResult], version: str):
+        """Persist newly computed scores; duplicates written by other workers are ignored."""
+        if not settings.sentiment_persist:
+            return
+        
+        def to_row(digest: str, result: SentimentResult) -> SentimentScore:
+            return SentimentScore(
+                content_hash=digest,
+                scorer_version=version,
+                sentiment=result.sentiment,
+                confidence=result.confidence,
+                polarity=result.polarity
             )
+        
+        db = SessionLocal()
+        try:
+            db.add_all([to_row(digest, result) for digest, result in scores.items()])
+            db.commit()
+        except IntegrityError:
+            # Another worker stored some of these already; keep the rest
+            db.rollback()
+            for digest, result in scores.items():
+                try:
+                    db.add(to_row(digest, result))
+                    db.commit()
+                except IntegrityError:
+                    db.rollback()
+        except Exception as e:
+            logger.warning("Could not persist sentiment scores: %s", e)
+            db.rollback()
+        finally:
+            db.close()
     
     @staticmethod
     def analyze_news_sentiment(news_items: List[str]) -> Dict[str, any]:
@@ -77,11 +204,9 @@ class SentimentService:
         negative_count = 0
         neutral_count = 0
         
-        for text in news_items:
-            if not text.strip():
-                continue
-                
-            result = SentimentService.analyze_sentiment(text)
+        texts = [text for text in news_items if text.strip()]
+        
+        for result in SentimentService.analyze_batch(texts):
             polarities.append(result.polarity)
             
             if result.sentiment == "Positive":
@@ -139,3 +264,6 @@ class SentimentService:
             summary += f"{analysis_result['neutral_count']} neutral articles."
         
         return summary.strip()
+
+
+register_cache("sentiment", SentimentService._cache)
@@ -0,0 +1,349 @@
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from app.core.config import settings
+from app.core.logger import logger
+from app.db.session import SessionLocal
+from app.models.sentiment import TickerSentimentState
+from app.schemas.chat import NewsItem, SentimentResult
+from app.services.sentiment import SentimentService
+from app.utils.cache import LRUCache, content_hash
+
+
+class RollingSentiment:
+    """Compact per-ticker aggregate of time-decayed, source-weighted article sentiment."""
+    
+    __slots__ = (
+        "ticker", "weighted_polarity", "total_weight", "positive_weight",
+        "negative_weight", "neutral_weight", "article_count", "last_article_at",
+        "updated_at", "loaded_at"
+    )
+    
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+        self.weighted_polarity = 0.0
+        self.total_weight = 0.0
+        self.positive_weight = 0.0
+        self.negative_weight = 0.0
+        self.neutral_weight = 0.0
+        self.article_count = 0
+        self.last_article_at: Optional[datetime] = None
+        self.updated_at = datetime.utcnow()
+        self.loaded_at = time.monotonic()
+    
+    @property
+    def average_polarity(self) -> float:
+        return self.weighted_polarity / self.total_weight if self.total_weight > 0 else 0.0
+    
+    def decay_to(self, now: datetime, half_life_seconds: float):
+        """Rescale all decayed sums so they are expressed as of now."""
+        elapsed = (now - self.updated_at).total_seconds()
+        if elapsed > 0:
+            factor = 0.5 ** (elapsed / half_life_seconds)
+            self.weighted_polarity *= factor
+            self.total_weight *= factor
+            self.positive_weight *= factor
+            self.negative_weight *= factor
+            self.neutral_weight *= factor
+        self.updated_at = max(self.updated_at, now)
+    
+    def add(self, result: SentimentResult, weight: float):
+        """Add one scored article with an already decayed weight."""
+        self.weighted_polarity += weight * result.polarity
+        self.total_weight += weight
+        if result.sentiment == "Positive":
+            self.positive_weight += weight
+        elif result.sentiment == "Negative":
+            self.negative_weight += weight
+        else:
+            self.neutral_weight += weight
+        self.article_count += 1
+    
+    def merge(self, other: "RollingSentiment"):
+        """Add another aggregate's articles; both must be decayed to the same time."""
+        self.weighted_polarity += other.weighted_polarity
+        self.total_weight += other.total_weight
+        self.positive_weight += other.positive_weight
+        self.negative_weight += other.negative_weight
+        self.neutral_weight += other.neutral_weight
+        self.article_count += other.article_count
+        if other.last_article_at and (self.last_article_at is None or other.last_article_at > self.last_article_at):
+            self.last_article_at = other.last_article_at
+    
+    def to_result(self) -> SentimentResult:
+        """Summarise the aggregate using the same thresholds as analyze_news_sentiment."""
+        polarity = self.average_polarity
+        if polarity > 0.05:
+            sentiment = "Positive"
+        elif polarity < -0.05:
+            sentiment = "Negative"
+        else:
+            sentiment = "Neutral"
+        
+        return SentimentResult(
+            sentiment=sentiment,
+            confidence=round(abs(polarity), 3),
+            polarity=round(polarity, 3)
+        )
+    
+    @classmethod
+    def from_row(cls, row: TickerSentimentState) -> "RollingSentiment":
+        state = cls(row.ticker)
+        state.weighted_polarity = row.weighted_polarity
+        state.total_weight = row.total_weight
+        state.positive_weight = row.positive_weight
+        state.negative_weight = row.negative_weight
+        state.neutral_weight = row.neutral_weight
+        state.article_count = row.article_count
+        state.last_article_at = row.last_article_at
+        state.updated_at = row.updated_at or datetime.utcnow()
+        return state
+    
+    def to_values(self) -> dict:
+        return {
+            "weighted_polarity": self.weighted_polarity,
+            "total_weight": self.total_weight,
+            "positive_weight": self.positive_weight,
+            "negative_weight": self.negative_weight,
+            "neutral_weight": self.neutral_weight,
+            "article_count": self.article_count,
+            "last_article_at": self.last_article_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class SentimentAggregator:
+    """
+    Maintains rolling per-ticker sentiment, updated incrementally as articles are ingested.
+    
+    Reads are served from an in-memory map only. Callers reload a ticker
+    from the database in the threadpool once its entry is older than
+    sentiment_state_ttl_seconds, so workers converge (see needs_reload).
+    Tickers with no persisted state are remembered as empty entries, so
+    they are not looked up on every request. Ingestion scores only articles
+    newer than the ticker's watermark and folds them into the state.
+    
+    Ingestion is serialised per ticker within a process, and the scored
+    articles are added to the persisted row with a compare-and-set update,
+    so concurrent ingests in other workers merge instead of overwriting.
+    """
+    
+    # Relative trust in news sources; unknown sources get DEFAULT_SOURCE_WEIGHT
+    SOURCE_WEIGHTS = {
+        "reuters": 1.5,
+        "bloomberg": 1.5,
+        "the wall street journal": 1.4,
+        "financial times": 1.4,
+        "cnbc": 1.2,
+        "marketwatch": 1.1,
+        "yahoo entertainment": 0.6,
+    }
+    DEFAULT_SOURCE_WEIGHT = 1.0
+    
+    # Retries of the persisted merge when another worker updates the row first
+    MERGE_ATTEMPTS = 5
+    
+    _states: Dict[str, RollingSentiment] = {}
+    _lock = threading.Lock()
+    _ticker_locks: Dict[str, threading.Lock] = {}
+    
+    # Recently ingested article hashes, to skip duplicates that share a timestamp
+    _seen = LRUCache(maxsize=50000)
+    
+    @classmethod
+    def get(cls, ticker: str) -> Optional[SentimentResult]:
+        """
+        Return the current aggregate sentiment for a ticker.
+        
+        Args:
+            ticker: Stock ticker symbol
+        
+        Returns:
+            SentimentResult, or None if no articles have been ingested for the ticker
+        """
+        state = cls._states.get(ticker.upper())
+        if state is None or state.article_count == 0:
+            return None
+        return state.to_result()
+    
+    @classmethod
+    def needs_reload(cls, ticker: str) -> bool:
+        """Whether the in-memory entry for a ticker is missing or older than sentiment_state_ttl_seconds."""
+        state = cls._states.get(ticker.upper())
+        return state is None or time.monotonic() - state.loaded_at >= settings.sentiment_state_ttl_seconds
+    
+    @classmethod
+    def reload(cls, ticker: str):
+        """Reload a ticker's state from the database; blocking, so run it in the threadpool."""
+        cls._load_state(ticker.upper())
+    
+    @classmethod
+    def ingest(cls, ticker: str, news_items: List[NewsItem]) -> int:
+        """
+        Fold newly seen articles into a ticker's rolling sentiment and persist it.
+        
+        Args:
+            ticker: Stock ticker symbol
+            news_items: Articles fetched for the ticker
+        
+        Returns:
+            Number of articles added to the aggregate
+        """
+        ticker = ticker.upper()
+        
+        with cls._ticker_lock(ticker):
+            now = datetime.utcnow()
+            half_life = settings.sentiment_half_life_hours * 3600
+            
+            # The persisted watermark may have been advanced by another worker
+            state = cls._load_state(ticker)
+            
+            # Only articles newer than the watermark (or undated ones we have not seen)
+            fresh = []
+            for item in news_items:
+                text = f"{item.title} {item.description or ''}".strip()
+                if not text:
+                    continue
+                digest = content_hash(f"{ticker}|{item.url}|{item.title}")
+                if (ticker, digest) in cls._seen:
+                    continue
+                published = cls._parse_published(item.published_at) or now
+                if state.last_article_at and published <= state.last_article_at and item.published_at:
+                    continue
+                fresh.append((item, text, digest, min(published, now)))
+            
+            if not fresh:
+                return 0
+            
+            results = SentimentService.analyze_batch([text for _, text, _, _ in fresh])
+            
+            # Score the new articles on their own, as of now, then merge them in
+            added = RollingSentiment(ticker)
+            added.updated_at = now
+            for (item, _, _, published), result in zip(fresh, results):
+                age = (now - published).total_seconds()
+                added.add(result, cls._source_weight(item.source) * 0.5 ** (age / half_life))
+                if added.last_article_at is None or published > added.last_article_at:
+                    added.last_article_at = published
+            
+            merged = cls._merge_state(added, half_life)
+            
+            with cls._lock:
+                if merged is None:
+                    # Not persisted; serve the articles from memory until the state is reloaded
+                    merged = state
+                    merged.decay_to(now, half_life)
+                    merged.merge(added)
+                for _, _, digest, _ in fresh:
+                    cls._seen.set((ticker, digest), True)
+                merged.loaded_at = time.monotonic()
+                cls._states[ticker] = merged
+        
+        logger.info("Ingested %s articles into rolling sentiment for %s", len(fresh), ticker)
+        return len(fresh)
+    
+    @classmethod
+    def _ticker_lock(cls, ticker: str) -> threading.Lock:
+        with cls._lock:
+            return cls._ticker_locks.setdefault(ticker, threading.Lock())
+    
+    @classmethod
+    def _load_state(cls, ticker: str) -> RollingSentiment:
+        """Load a ticker's persisted state into memory, recording an empty entry when there is none."""
+        db = SessionLocal()
+        try:
+            row = db.get(TickerSentimentState, ticker)
+        except Exception as e:
+            logger.warning("Could not load rolling sentiment for %s: %s", ticker, e)
+            row = None
+        finally:
+            db.close()
+        
+        with cls._lock:
+            if row is not None:
+                state = RollingSentiment.from_row(row)
+            else:
+                # Keep articles that could not be persisted; otherwise remember the miss
+                state = cls._states.get(ticker) or RollingSentiment(ticker)
+                state.loaded_at = time.monotonic()
+            cls._states[ticker] = state
+        return state
+    
+    @classmethod
+    def _merge_state(cls, added: RollingSentiment, half_life: float) -> Optional[RollingSentiment]:
+        """
+        Add newly scored articles to a ticker's persisted state.
+        
+        The row is updated only if it is unchanged since it was read, and
+        re-read and merged again otherwise, so articles ingested by other
+        workers in the meantime are kept.
+        
+        Args:
+            added: Aggregate of the new articles only
+            half_life: Decay half-life in seconds
+        
+        Returns:
+            The merged state as persisted, or None if it could not be saved
+        """
+        for _ in range(cls.MERGE_ATTEMPTS):
+            db = SessionLocal()
+            try:
+                row = db.get(TickerSentimentState, added.ticker)
+                if row is None:
+                    merged = RollingSentiment(added.ticker)
+                    merged.updated_at = added.updated_at
+                    merged.merge(added)
+                    db.add(TickerSentimentState(ticker=added.ticker, **merged.to_values()))
+                    db.commit()
+                    return merged
+                
+                merged = RollingSentiment.from_row(row)
+                merged.decay_to(added.updated_at, half_life)
+                added.decay_to(merged.updated_at, half_life)
+                merged.merge(added)
+                result = db.execute(
+                    update(TickerSentimentState)
+                    .where(
+                        TickerSentimentState.ticker == added.ticker,
+                        TickerSentimentState.updated_at == row.updated_at,
+                        TickerSentimentState.article_count == row.article_count
+                    )
+                    .values(**merged.to_values())
+                    .execution_options(synchronize_session=False)
+                )
+                if result.rowcount == 1:
+                    db.commit()
+                    return merged
+                db.rollback()
+            except IntegrityError:
+                # Another worker created the row first; merge into it on the next attempt
+                db.rollback()
+            except Exception as e:
+                logger.warning("Could not persist rolling sentiment for %s: %s", added.ticker, e)
+                db.rollback()
+                return None
+            finally:
+                db.close()
+        
+        logger.warning("Could not persist rolling sentiment for %s: row kept changing", added.ticker)
+        return None
+    
+    @classmethod
+    def _source_weight(cls, source: str) -> float:
+        return cls.SOURCE_WEIGHTS.get((source or "").lower(), cls.DEFAULT_SOURCE_WEIGHT)
+    
+    @staticmethod
+    def _parse_published(value: str) -> Optional[datetime]:
+        """Parse a NewsAPI publishedAt timestamp into naive UTC."""
+        if not value:
+            return None
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
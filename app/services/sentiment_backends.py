@@ -0,0 +1,254 @@
+import sys
+import threading
+from abc import ABC, abstractmethod
+from typing import List, Optional, Any
+from app.core.config import settings
+from app.core.logger import logger
+from app.schemas.chat import SentimentResult
+
+
+class SentimentBackend(ABC):
+    """Base class for pluggable sentiment scorers used by SentimentService."""
+    
+    name = "base"
+    
+    @property
+    def version(self) -> str:
+        """Identifier stored with persisted scores; changing it forces a rescore."""
+        return self.name
+    
+    @property
+    def ready(self) -> bool:
+        """Whether heavy resources are loaded, so the first request will not pay for it."""
+        return True
+    
+    def warm(self):
+        """Load any heavy resources ahead of the first request."""
+    
+    @abstractmethod
+    def score_batch(self, texts: List[str]) -> List[Optional[SentimentResult]]:
+        """
+        Score a batch of texts.
+        
+        Args:
+            texts: Texts to score
+        
+        Returns:
+            One SentimentResult per text, or None where scoring failed
+        """
+
+
+class TextBlobBackend(SentimentBackend):
+    """Lexicon-based polarity scoring with TextBlob."""
+    
+    name = "textblob"
+    
+    @property
+    def version(self) -> str:
+        return "textblob-polarity:1"
+    
+    @property
+    def ready(self) -> bool:
+        return "textblob" in sys.modules
+    
+    def warm(self):
+        # TextBlob pulls in nltk; import it ahead of the first request
+        import textblob  # noqa: F401
+    
+    def score_batch(self, texts: List[str]) -> List[Optional[SentimentResult]]:
+        return [self._score(text) for text in texts]
+    
+    def _score(self, text: str) -> Optional[SentimentResult]:
+        from textblob import TextBlob
+        
+        try:
+            blob = TextBlob(text)
+            polarity = blob.sentiment.polarity
+            
+            # Classify sentiment based on polarity
+            if polarity > 0.1:
+                sentiment = "Positive"
+            elif polarity < -0.1:
+                sentiment = "Negative"
+            else:
+                sentiment = "Neutral"
+            
+            # Calculate confidence (absolute polarity as confidence score)
+            confidence = abs(polarity)
+            
+            result = SentimentResult(
+                sentiment=sentiment,
+                confidence=round(confidence, 3),
+                polarity=round(polarity, 3)
+            )
+            
+            logger.debug("Sentiment analysis: '%s...' -> %s (%.3f)", text[:50], sentiment, polarity)
+            return result
+        
+        except Exception as e:
+            logger.error("Error analyzing sentiment: %s", e)
+            return None
+
+
+class TransformerSentimentBackend(SentimentBackend):
+    """
+    Financial sentiment from a sequence-classification transformer.
+    
+    Texts are sorted by length and split into buckets of similar length so
+    each batch is padded only to its own longest member.
+    Inference runs on CPU under torch.inference_mode, optionally with
+    dynamic int8 quantization of the linear layers.
+    """
+    
+    name = "transformer"
+    
+    # Label names used by common financial sentiment checkpoints (e.g. FinBERT)
+    LABEL_MAP = {
+        "positive": "Positive",
+        "negative": "Negative",
+        "neutral": "Neutral",
+    }
+    
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        max_length: Optional[int] = None,
+        quantize: Optional[bool] = None,
+        model: Any = None,
+        tokenizer: Any = None
+    ):
+        self.model_name = model_name or settings.sentiment_model
+        self.batch_size = batch_size or settings.sentiment_batch_size
+        self.max_length = max_length or settings.sentiment_max_length
+        self.quantize = settings.sentiment_quantize if quantize is None else quantize
+        self.model = model
+        self.tokenizer = tokenizer
+        self.labels: List[str] = []
+        self._ready = False
+        self._load_lock = threading.Lock()
+    
+    @property
+    def version(self) -> str:
+        return f"transformer:{self.model_name}:{'int8' if self.quantize else 'fp32'}:1"
+    
+    @property
+    def ready(self) -> bool:
+        return self._ready
+    
+    def warm(self):
+        self._load()
+    
+    def _load(self):
+        """
+        Load (and optionally quantize) the model on first use.
+        
+        The warm-up task and the first scoring call can race here; the lock
+        keeps the model from being loaded or quantized twice.
+        """
+        if self._ready:
+            return
+        with self._load_lock:
+            if not self._ready:
+                self._load_model()
+    
+    def _load_model(self):
+        import torch
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+        
+        if self.tokenizer is None:
+            logger.info("Loading sentiment tokenizer: %s", self.model_name)
+            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        if self.model is None:
+            logger.info("Loading sentiment model: %s", self.model_name)
+            self.model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+        
+        self.model.eval()
+        if self.quantize:
+            self.model = torch.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        
+        self.labels = self._resolve_labels(self.model.config)
+        self._ready = True
+        logger.info("Sentiment model ready (%s, labels: %s)", "int8" if self.quantize else "fp32", self.labels)
+    
+    @classmethod
+    def _resolve_labels(cls, config) -> List[str]:
+        """Map model output indices to Positive/Negative/Neutral."""
+        id2label = getattr(config, "id2label", None) or {}
+        names = [str(id2label.get(i, "")).lower() for i in range(config.num_labels)]
+        if all(name in cls.LABEL_MAP for name in names):
+            return [cls.LABEL_MAP[name] for name in names]
+        
+        # Generic LABEL_n heads: assume the usual negative < neutral < positive ordering
+        if config.num_labels == 3:
+            return ["Negative", "Neutral", "Positive"]
+        if config.num_labels == 2:
+            return ["Negative", "Positive"]
+        raise ValueError(f"Unsupported sentiment label set: {names}")
+    
+    def score_batch(self, texts: List[str]) -> List[Optional[SentimentResult]]:
+        if not texts:
+            return []
+        
+        try:
+            self._load()
+            
+            import torch
+            
+            # Length bucketing: batch neighbours of similar length to minimise padding
+            order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+            results: List[Optional[SentimentResult]] = [None] * len(texts)
+            
+            with torch.inference_mode():
+                for start in range(0, len(order), self.batch_size):
+                    bucket = order[start:start + self.batch_size]
+                    batch = self.tokenizer(
+                        [texts[i] for i in bucket],
+                        padding="longest",
+                        truncation=True,
+                        max_length=self.max_length,
+                        return_tensors="pt"
+                    )
+                    logits = self.model(**batch).logits
+                    probs = torch.softmax(logits.float(), dim=-1).tolist()
+                    
+                    for i, row in zip(bucket, probs):
+                        results[i] = self._to_result(row)
+            
+            return results
+        
+        except Exception as e:
+            logger.error("Error in transformer sentiment scoring: %s", e)
+            return [None] * len(texts)
+    
+    def _to_result(self, probs: List[float]) -> SentimentResult:
+        """Convert class probabilities into a SentimentResult."""
+        by_label = dict(zip(self.labels, probs))
+        polarity = by_label.get("Positive", 0.0) - by_label.get("Negative", 0.0)
+        best = max(range(len(probs)), key=probs.__getitem__)
+        
+        return SentimentResult(
+            sentiment=self.labels[best],
+            confidence=round(probs[best], 3),
+            polarity=round(polarity, 3)
+        )
+
+
+def create_backend(name: Optional[str] = None) -> SentimentBackend:
+    """
+    Create the sentiment backend selected in settings.
+    
+    Args:
+        name: Backend name ("textblob" or "transformer"); defaults to settings
+    
+    Returns:
+        SentimentBackend instance
+    """
+    name = (name or settings.sentiment_backend).lower()
+    if name == TextBlobBackend.name:
+        return TextBlobBackend()
+    if name == TransformerSentimentBackend.name:
+        return TransformerSentimentBackend()
+    raise ValueError(f"Unknown sentiment backend: {name}")
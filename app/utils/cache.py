@@ -0,0 +1,64 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+def content_hash(text: str) -> str:
+    """
+    Compute a stable content hash for a piece of text.
+    
+    Args:
+        text: Text to hash
+    
+    Returns:
+        Hex-encoded SHA-256 digest of the UTF-8 encoded text
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """Thread-safe, size-bounded least-recently-used cache."""
+    
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = max(0, maxsize)
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Optional[Any]:
+        """Return the cached value for key and mark it as recently used."""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """Insert or refresh a value, evicting the least recently used entry if full."""
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Remove all entries and reset statistics."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+    
+    def __len__(self) -> int:
+        return len(self._data)
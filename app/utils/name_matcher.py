@@ -0,0 +1,126 @@
+from array import array
+from collections import deque
+from typing import Dict, List, Tuple
+
+
+class CompanyNameMatcher:
+    """
+    Aho-Corasick automaton mapping company names to tickers.
+    
+    All names are compiled into a single automaton, so a query is scanned once
+    in time linear in its length (plus the number of matches) regardless of
+    how many names are loaded. Matches must start and end on word boundaries,
+    so "metal" does not match "meta".
+    
+    Transitions are kept in one flat dict keyed by (state << 21 | codepoint)
+    and per-state data in typed arrays, which keeps the memory footprint
+    manageable for tens of thousands of issuer names.
+    """
+    
+    _SHIFT = 21  # enough bits for any Unicode codepoint
+    
+    def __init__(self, names: Dict[str, str]):
+        self._goto: Dict[int, int] = {}
+        self._fail = array("i", [0])
+        self._out = array("i", [-1])  # index into _patterns of the longest name ending here
+        self._dict_link = array("i", [-1])  # nearest fail-ancestor that ends a name
+        self._patterns: List[Tuple[int, str]] = []  # (length, ticker)
+        
+        for name, ticker in names.items():
+            self._add(self.normalize(name), ticker)
+        self._build_links()
+    
+    def __len__(self) -> int:
+        return len(self._patterns)
+    
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Lowercase and collapse whitespace so names and queries compare alike."""
+        return " ".join(text.lower().split())
+    
+    def _add(self, name: str, ticker: str):
+        if not name:
+            return
+        state = 0
+        for char in name:
+            key = (state << self._SHIFT) | ord(char)
+            nxt = self._goto.get(key)
+            if nxt is None:
+                nxt = len(self._fail)
+                self._goto[key] = nxt
+                self._fail.append(0)
+                self._out.append(-1)
+                self._dict_link.append(-1)
+            state = nxt
+        if self._out[state] == -1:
+            self._out[state] = len(self._patterns)
+            self._patterns.append((len(name), ticker))
+    
+    def _build_links(self):
+        """Compute failure and dictionary-suffix links breadth first."""
+        children: Dict[int, List[Tuple[int, int]]] = {}
+        mask = (1 << self._SHIFT) - 1
+        for key, child in self._goto.items():
+            children.setdefault(key >> self._SHIFT, []).append((key & mask, child))
+        
+        queue = deque()
+        for _, child in children.get(0, []):
+            queue.append(child)
+        
+        while queue:
+            state = queue.popleft()
+            for codepoint, child in children.get(state, []):
+                fallback = self._fail[state]
+                while fallback and ((fallback << self._SHIFT) | codepoint) not in self._goto:
+                    fallback = self._fail[fallback]
+                target = self._goto.get((fallback << self._SHIFT) | codepoint, 0)
+                self._fail[child] = target if target != child else 0
+                
+                link = self._fail[child]
+                self._dict_link[child] = link if self._out[link] != -1 else self._dict_link[link]
+                queue.append(child)
+    
+    def find_all(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        Find company names in text.
+        
+        Args:
+            text: Text to scan
+        
+        Returns:
+            Non-overlapping (start, end, ticker) matches in the normalized text,
+            ordered by position, preferring the longest name at each start
+        """
+        text = self.normalize(text)
+        goto, fail, out, dict_link = self._goto, self._fail, self._out, self._dict_link
+        shift = self._SHIFT
+        candidates = []
+        
+        state = 0
+        for end, char in enumerate(text):
+            codepoint = ord(char)
+            while state and ((state << shift) | codepoint) not in goto:
+                state = fail[state]
+            state = goto.get((state << shift) | codepoint, 0)
+            
+            hit = state if out[state] != -1 else dict_link[state]
+            while hit != -1:
+                length, ticker = self._patterns[out[hit]]
+                start = end - length + 1
+                if self._is_boundary(text, start - 1) and self._is_boundary(text, end + 1):
+                    candidates.append((start, end + 1, ticker))
+                hit = dict_link[hit]
+        
+        # Leftmost-longest, non-overlapping
+        candidates.sort(key=lambda match: (match[0], -match[1]))
+        matches = []
+        last_end = 0
+        for start, end, ticker in candidates:
+            if start >= last_end:
+                matches.append((start, end, ticker))
+                last_end = end
+        return matches
+    
+    @staticmethod
+    def _is_boundary(text: str, index: int) -> bool:
+        return index < 0 or index >= len(text) or not text[index].isalnum()
@@ -0,0 +1,88 @@
+import threading
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one execution.
+    
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is running (followers) block until it finishes and get the
+    same result object, or the same exception re-raised. Nothing is cached:
+    once the call completes, the next caller starts a new one. Thread-safe, for
+    the blocking service calls made from the threadpool.
+    """
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.leaders = 0
+        self.followers = 0
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+    
+    def do(self, key: Hashable, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run func(*args, **kwargs), or wait for the identical call already in flight.
+        
+        Args:
+            key: Identifies calls that are interchangeable
+            func: Function to call when no call for key is in flight
+        
+        Returns:
+            The (possibly shared) result of func
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                leader = True
+            else:
+                self.followers += 1
+                leader = False
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+    
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+def single_flight(group: SingleFlight, key: Callable[..., Hashable]):
+    """
+    Decorator routing calls through a SingleFlight group.
+    
+    Args:
+        group: Group shared by all callers of the function
+        key: Called with the function's arguments; equal keys are coalesced
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return group.do(key(*args, **kwargs), func, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,5 +1,12 @@
+import csv
+import json
 import re
-from typing import Optional, List
+import threading
+from typing import Optional, List, Dict
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.metrics import timed
+from app.utils.name_matcher import CompanyNameMatcher
 
 
 class TickerParser:
@@ -8,7 +15,13 @@ class TickerParser:
     # Common stock ticker patterns
     TICKER_PATTERN = re.compile(r'\b[A-Z]{1,5}\b')
     
-    # Common company name to ticker mappings (can be extended)
+    # Explicit cashtags such as $F, trusted even for single-letter symbols
+    CASHTAG_PATTERN = re.compile(r'\$([A-Za-z]{1,5})\b')
+    
+    # Common words that match the ticker pattern but are not tickers
+    COMMON_WORDS = {'THE', 'AND', 'FOR', 'ARE', 'BUT', 'NOT', 'YOU', 'ALL', 'CAN', 'HER', 'WAS', 'ONE', 'OUR', 'OUT', 'DAY', 'GET', 'HAS', 'HIM', 'HIS', 'HOW', 'ITS', 'MAY', 'NEW', 'NOW', 'OLD', 'SEE', 'TWO', 'WAY', 'WHO', 'BOY', 'DID', 'ITS', 'LET', 'PUT', 'SAY', 'SHE', 'TOO', 'USE'}
+    
+    # Common company name to ticker mappings (extended from settings.company_tickers_file)
     COMPANY_TICKERS = {
         'apple': 'AAPL',
         'microsoft': 'MSFT',
@@ -27,31 +40,83 @@ class TickerParser:
         'nasdaq': 'QQQ'
     }
     
+    _matcher: Optional[CompanyNameMatcher] = None
+    _lock = threading.Lock()
+    
     @classmethod
+    def load(cls, path: Optional[str] = None) -> CompanyNameMatcher:
+        """
+        Compile the company name automaton. Called once at startup.
+        
+        Args:
+            path: Optional CSV (name,ticker) or JSON ({name: ticker}) file;
+                defaults to settings.company_tickers_file
+        
+        Returns:
+            The compiled CompanyNameMatcher
+        """
+        with cls._lock:
+            names = dict(cls.COMPANY_TICKERS)
+            path = path or settings.company_tickers_file
+            if path:
+                try:
+                    names.update(cls._read_names(path))
+                except Exception as e:
+                    logger.error("Error loading company names from %s: %s", path, e)
+            
+            cls._matcher = CompanyNameMatcher(names)
+            logger.info("Loaded %s company names for ticker matching", len(cls._matcher))
+            return cls._matcher
+    
+    @classmethod
+    def get_matcher(cls) -> CompanyNameMatcher:
+        """Return the compiled automaton, building it on first use if startup did not."""
+        if cls._matcher is None:
+            cls.load()
+        return cls._matcher
+    
+    @classmethod
+    def is_loaded(cls) -> bool:
+        """Whether the name automaton has been compiled."""
+        return cls._matcher is not None
+    
+    @staticmethod
+    def _read_names(path: str) -> Dict[str, str]:
+        """Read a name-to-ticker dictionary from a CSV or JSON file."""
+        if path.endswith(".json"):
+            with open(path, encoding="utf-8") as f:
+                return {str(name): str(ticker).upper() for name, ticker in json.load(f).items()}
+        
+        names = {}
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.reader(f):
+                if len(row) < 2 or row[0].strip().lower() == "name":
+                    continue
+                names[row[0].strip()] = row[1].strip().upper()
+        return names
+    
+    @classmethod
+    @timed("ticker_parse")
     def extract_ticker(cls, query: str) -> Optional[str]:
         """
         Extract ticker symbol from user query.
         
         Args:
             query: User's natural language query
-            
+        
         Returns:
             Ticker symbol if found, None otherwise
         """
-        query_lower = query.lower()
-        
         # First check for company names in our mapping
-        for company, ticker in cls.COMPANY_TICKERS.items():
-            if company in query_lower:
-                return ticker
+        matches = cls.get_matcher().find_all(query)
+        if matches:
+            return matches[0][2]
         
         # Then look for ticker patterns (all caps, 1-5 letters)
         potential_tickers = cls.TICKER_PATTERN.findall(query)
         
         # Filter out common words that might match the pattern
-        common_words = {'THE', 'AND', 'FOR', 'ARE', 'BUT', 'NOT', 'YOU', 'ALL', 'CAN', 'HER', 'WAS', 'ONE', 'OUR', 'OUT', 'DAY', 'GET', 'HAS', 'HIM', 'HIS', 'HOW', 'ITS', 'MAY', 'NEW', 'NOW', 'OLD', 'SEE', 'TWO', 'WAY', 'WHO', 'BOY', 'DID', 'ITS', 'LET', 'PUT', 'SAY', 'SHE', 'TOO', 'USE'}
-        
-        valid_tickers = [ticker for ticker in potential_tickers if ticker not in common_words]
+        valid_tickers = [ticker for ticker in potential_tickers if ticker not in cls.COMMON_WORDS]
         
         if valid_tickers:
             # Return the first valid ticker found
@@ -60,30 +125,41 @@ class TickerParser:
         return None
     
     @classmethod
+    @timed("ticker_parse")
     def extract_multiple_tickers(cls, query: str) -> List[str]:
         """
         Extract multiple ticker symbols from user query.
         
         Args:
             query: User's natural language query
-            
+        
+        Bare single capital letters (the "S" and "P" of "S&P", or "I") are only
+        accepted as explicit cashtags like $F, since each symbol returned here
+        costs its own upstream lookups.
+        
         Returns:
-            List of ticker symbols found
+            List of ticker symbols found: company names, then cashtags, then
+            other ticker-like words
         """
-        tickers = set()
-        query_lower = query.lower()
+        tickers = []
         
-        # Check for company names
-        for company, ticker in cls.COMPANY_TICKERS.items():
-            if company in query_lower:
-                tickers.add(ticker)
+        # Check for company names, on the same whitespace-collapsed text the matcher scans
+        text = " ".join(query.split())
+        matches = cls.get_matcher().find_all(text)
+        for _, _, ticker in matches:
+            tickers.append(ticker)
         
-        # Check for ticker patterns
-        potential_tickers = cls.TICKER_PATTERN.findall(query)
-        common_words = {'THE', 'AND', 'FOR', 'ARE', 'BUT', 'NOT', 'YOU', 'ALL', 'CAN', 'HER', 'WAS', 'ONE', 'OUR', 'OUT', 'DAY', 'GET', 'HAS', 'HIM', 'HIS', 'HOW', 'ITS', 'MAY', 'NEW', 'NOW', 'OLD', 'SEE', 'TWO', 'WAY', 'WHO', 'BOY', 'DID', 'ITS', 'LET', 'PUT', 'SAY', 'SHE', 'TOO', 'USE'}
+        # Blank out the names found so their letters are not read as tickers again
+        if len(text.lower()) == len(text):
+            for start, end, _ in matches:
+                text = text[:start] + " " * (end - start) + text[end:]
+        
+        for ticker in cls.CASHTAG_PATTERN.findall(text):
+            tickers.append(ticker.upper())
         
-        for ticker in potential_tickers:
-            if ticker not in common_words:
-                tickers.add(ticker)
+        # Check for ticker patterns
+        for ticker in cls.TICKER_PATTERN.findall(text):
+            if len(ticker) > 1 and ticker not in cls.COMMON_WORDS:
+                tickers.append(ticker)
         
-        return list(tickers)
+        return list(dict.fromkeys(tickers))
@@ -0,0 +1 @@
+"""Benchmarks for InvestAI. Run from the project root, e.g. `python -m benchmarks.bench_sentiment`."""
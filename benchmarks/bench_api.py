@@ -0,0 +1,352 @@
+"""
+End-to-end API benchmark, fully offline.
+
+Boots the FastAPI app in-process (lifespan included) against a temporary
+SQLite database, with yfinance and NewsAPI replaced by local stand-ins that
+sleep for --upstream-latency-ms and a tiny randomly initialised GPT-2 in
+place of the real model. Requests go through httpx's ASGI transport, so the
+numbers cover routing, middleware, services and the database but no sockets.
+
+For each endpoint (/chat/, /query/, /chat/sessions/, /health/) and each
+concurrency level, a closed loop of clients sends --requests requests and
+the throughput, error count, p50/p95/p99 latency and admission outcomes are
+reported. Micro-benchmarks then time TickerParser, sentiment scoring, prompt
+building and generation on their own.
+
+The response cache is off unless --response-cache is given, so /chat/ and
+/query/ measure the full pipeline. Admission control stays as configured;
+requests it degrades to the template summary are counted in each result.
+
+Usage:
+    python -m benchmarks.bench_api --output api.json
+    python -m benchmarks.bench_api --endpoints chat health --concurrency 1 16 --requests 500
+    python -m benchmarks.bench_api --output after.json --compare before.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+
+QUERIES = [
+    "How is Apple doing today?",
+    "AAPL today?",
+    "Should I buy Tesla before earnings?",
+    "What's the latest news on Nvidia?",
+    "Is MSFT a good long term investment?",
+    "How are Amazon shares performing this week?",
+    "What is the market sentiment around Meta?",
+    "Give me an overview of Netflix",
+    "Is GOOGL overvalued right now?",
+    "Tell me about the S&P and the Nasdaq",
+]
+
+ENDPOINTS = ("chat", "query", "sessions", "health")
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(q / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def configure_environment(directory: str, args):
+    """Settings for the in-process app; must run before anything imports app.core.config."""
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(directory, 'bench.db')}",
+        "LOG_LEVEL": "WARNING",
+        "WARM_MODELS_ON_STARTUP": "False",
+        "HEALTH_PROBE_INTERVAL_SECONDS": "3600",
+        "RETENTION_ENABLED": "False",
+        "PROFILING_ENABLED": "False",
+        "RESPONSE_CACHE_ENABLED": str(args.response_cache),
+    })
+    if args.model:
+        os.environ["HUGGINGFACE_MODEL"] = args.model
+
+
+def install_stubs(args):
+    """Swap the upstream providers and, unless --model is given, the GPT-2 model."""
+    from benchmarks.stubs import install_ai_engine, install_fake_newsapi, install_fake_yfinance, tiny_gpt2
+    from benchmarks.bench_sentiment import make_corpus
+    
+    latency = args.upstream_latency_ms / 1000
+    install_fake_yfinance(latency)
+    install_fake_newsapi(latency)
+    
+    if args.model:
+        from app.services.ai_engine import AIEngine
+        AIEngine().warm()
+    else:
+        install_ai_engine(*tiny_gpt2(QUERIES + make_corpus(500)))
+    
+    # AIEngine passes both max_length and max_new_tokens; transformers warns on every call
+    from transformers.utils import logging as transformers_logging
+    transformers_logging.set_verbosity_error()
+
+
+def seed_sessions(count: int, messages_per_session: int):
+    """Insert chat history so /chat/sessions/ pages have realistic content."""
+    from app.db.session import SessionLocal
+    from app.models.chat import ChatMessage, ChatSession
+    
+    started = datetime.utcnow() - timedelta(days=7)
+    with SessionLocal() as db:
+        for i in range(count):
+            session_id = f"seed-{i:05d}"
+            db.add(ChatSession(session_id=session_id, created_at=started, updated_at=started + timedelta(minutes=i)))
+            db.add_all(
+                ChatMessage(
+                    session_id=session_id,
+                    user_query=QUERIES[(i + j) % len(QUERIES)],
+                    ai_response="AAPL is currently trading at $227.52, up 1.34%. " * 4,
+                    ticker_symbol="AAPL",
+                    sentiment_result="Positive",
+                    created_at=started + timedelta(minutes=i, seconds=j)
+                )
+                for j in range(messages_per_session)
+            )
+        db.commit()
+
+
+def request_factory(endpoint: str, rng: random.Random) -> Callable[[], Tuple[str, str, dict]]:
+    """Return a function producing (method, path, json body) for the endpoint."""
+    session_ids = [f"bench-{i:03d}" for i in range(32)]
+    
+    if endpoint == "chat":
+        return lambda: ("POST", "/chat/", {"query": rng.choice(QUERIES), "session_id": rng.choice(session_ids)})
+    if endpoint == "query":
+        return lambda: ("POST", "/query/", {"query": rng.choice(QUERIES), "user_id": rng.randint(1, 100)})
+    if endpoint == "sessions":
+        return lambda: ("GET", "/chat/sessions/?limit=20", None)
+    return lambda: ("GET", "/health/", None)
+
+
+def admission_counts() -> Dict[str, float]:
+    from app.core.metrics import ADMISSION_DECISIONS
+    from app.services.admission import PRIORITY_RANK
+    
+    return {
+        decision: sum(ADMISSION_DECISIONS.value(decision, priority) for priority in PRIORITY_RANK)
+        for decision in ("admitted", "degraded", "shed")
+    }
+
+
+async def run_scenario(client, make_request, concurrency: int, total: int) -> dict:
+    """Send total requests from concurrency closed-loop clients."""
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    issued = itertools.count()
+    
+    async def worker():
+        while next(issued) < total:
+            method, path, body = make_request()
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                statuses[response.status_code] += 1
+            except Exception as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - started)
+    
+    before = admission_counts()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    after = admission_counts()
+    
+    latencies.sort()
+    errors = sum(count for status, count in statuses.items() if not (isinstance(status, int) and status < 400))
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        "throughput_rps": round(len(latencies) / wall, 2),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies) * 1000, 3),
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p95": round(percentile(latencies, 95) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3),
+        },
+        "admission": {decision: int(after[decision] - before[decision]) for decision in after},
+    }
+
+
+async def run_endpoints(args) -> List[dict]:
+    import httpx
+    from app.main import app
+    
+    results = []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for endpoint in args.endpoints:
+                make_request = request_factory(endpoint, random.Random(args.seed))
+                await run_scenario(client, make_request, 1, args.warmup)
+                for concurrency in args.concurrency:
+                    result = {"endpoint": endpoint, **await run_scenario(client, make_request, concurrency, args.requests)}
+                    results.append(result)
+                    latency = result["latency_ms"]
+                    print(
+                        f"{endpoint:9s} c={concurrency:<4d} {result['throughput_rps']:>9.1f} req/s  "
+                        f"p50 {latency['p50']:>8.2f}  p95 {latency['p95']:>8.2f}  p99 {latency['p99']:>8.2f} ms  "
+                        f"errors {result['errors']}  degraded {result['admission']['degraded']}"
+                    )
+    return results
+
+
+def time_operation(name: str, operation: Callable[[int], None], iterations: int) -> dict:
+    """Time operation(i) for i in range(iterations), after a short warm-up."""
+    for i in range(min(10, iterations)):
+        operation(i)
+    started = time.perf_counter()
+    for i in range(iterations):
+        operation(i)
+    elapsed = time.perf_counter() - started
+    
+    result = {
+        "name": name,
+        "iterations": iterations,
+        "us_per_op": round(elapsed / iterations * 1e6, 3),
+        "ops_per_second": round(iterations / elapsed, 1),
+    }
+    print(f"{name:24s} {result['us_per_op']:>12.2f} us/op  {result['ops_per_second']:>12.1f} ops/s")
+    return result
+
+
+def run_micro(iterations: int, generations: int) -> List[dict]:
+    from benchmarks.bench_sentiment import make_corpus
+    from app.schemas.chat import NewsItem, SentimentResult, StockData
+    from app.services.ai_engine import AIEngine
+    from app.services.sentiment import SentimentService
+    from app.services.sentiment_backends import TextBlobBackend
+    from app.utils.ticker_parser import TickerParser
+    
+    headlines = make_corpus(1000)
+    engine = AIEngine()
+    backend = TextBlobBackend()
+    stock = StockData(symbol="AAPL", current_price=227.52, change_percent=1.34, volume=51234567, market_cap=3_400_000_000_000)
+    news = [
+        NewsItem(title=title, description=title, source="Benchmark Wire", published_at="2026-01-05T09:00:00Z", url="https://example.com")
+        for title in headlines[:3]
+    ]
+    sentiment = SentimentResult(sentiment="Positive", confidence=0.71, polarity=0.42)
+    
+    def summary_args(i: int):
+        return QUERIES[i % len(QUERIES)], "AAPL", stock, news, sentiment
+    
+    return [
+        time_operation("ticker_parser", lambda i: TickerParser.extract_ticker(QUERIES[i % len(QUERIES)]), iterations),
+        time_operation("sentiment_textblob", lambda i: backend.score_batch([headlines[i % len(headlines)]]), iterations // 10),
+        time_operation("sentiment_service", lambda i: SentimentService.analyze_sentiment(headlines[i % len(headlines)]), iterations),
+        time_operation("prompt_build", lambda i: engine._build_prompt(*summary_args(i)), iterations),
+        time_operation("template_summary", lambda i: engine.generate_investment_summary(*summary_args(i), use_model=False), iterations),
+        time_operation("generation", lambda i: engine.generate_investment_summary(*summary_args(i)), generations),
+    ]
+
+
+def compare(results: dict, baseline_path: str):
+    """Print changes against a previous --output file."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    
+    print(f"\nCompared with {baseline_path} ({baseline['meta'].get('git_revision', 'unknown')})")
+    previous = {(row["endpoint"], row["concurrency"]): row for row in baseline.get("endpoints", [])}
+    for row in results["endpoints"]:
+        old = previous.get((row["endpoint"], row["concurrency"]))
+        if old is None:
+            continue
+        print(
+            f"{row['endpoint']:9s} c={row['concurrency']:<4d} throughput "
+            f"{_change(old['throughput_rps'], row['throughput_rps'])}  p50 "
+            f"{_change(old['latency_ms']['p50'], row['latency_ms']['p50'])}  p99 "
+            f"{_change(old['latency_ms']['p99'], row['latency_ms']['p99'])}"
+        )
+    
+    previous_micro = {row["name"]: row for row in baseline.get("micro", [])}
+    for row in results["micro"]:
+        old = previous_micro.get(row["name"])
+        if old is not None:
+            print(f"{row['name']:24s} us/op {_change(old['us_per_op'], row['us_per_op'])}")
+
+
+def _change(old: float, new: float) -> str:
+    if not old:
+        return "n/a"
+    return f"{(new - old) / old * 100:+7.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint and concurrency level")
+    parser.add_argument("--warmup", type=int, default=10, help="untimed requests per endpoint")
+    parser.add_argument("--upstream-latency-ms", type=float, default=20, help="simulated yfinance/NewsAPI round trip")
+    parser.add_argument("--seed-sessions", type=int, default=200, help="chat sessions inserted before the run")
+    parser.add_argument("--response-cache", action="store_true", help="leave the response cache enabled")
+    parser.add_argument("--model", default=None, help="real GPT-2 checkpoint instead of the tiny random model")
+    parser.add_argument("--micro-iterations", type=int, default=20000)
+    parser.add_argument("--generations", type=int, default=20, help="timed model generations in the micro-benchmarks")
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default=None, help="write results as JSON to this path")
+    parser.add_argument("--compare", default=None, help="previous --output file to compare against")
+    args = parser.parse_args()
+    
+    directory = tempfile.mkdtemp(prefix="investai-bench-")
+    configure_environment(directory, args)
+    random.seed(args.seed)
+    
+    install_stubs(args)
+    # Importing the app creates the schema in the temporary database
+    import app.main  # noqa: F401
+    seed_sessions(args.seed_sessions, 10)
+    
+    results = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "model": args.model or "tiny-random-gpt2",
+            "args": vars(args),
+        },
+        "endpoints": asyncio.run(run_endpoints(args)),
+        "micro": [] if args.skip_micro else run_micro(args.micro_iterations, args.generations),
+    }
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Concurrency benchmark for the database engine.
+
+Runs several writer threads (chat-turn inserts with one commit each) alongside
+reader threads (session history lookups) against a temporary SQLite file, once
+per journal mode, and reports write/read throughput and lock errors.
+
+Usage:
+    python -m benchmarks.bench_db --writers 4 --readers 4 --seconds 5
+    python -m benchmarks.bench_db --modes DELETE,WAL --output db.json
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.session import create_db_engine
+from app.models.chat import ChatSession, ChatMessage
+
+
+def run_mode(journal_mode: str, writers: int, readers: int, seconds: float) -> dict:
+    """Run the mixed workload against a fresh database in the given journal mode."""
+    directory = tempfile.mkdtemp(prefix="investai-bench-")
+    engine = create_db_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}", journal_mode=journal_mode)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    
+    session_ids = [str(uuid.uuid4()) for _ in range(50)]
+    with Session() as db:
+        db.add_all(ChatSession(session_id=session_id) for session_id in session_ids)
+        db.commit()
+    
+    counts = {"writes": 0, "reads": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+    
+    def bump(key: str):
+        with lock:
+            counts[key] += 1
+    
+    def writer():
+        rng = random.Random()
+        while time.perf_counter() < deadline:
+            try:
+                with Session() as db:
+                    db.add(ChatMessage(
+                        session_id=rng.choice(session_ids),
+                        user_query="How is Apple doing today?",
+                        ai_response="AAPL is trading higher. " * 10,
+                        ticker_symbol="AAPL",
+                        sentiment_result="Positive"
+                    ))
+                    db.commit()
+                bump("writes")
+            except Exception:
+                bump("errors")
+    
+    def reader():
+        rng = random.Random()
+        while time.perf_counter() < deadline:
+            try:
+                with Session() as db:
+                    db.query(ChatMessage).filter(
+                        ChatMessage.session_id == rng.choice(session_ids)
+                    ).order_by(ChatMessage.created_at).limit(50).all()
+                bump("reads")
+            except Exception:
+                bump("errors")
+    
+    threads = [threading.Thread(target=writer) for _ in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+    
+    return {
+        "writes_per_second": round(counts["writes"] / seconds, 1),
+        "reads_per_second": round(counts["reads"] / seconds, 1),
+        "errors": counts["errors"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--modes", default="DELETE,WAL", help="SQLite journal modes to compare")
+    parser.add_argument("--output", default=None, help="write results as JSON to this path")
+    args = parser.parse_args()
+    
+    results = {"writers": args.writers, "readers": args.readers, "seconds": args.seconds, "modes": {}}
+    for mode in args.modes.split(","):
+        results["modes"][mode] = run_mode(mode, args.writers, args.readers, args.seconds)
+        stats = results["modes"][mode]
+        print(f"{mode:8s} writes/s {stats['writes_per_second']:>8.1f}  reads/s {stats['reads_per_second']:>8.1f}  errors {stats['errors']}")
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
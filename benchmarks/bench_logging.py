@@ -0,0 +1,163 @@
+"""
+Logging burst benchmark.
+
+Emits a burst of records from several threads into a deliberately slow stream
+(each write sleeps, like a blocked stdout pipe) and reports the time callers
+spend inside logger.info() with the previous synchronous StreamHandler and
+with the queue-based pipeline from app.core.logger. Also measures a disabled
+logger.debug() with an eager f-string versus lazy %-style arguments.
+
+Usage:
+    python -m benchmarks.bench_logging --records 5000 --threads 8 --write-delay-us 200
+"""
+
+import argparse
+import json
+import logging
+import logging.handlers
+import queue
+import statistics
+import threading
+import time
+
+from app.core.logger import JsonFormatter, NonBlockingQueueHandler
+
+
+class SlowStream:
+    """File-like sink whose writes take a fixed time."""
+    
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.lines = 0
+    
+    def write(self, text: str):
+        time.sleep(self.delay)
+        self.lines += 1
+    
+    def flush(self):
+        pass
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def burst(logger: logging.Logger, records: int, threads: int) -> dict:
+    """Log from several threads at once and collect per-call latencies."""
+    latencies = []
+    lock = threading.Lock()
+    per_thread = records // threads
+    
+    def worker(index: int):
+        local = []
+        for i in range(per_thread):
+            started = time.perf_counter()
+            logger.info("Processed chat request for session %s, ticker: %s", index, i)
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+    
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    
+    return {
+        "burst_seconds": round(elapsed, 4),
+        "call_mean_us": round(statistics.mean(latencies) * 1e6, 2),
+        "call_p99_us": round(percentile(latencies, 0.99) * 1e6, 2),
+        "call_max_us": round(max(latencies) * 1e6, 2),
+    }
+
+
+def make_logger(name: str, handler: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+def bench_sync(args) -> dict:
+    stream = SlowStream(args.write_delay_us / 1e6)
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter())
+    return burst(make_logger("bench.sync", handler), args.records, args.threads)
+
+
+def bench_queued(args) -> dict:
+    stream = SlowStream(args.write_delay_us / 1e6)
+    log_queue = queue.Queue(maxsize=args.queue_size)
+    handler = NonBlockingQueueHandler(log_queue)
+    stream_handler = logging.StreamHandler(stream)
+    stream_handler.setFormatter(JsonFormatter())
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    try:
+        result = burst(make_logger("bench.queued", handler), args.records, args.threads)
+    finally:
+        listener.stop()
+    result["written"] = stream.lines
+    result["dropped"] = handler.dropped
+    return result
+
+
+def bench_disabled_debug(iterations: int) -> dict:
+    logger = make_logger("bench.debug", logging.NullHandler())
+    text, sentiment, polarity = "Apple beats earnings expectations " * 4, "POSITIVE", 0.4321
+    
+    started = time.perf_counter()
+    for _ in range(iterations):
+        logger.debug(f"Sentiment analysis: '{text[:50]}...' -> {sentiment} ({polarity:.3f})")
+    eager = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    for _ in range(iterations):
+        logger.debug("Sentiment analysis: '%s...' -> %s (%.3f)", text[:50], sentiment, polarity)
+    lazy = time.perf_counter() - started
+    
+    return {
+        "fstring_ns": round(eager / iterations * 1e9, 1),
+        "lazy_ns": round(lazy / iterations * 1e9, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--write-delay-us", type=float, default=200.0, help="simulated cost of each stdout write")
+    parser.add_argument("--queue-size", type=int, default=10000)
+    parser.add_argument("--output", default=None, help="write results as JSON to this path")
+    args = parser.parse_args()
+    
+    results = {
+        "records": args.records,
+        "threads": args.threads,
+        "write_delay_us": args.write_delay_us,
+        "sync": bench_sync(args),
+        "queued": bench_queued(args),
+        "disabled_debug": bench_disabled_debug(200000),
+    }
+    
+    for mode in ("sync", "queued"):
+        r = results[mode]
+        print(
+            f"{mode:7s} burst {r['burst_seconds']:.3f}s  call mean {r['call_mean_us']:.1f}us  "
+            f"p99 {r['call_p99_us']:.1f}us  max {r['call_max_us']:.1f}us"
+        )
+    print(f"queued  written {results['queued']['written']}  dropped {results['queued']['dropped']}")
+    debug = results["disabled_debug"]
+    print(f"disabled debug: f-string {debug['fstring_ns']:.0f}ns/call  lazy {debug['lazy_ns']:.0f}ns/call")
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Throughput benchmark: TextBlob vs. the batched transformer sentiment backend.
+
+Scores a synthetic corpus of financial headlines with each backend, bypassing
+the SentimentService caches, and reports texts per second.
+
+Usage:
+    python -m benchmarks.bench_sentiment                      # tiny random model, offline
+    python -m benchmarks.bench_sentiment --model ProsusAI/finbert --texts 2000
+    python -m benchmarks.bench_sentiment --output sentiment.json
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Dict, List
+
+from app.services.sentiment_backends import SentimentBackend, TextBlobBackend, TransformerSentimentBackend
+
+SUBJECTS = ["Apple", "Tesla", "Nvidia", "Microsoft", "Amazon", "The Fed", "Chipmakers", "Bank stocks"]
+VERBS = ["surges", "slumps", "beats estimates", "misses forecasts", "holds steady", "cuts guidance", "raises outlook"]
+TAILS = [
+    "after quarterly earnings",
+    "as investors weigh rate cuts and a slowing economy",
+    "on strong demand for data center chips across cloud providers",
+    "amid supply chain concerns",
+    "following an analyst downgrade citing margin pressure, weaker unit sales and rising competition in key markets",
+    "",
+]
+
+
+def make_corpus(count: int, seed: int = 7) -> List[str]:
+    """Generate synthetic headlines with a realistic spread of lengths."""
+    rng = random.Random(seed)
+    return [
+        f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(TAILS)}".strip()
+        for _ in range(count)
+    ]
+
+
+def measure(backend: SentimentBackend, texts: List[str], repeats: int) -> Dict[str, float]:
+    """Score texts repeatedly and return the best observed throughput."""
+    backend.warm()
+    backend.score_batch(texts[:8])  # warm-up
+    
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        backend.score_batch(texts)
+        best = min(best, time.perf_counter() - start)
+    
+    return {
+        "seconds": round(best, 4),
+        "texts_per_second": round(len(texts) / best, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=512, help="number of headlines to score")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--model", default=None, help="pretrained checkpoint; defaults to a tiny random model")
+    parser.add_argument("--batch-sizes", default="1,16,64")
+    parser.add_argument("--output", default=None, help="write results as JSON to this path")
+    args = parser.parse_args()
+    
+    texts = make_corpus(args.texts)
+    results = {"texts": len(texts), "model": args.model or "tiny-random-bert", "backends": {}}
+    
+    results["backends"]["textblob"] = measure(TextBlobBackend(), texts, args.repeats)
+    
+    for quantize in (False, True):
+        for batch_size in (int(size) for size in args.batch_sizes.split(",")):
+            if args.model:
+                backend = TransformerSentimentBackend(args.model, batch_size=batch_size, quantize=quantize)
+            else:
+                from benchmarks.stubs import tiny_sentiment_model
+                model, tokenizer = tiny_sentiment_model(texts)
+                backend = TransformerSentimentBackend(
+                    "tiny-random-bert", batch_size=batch_size, quantize=quantize,
+                    model=model, tokenizer=tokenizer
+                )
+            name = f"transformer-{'int8' if quantize else 'fp32'}-bs{batch_size}"
+            results["backends"][name] = measure(backend, texts, args.repeats)
+    
+    for name, stats in results["backends"].items():
+        print(f"{name:28s} {stats['texts_per_second']:>10.1f} texts/s  ({stats['seconds']:.3f}s)")
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Serialization benchmark for session history responses.
+
+Measures the CPU cost of turning a session history of 10, 1k and 100k
+messages into response bytes with:
+
+  baseline  ORM messages -> ChatSessionResponse -> FastAPI response_model
+            handling (dump, re-validation, jsonable_encoder) -> JSONResponse
+  orjson    the same path with ORJSONResponse as the response class
+  trusted   plain row dicts -> TrustedJSONResponse, as /chat/sessions/{id} does
+
+All variants must produce identical JSON. Database time is excluded.
+
+Usage:
+    python -m benchmarks.bench_serialization --sizes 10 1000 100000 --repeat 3
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.api.chat import MESSAGE_FIELDS
+from app.core.responses import TrustedJSONResponse
+from app.models.chat import ChatMessage
+from app.schemas.chat import ChatSessionResponse
+
+SESSION_ID = "5f0c7a52-1f7e-4a8e-9b35-2b1d3c4e5f60"
+CREATED_AT = datetime(2026, 1, 5, 9, 30, 0, 123456)
+
+RESPONSE_FIELD = create_model_field("response", ChatSessionResponse, mode="serialization")
+
+# One loop for every call, so loop setup is not counted as serialization
+LOOP = asyncio.new_event_loop()
+
+
+def make_messages(count: int) -> list:
+    """Detached ORM rows shaped like real chat turns."""
+    return [
+        ChatMessage(
+            id=i + 1,
+            session_id=SESSION_ID,
+            user_query="How is Apple doing after earnings?",
+            ai_response=(
+                "AAPL is currently trading at $227.52, up 1.34%. Recent news includes 3 relevant "
+                "articles. Latest headline: Apple beats estimates on services growth. Market "
+                "sentiment appears positive with 71.2% confidence."
+            ),
+            ticker_symbol="AAPL",
+            sentiment_result="Positive",
+            created_at=CREATED_AT + timedelta(seconds=i * 7)
+        )
+        for i in range(count)
+    ]
+
+
+def fastapi_path(messages: list, response_class) -> bytes:
+    response = ChatSessionResponse(
+        session_id=SESSION_ID,
+        created_at=CREATED_AT,
+        updated_at=CREATED_AT,
+        messages=messages
+    )
+    content = LOOP.run_until_complete(
+        serialize_response(field=RESPONSE_FIELD, response_content=response, is_coroutine=True)
+    )
+    return response_class(content).body
+
+
+def baseline(messages: list, rows: list) -> bytes:
+    return fastapi_path(messages, JSONResponse)
+
+
+def orjson_default(messages: list, rows: list) -> bytes:
+    return fastapi_path(messages, ORJSONResponse)
+
+
+def trusted(messages: list, rows: list) -> bytes:
+    return TrustedJSONResponse({
+        "session_id": SESSION_ID,
+        "created_at": CREATED_AT,
+        "updated_at": CREATED_AT,
+        "message_count": None,
+        "messages": [dict(zip(MESSAGE_FIELDS, row)) for row in rows],
+    }).body
+
+
+VARIANTS = {"baseline": baseline, "orjson": orjson_default, "trusted": trusted}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000])
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per variant (median is reported)")
+    parser.add_argument("--output", default=None, help="write results as JSON to this path")
+    args = parser.parse_args()
+    
+    results = []
+    for size in args.sizes:
+        messages = make_messages(size)
+        # What the history endpoint reads: tuples in MESSAGE_FIELDS order
+        rows = [tuple(getattr(message, field) for field in MESSAGE_FIELDS) for message in messages]
+        # Small sizes are too fast to time individually
+        loops = max(1, 10000 // size)
+        
+        outputs = {name: variant(messages, rows) for name, variant in VARIANTS.items()}
+        expected = json.loads(outputs["baseline"])
+        for name, body in outputs.items():
+            if json.loads(body) != expected:
+                raise SystemExit(f"{name} output differs from baseline for {size} messages")
+        
+        timings = {}
+        for name, variant in VARIANTS.items():
+            runs = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                for _ in range(loops):
+                    variant(messages, rows)
+                runs.append((time.perf_counter() - started) / loops)
+            timings[name] = statistics.median(runs)
+        
+        result = {
+            "messages": size,
+            "bytes": len(outputs["baseline"]),
+            "ms": {name: round(seconds * 1000, 3) for name, seconds in timings.items()},
+            "speedup_vs_baseline": {
+                name: round(timings["baseline"] / seconds, 2) for name, seconds in timings.items()
+            },
+        }
+        results.append(result)
+        
+        print(f"{size:>7} messages ({result['bytes'] / 1024:,.0f} KiB)")
+        for name in VARIANTS:
+            print(f"  {name:9s} {result['ms'][name]:10.3f} ms  x{result['speedup_vs_baseline'][name]:.2f}")
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Startup benchmark for `import app.main`.
+
+Imports the application in fresh interpreters (so nothing is cached in
+sys.modules), reports the wall-clock import time, the slowest modules from
+`python -X importtime`, and whether any heavy library was imported eagerly.
+With --budget it doubles as a regression check: the exit status is 1 when
+the median import time exceeds the budget or a heavy library is imported at
+startup, so it can run in CI.
+
+Usage:
+    python -m benchmarks.bench_startup --runs 5 --top 15
+    python -m benchmarks.bench_startup --budget 2.0 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+# Libraries that must only be imported when their service is first used or warmed
+HEAVY_MODULES = ("torch", "transformers", "yfinance", "pandas", "textblob", "nltk", "requests")
+
+PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def run_once(root: str, env: dict) -> dict:
+    """Import app.main in a fresh interpreter and collect timings."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=root,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["modules"] = parse_importtime(completed.stderr)
+    return result
+
+
+def parse_importtime(stderr: str) -> dict:
+    """Parse `-X importtime` output into {module: (self_us, cumulative_us)}."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def by_package(modules: dict) -> dict:
+    """Sum self time per top-level package, in seconds."""
+    totals = defaultdict(int)
+    for name, (self_us, _) in modules.items():
+        totals[name.split(".")[0]] += self_us
+    return {package: us / 1e6 for package, us in totals.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="number of modules/packages to list")
+    parser.add_argument("--budget", type=float, default=None, help="fail if the median import time exceeds this many seconds")
+    parser.add_argument("--allow-heavy", action="store_true", help="do not fail when heavy libraries are imported eagerly")
+    parser.add_argument("--output", default=None, help="write results as JSON to this path")
+    args = parser.parse_args()
+    
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    directory = tempfile.mkdtemp(prefix="investai-bench-")
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(directory, 'startup.db')}")
+    
+    runs = [run_once(root, env) for _ in range(args.runs)]
+    seconds = [run["seconds"] for run in runs]
+    median = statistics.median(seconds)
+    # Report module detail from the run closest to the median
+    representative = min(runs, key=lambda run: abs(run["seconds"] - median))
+    modules = representative["modules"]
+    
+    slowest_app = sorted(
+        ((name, cumulative / 1e6) for name, (_, cumulative) in modules.items() if name.startswith("app")),
+        key=lambda item: item[1],
+        reverse=True
+    )[:args.top]
+    slowest_packages = sorted(by_package(modules).items(), key=lambda item: item[1], reverse=True)[:args.top]
+    heavy = representative["heavy"]
+    
+    print(f"import app.main: median {median:.3f}s  min {min(seconds):.3f}s  max {max(seconds):.3f}s  ({args.runs} runs)")
+    print("\nSlowest app modules (cumulative):")
+    for name, value in slowest_app:
+        print(f"  {value:8.3f}s  {name}")
+    print("\nSlowest packages (self time):")
+    for name, value in slowest_packages:
+        print(f"  {value:8.3f}s  {name}")
+    print(f"\nHeavy libraries imported at startup: {', '.join(heavy) if heavy else 'none'}")
+    
+    results = {
+        "runs": args.runs,
+        "median_seconds": round(median, 4),
+        "seconds": [round(value, 4) for value in seconds],
+        "slowest_app_modules": dict(slowest_app),
+        "slowest_packages": dict(slowest_packages),
+        "heavy_imported": heavy,
+        "budget_seconds": args.budget,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    
+    failures = []
+    if args.budget is not None and median > args.budget:
+        failures.append(f"median import time {median:.3f}s exceeds budget {args.budget:.3f}s")
+    if heavy and not args.allow_heavy:
+        failures.append(f"heavy libraries imported at startup: {', '.join(heavy)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Micro-benchmark for TickerParser company-name matching.
+
+Compares the compiled Aho-Corasick matcher against the previous linear scan
+(`name in query` for every name) over a synthetic universe of issuer names.
+
+Usage:
+    python -m benchmarks.bench_ticker_parser --names 50000 --queries 2000
+"""
+
+import argparse
+import json
+import random
+import string
+import time
+
+from app.utils.name_matcher import CompanyNameMatcher
+from app.utils.ticker_parser import TickerParser
+
+QUERIES = [
+    "How is Apple doing today?",
+    "compare nvidia, microsoft and the s&p",
+    "Any news on {name} this week?",
+    "Should I buy {name} or {other} before earnings season starts next month?",
+    "what is the outlook for metal and mining stocks",
+]
+
+
+def make_names(count: int, seed: int = 11) -> dict:
+    """Generate a synthetic name-to-ticker universe on top of the built-in names."""
+    rng = random.Random(seed)
+    suffixes = ["holdings", "group", "inc", "corp", "technologies", "capital", "energy", "bancorp"]
+    names = dict(TickerParser.COMPANY_TICKERS)
+    while len(names) < count:
+        word = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+        ticker = "".join(rng.choice(string.ascii_uppercase) for _ in range(rng.randint(2, 5)))
+        names[f"{word} {rng.choice(suffixes)}"] = ticker
+    return names
+
+
+def linear_scan(names: dict, query: str):
+    query_lower = query.lower()
+    for company, ticker in names.items():
+        if company in query_lower:
+            return ticker
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--names", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--output", default=None, help="write results as JSON to this path")
+    args = parser.parse_args()
+    
+    names = make_names(args.names)
+    rng = random.Random(3)
+    pool = list(names)
+    queries = [
+        rng.choice(QUERIES).format(name=rng.choice(pool), other=rng.choice(pool))
+        for _ in range(args.queries)
+    ]
+    
+    start = time.perf_counter()
+    matcher = CompanyNameMatcher(names)
+    build_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for query in queries:
+        matcher.find_all(query)
+    automaton_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for query in queries:
+        linear_scan(names, query)
+    linear_seconds = time.perf_counter() - start
+    
+    results = {
+        "names": len(names),
+        "queries": len(queries),
+        "build_seconds": round(build_seconds, 4),
+        "automaton_us_per_query": round(automaton_seconds / len(queries) * 1e6, 2),
+        "linear_scan_us_per_query": round(linear_seconds / len(queries) * 1e6, 2),
+    }
+    print(json.dumps(results, indent=2))
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
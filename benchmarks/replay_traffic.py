@@ -0,0 +1,197 @@
+"""
+Replay recorded traffic against a running instance.
+
+Reads JSONL files written by the traffic recorder (TRAFFIC_RECORD_ENABLED),
+merges them by arrival time and re-issues every request open-loop: each
+request is sent at its scheduled time whether or not earlier ones have
+finished, as real clients would. Schedules:
+
+  --speed 1     recorded inter-arrival times (the default)
+  --speed N     the same sequence N times faster
+  --rate R      ignore recorded timing and send R requests per second
+
+Reports throughput, latency percentiles, status codes and error rates
+overall and per route, plus how far sends lagged behind the schedule (a
+large lag means the replaying machine, not the server, is the bottleneck).
+Requests whose bodies were too large to record are skipped.
+
+Usage:
+    python -m benchmarks.replay_traffic recordings/traffic.jsonl --url http://localhost:8000
+    python -m benchmarks.replay_traffic recordings/*.jsonl --speed 5 --output replay.json
+    python -m benchmarks.replay_traffic recordings/traffic.jsonl --rate 50 --limit 2000
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import statistics
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.bench_api import percentile
+
+# Pseudonymised IDs in recorded paths, grouped under one route
+SESSION_SEGMENT = re.compile(r"/sessions/[^/]+")
+
+
+def load_recordings(paths: List[str], limit: int = 0) -> List[dict]:
+    entries = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    entries.append(json.loads(line))
+    entries.sort(key=lambda entry: entry["ts"])
+    return entries[:limit] if limit else entries
+
+
+def route_of(entry: dict) -> str:
+    return f"{entry['method']} {SESSION_SEGMENT.sub('/sessions/{session_id}', entry['path'])}"
+
+
+def schedule(entries: List[dict], speed: float, rate: float) -> List[float]:
+    """Send offsets in seconds from the start of the replay."""
+    if rate:
+        return [i / rate for i in range(len(entries))]
+    first = entries[0]["ts"]
+    return [(entry["ts"] - first) / speed for entry in entries]
+
+
+def summarize(samples: List[dict], wall: float) -> dict:
+    latencies = sorted(sample["latency"] for sample in samples)
+    statuses = Counter(sample["status"] for sample in samples)
+    errors = sum(count for status, count in statuses.items() if not isinstance(status, int) or status >= 500)
+    return {
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / wall, 2) if wall else 0.0,
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "client_errors": sum(count for status, count in statuses.items() if isinstance(status, int) and 400 <= status < 500),
+        "status_changed": sum(1 for sample in samples if sample["status"] != sample["recorded_status"]),
+        "statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p90": round(percentile(latencies, 90) * 1000, 3),
+            "p95": round(percentile(latencies, 95) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        },
+    }
+
+
+async def replay(entries: List[dict], offsets: List[float], args) -> dict:
+    samples: List[dict] = []
+    lags: List[float] = []
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        async def send(entry: dict, due: float):
+            lags.append(max(0.0, time.perf_counter() - due))
+            path = entry["path"] + (f"?{entry['query']}" if entry.get("query") else "")
+            started = time.perf_counter()
+            try:
+                response = await client.request(entry["method"], path, json=entry.get("body"))
+                status = response.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            samples.append({
+                "route": route_of(entry),
+                "status": status,
+                "recorded_status": entry.get("status"),
+                "latency": time.perf_counter() - started,
+            })
+        
+        tasks = []
+        started = time.perf_counter()
+        for entry, offset in zip(entries, offsets):
+            due = started + offset
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(send(entry, due)))
+        await asyncio.gather(*tasks)
+        wall = time.perf_counter() - started
+    
+    by_route: Dict[str, List[dict]] = defaultdict(list)
+    for sample in samples:
+        by_route[sample["route"]].append(sample)
+    
+    lags.sort()
+    return {
+        "overall": summarize(samples, wall),
+        "routes": {route: summarize(route_samples, wall) for route, route_samples in sorted(by_route.items())},
+        "schedule_lag_ms": {
+            "p50": round(percentile(lags, 50) * 1000, 3),
+            "p99": round(percentile(lags, 99) * 1000, 3),
+            "max": round(lags[-1] * 1000, 3) if lags else 0.0,
+        },
+        "wall_seconds": round(wall, 3),
+    }
+
+
+def print_report(results: dict):
+    def line(name: str, stats: dict):
+        latency = stats["latency_ms"]
+        print(
+            f"{name:36s} {stats['requests']:>7d} req {stats['throughput_rps']:>8.1f} req/s  "
+            f"p50 {latency['p50']:>8.2f}  p95 {latency['p95']:>8.2f}  p99 {latency['p99']:>8.2f} ms  "
+            f"errors {stats['error_rate'] * 100:5.1f}%"
+        )
+    
+    for route, stats in results["routes"].items():
+        line(route, stats)
+    line("overall", results["overall"])
+    lag = results["schedule_lag_ms"]
+    print(f"schedule lag p50 {lag['p50']:.2f} ms, p99 {lag['p99']:.2f} ms, max {lag['max']:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recordings", nargs="+", help="JSONL files written by the traffic recorder")
+    parser.add_argument("--url", default="http://localhost:8000", help="base URL of the instance under test")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--speed", type=float, default=1.0, help="replay N times faster than recorded")
+    group.add_argument("--rate", type=float, default=0.0, help="fixed open-loop rate in requests per second")
+    parser.add_argument("--limit", type=int, default=0, help="replay only the first N requests")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    parser.add_argument("--max-in-flight", type=int, default=512, help="client connection limit")
+    parser.add_argument("--output", default=None, help="write results as JSON to this path")
+    args = parser.parse_args()
+    
+    if args.speed <= 0 or args.rate < 0:
+        parser.error("--speed must be positive and --rate non-negative")
+    
+    entries = load_recordings(args.recordings, args.limit)
+    replayable = [entry for entry in entries if not entry.get("body_omitted")]
+    if not replayable:
+        raise SystemExit("No replayable requests in the recordings")
+    
+    offsets = schedule(replayable, args.speed, args.rate)
+    mode = f"{args.rate:g} req/s" if args.rate else f"{args.speed:g}x"
+    print(
+        f"Replaying {len(replayable)} requests ({len(entries) - len(replayable)} skipped) against "
+        f"{args.url} at {mode}, about {offsets[-1]:.1f}s"
+    )
+    
+    results = asyncio.run(replay(replayable, offsets, args))
+    results["meta"] = {
+        "recordings": args.recordings,
+        "url": args.url,
+        "mode": mode,
+        "skipped": len(entries) - len(replayable),
+    }
+    print_report(results)
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Offline stand-ins used by the benchmarks.
+
+Models are built in-process from random weights and a vocabulary derived
+from the benchmark corpus, so no model downloads are needed. yfinance and
+NewsAPI are replaced at the library boundary, so the services' own parsing,
+coalescing and error handling still run.
+"""
+
+import random
+import sys
+import time
+import types
+from typing import List
+
+
+def build_tokenizer(corpus: List[str], wrap: bool = True):
+    """
+    Build a small word-level fast tokenizer covering the words in corpus.
+    
+    Args:
+        corpus: Texts whose words make up the vocabulary
+        wrap: Add [CLS]/[SEP] around every sequence, as BERT classifiers expect
+    """
+    from tokenizers import Tokenizer, models, normalizers, pre_tokenizers, processors
+    from transformers import PreTrainedTokenizerFast
+    
+    specials = ["[PAD]", "[UNK]", "[CLS]", "[SEP]"]
+    words = sorted({word.lower() for text in corpus for word in text.split()})
+    vocab = {token: i for i, token in enumerate(specials + words)}
+    
+    tokenizer = Tokenizer(models.WordLevel(vocab=vocab, unk_token="[UNK]"))
+    tokenizer.normalizer = normalizers.Lowercase()
+    tokenizer.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+    if wrap:
+        tokenizer.post_processor = processors.TemplateProcessing(
+            single="[CLS] $A [SEP]",
+            special_tokens=[("[CLS]", vocab["[CLS]"]), ("[SEP]", vocab["[SEP]"])]
+        )
+    
+    return PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer,
+        unk_token="[UNK]",
+        pad_token="[PAD]",
+        cls_token="[CLS]",
+        sep_token="[SEP]"
+    )
+
+
+def tiny_sentiment_model(corpus: List[str], num_labels: int = 3):
+    """
+    Build a tiny randomly initialised BERT sequence classifier.
+    
+    Returns:
+        (model, tokenizer) tuple
+    """
+    from transformers import BertConfig, BertForSequenceClassification
+    
+    tokenizer = build_tokenizer(corpus)
+    config = BertConfig(
+        vocab_size=len(tokenizer),
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        max_position_embeddings=512,
+        num_labels=num_labels,
+        pad_token_id=tokenizer.pad_token_id
+    )
+    return BertForSequenceClassification(config), tokenizer
+
+
+def tiny_gpt2(corpus: List[str]):
+    """
+    Build a tiny randomly initialised GPT-2 language model.
+    
+    Returns:
+        (model, tokenizer) tuple; [SEP] doubles as the end-of-text token
+    """
+    from transformers import GPT2Config, GPT2LMHeadModel
+    
+    tokenizer = build_tokenizer(corpus, wrap=False)
+    tokenizer.eos_token = "[SEP]"
+    config = GPT2Config(
+        vocab_size=len(tokenizer),
+        n_positions=1024,
+        n_embd=64,
+        n_layer=2,
+        n_head=2,
+        bos_token_id=tokenizer.eos_token_id,
+        eos_token_id=tokenizer.eos_token_id
+    )
+    return GPT2LMHeadModel(config), tokenizer
+
+
+def install_ai_engine(model, tokenizer):
+    """Make the AIEngine singleton generate with the given model instead of loading one."""
+    from transformers import pipeline
+    from app.core.config import settings
+    from app.services.ai_engine import AIEngine
+    
+    engine = AIEngine()
+    engine.model, engine.tokenizer = model, tokenizer
+    engine.generator = pipeline(
+        "text-generation",
+        model=model,
+        tokenizer=tokenizer,
+        max_length=settings.max_tokens,
+        temperature=settings.temperature,
+        num_return_sequences=1,
+        pad_token_id=tokenizer.eos_token_id,
+        do_sample=True,
+        top_p=0.92,
+        top_k=50
+    )
+    AIEngine._loaded = True
+    return engine
+
+
+class _FakeTicker:
+    """yfinance.Ticker stand-in returning a two-day price history."""
+    
+    latency = 0.0
+    
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.info = {"marketCap": 1_000_000_000 + hash(symbol) % 10**9}
+    
+    def history(self, period: str = "1mo"):
+        import pandas as pd
+        
+        time.sleep(self.latency)
+        days = 2 if period in ("1d", "2d") else 22
+        close = [100.0 + random.uniform(-3, 3) for _ in range(days)]
+        return pd.DataFrame(
+            {
+                "Open": close,
+                "High": [price * 1.01 for price in close],
+                "Low": [price * 0.99 for price in close],
+                "Close": close,
+                "Volume": [random.randint(10**6, 10**7) for _ in range(days)],
+            },
+            index=pd.date_range(end="2026-01-05", periods=days, freq="D")
+        )
+
+
+def install_fake_yfinance(latency: float = 0.0):
+    """
+    Replace the yfinance module with an offline stand-in.
+    
+    Args:
+        latency: Seconds each history() call sleeps, like a round trip to Yahoo
+    """
+    _FakeTicker.latency = latency
+    module = types.ModuleType("yfinance")
+    module.Ticker = _FakeTicker
+    sys.modules["yfinance"] = module
+
+
+HEADLINES = [
+    "{ticker} beats estimates on strong services growth",
+    "{ticker} shares slip as analysts cut price targets",
+    "Investors weigh {ticker} guidance ahead of the Fed meeting",
+    "{ticker} announces buyback and raises dividend",
+    "{ticker} holds steady amid sector rotation",
+]
+
+
+class _FakeNewsResponse:
+    status_code = 200
+    
+    def __init__(self, payload: dict):
+        self._payload = payload
+    
+    def raise_for_status(self):
+        pass
+    
+    def json(self) -> dict:
+        return self._payload
+
+
+def install_fake_newsapi(latency: float = 0.0):
+    """
+    Answer NewsAPI requests made through requests.get offline.
+    
+    Other URLs still go to the real requests.get. Sets a placeholder API key
+    so NewsService does not short-circuit; a real key is never sent.
+    
+    Args:
+        latency: Seconds each NewsAPI call sleeps
+    """
+    import requests
+    from app.core.config import settings
+    
+    real_get = requests.get
+    
+    def fake_get(url, params=None, **kwargs):
+        if "newsapi.org" not in url:
+            return real_get(url, params=params, **kwargs)
+        time.sleep(latency)
+        params = params or {}
+        query = params.get("q", "markets")
+        count = int(params.get("pageSize", 5))
+        articles = [
+            {
+                "title": HEADLINES[(i + hash(query)) % len(HEADLINES)].format(ticker=query),
+                "description": f"Coverage of {query} from the offline NewsAPI stand-in.",
+                "source": {"name": "Benchmark Wire"},
+                "publishedAt": f"2026-01-05T{9 + i:02d}:00:00Z",
+                "url": f"https://example.com/{query}/{i}",
+            }
+            for i in range(count)
+        ]
+        return _FakeNewsResponse({"status": "ok", "totalResults": count, "articles": articles})
+    
+    requests.get = fake_get
+    settings.newsapi_key = "offline-benchmark"
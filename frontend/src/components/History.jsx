@@ -8,12 +8,15 @@ const History = ({ sessionId, isDarkMode }) => {
   const [selectedSession, setSelectedSession] = useState(null)
   const [searchTerm, setSearchTerm] = useState('')
   const [isLoading, setIsLoading] = useState(true)
+  const [nextCursor, setNextCursor] = useState(null)
+  const [isLoadingMore, setIsLoadingMore] = useState(false)
 
   useEffect(() => {
     const fetchSessions = async () => {
       try {
-        const data = await chatService.getAllSessions()
-        setSessions(data)
+        const page = await chatService.getSessionsPage()
+        setSessions(page.sessions)
+        setNextCursor(page.nextCursor)
       } catch (error) {
         console.error('Failed to fetch sessions:', error)
       } finally {
@@ -24,6 +27,20 @@ const History = ({ sessionId, isDarkMode }) => {
     fetchSessions()
   }, [])
 
+  const handleLoadMore = async () => {
+    if (!nextCursor) return
+    setIsLoadingMore(true)
+    try {
+      const page = await chatService.getSessionsPage({ cursor: nextCursor })
+      setSessions(prev => [...prev, ...page.sessions])
+      setNextCursor(page.nextCursor)
+    } catch (error) {
+      console.error('Failed to fetch more sessions:', error)
+    } finally {
+      setIsLoadingMore(false)
+    }
+  }
+
   const filteredSessions = sessions.filter(session =>
     session.messages.some(msg =>
       msg.user_query.toLowerCase().includes(searchTerm.toLowerCase()) ||
@@ -233,6 +250,18 @@ const History = ({ sessionId, isDarkMode }) => {
               </motion.div>
             ))}
           </AnimatePresence>
+
+          {nextCursor && (
+            <motion.button
+              whileHover={{ scale: 1.02 }}
+              whileTap={{ scale: 0.98 }}
+              onClick={handleLoadMore}
+              disabled={isLoadingMore}
+              className="w-full glass-card p-3 text-sm text-purple-400 hover:text-white transition-colors disabled:opacity-50"
+            >
+              {isLoadingMore ? 'Loading...' : 'Load more sessions'}
+            </motion.button>
+          )}
         </motion.div>
 
         {/* Session Details */}
@@ -63,6 +63,19 @@ export const chatService = {
     }
   },
 
+  // Compare several tickers in one request
+  comparePortfolio: async (query, sessionId) => {
+    try {
+      const response = await api.post('/portfolio/compare', {
+        query: query,
+        session_id: sessionId,
+      })
+      return response.data
+    } catch (error) {
+      throw new Error(error.response?.data?.detail || 'Failed to compare tickers')
+    }
+  },
+
   // Get session history
   getSessionHistory: async (sessionId) => {
     try {
@@ -73,13 +86,40 @@ export const chatService = {
     }
   },
 
-  // Get all sessions
+  // Get one page of sessions (keyset pagination, most recent first)
+  getSessionsPage: async ({ limit = 50, cursor = null, summary = false } = {}) => {
+    try {
+      const params = { limit, summary }
+      if (cursor) params.cursor = cursor
+      const response = await api.get('/chat/sessions/', { params })
+      return {
+        sessions: response.data,
+        nextCursor: response.headers['x-next-cursor'] || null,
+      }
+    } catch (error) {
+      throw new Error(error.response?.data?.detail || 'Failed to get sessions')
+    }
+  },
+
+  // Get all sessions by following page cursors
   getAllSessions: async () => {
+    const sessions = []
+    let cursor = null
+    do {
+      const page = await chatService.getSessionsPage({ limit: 200, cursor })
+      sessions.push(...page.sessions)
+      cursor = page.nextCursor
+    } while (cursor)
+    return sessions
+  },
+
+  // Get dashboard aggregates for the last `days` days
+  getDashboardSummary: async ({ days = 7, limit = 5 } = {}) => {
     try {
-      const response = await api.get('/chat/sessions/')
+      const response = await api.get('/dashboard/summary', { params: { days, limit } })
       return response.data
     } catch (error) {
-      throw new Error(error.response?.data?.detail || 'Failed to get sessions')
+      throw new Error(error.response?.data?.detail || 'Failed to get dashboard summary')
     }
   },
 
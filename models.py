@@ -3,7 +3,9 @@ Simplified models file as specified in company requirements.
 This imports all models from modular structure.
 """
 
-from app.models.chat import ChatSession, ChatMessage
+from app.models.chat import ChatSession, ChatMessage, ArchivedChatMessage
+from app.models.sentiment import SentimentScore, TickerSentimentState
+from app.models.dashboard import TickerDailyRollup
 
 # Export all models for convenience
-__all__ = ['ChatSession', 'ChatMessage']
+__all__ = ['ChatSession', 'ChatMessage', 'ArchivedChatMessage', 'SentimentScore', 'TickerSentimentState', 'TickerDailyRollup']
@@ -40,5 +40,9 @@ echo "   Health Check: http://localhost:8000/health/simple"
 echo "   Press Ctrl+C to stop the server"
 echo ""
 
-# Run with uvicorn
-uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload
+# Run with uvicorn (auto-reload), or pre-forked workers sharing one model copy with --prod
+if [ "$1" = "--prod" ]; then
+    python -m app.server
+else
+    uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload
+fi
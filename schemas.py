@@ -12,10 +12,14 @@ from app.schemas.chat import (
     SentimentResult
 )
 from app.schemas.query import QueryRequest, QueryResponse
+from app.schemas.portfolio import PortfolioRequest, PortfolioResponse, TickerAnalysis
+from app.schemas.dashboard import DashboardSummary, TickerSummary
 
 # Export all schemas for convenience
 __all__ = [
     'ChatRequest', 'ChatResponse', 'ChatSessionResponse', 
     'StockData', 'NewsItem', 'SentimentResult',
-    'QueryRequest', 'QueryResponse'
+    'QueryRequest', 'QueryResponse',
+    'PortfolioRequest', 'PortfolioResponse', 'TickerAnalysis',
+    'DashboardSummary', 'TickerSummary'
 ]
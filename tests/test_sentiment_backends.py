@@ -0,0 +1,141 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from app.schemas.chat import SentimentResult
+from app.services.sentiment_backends import SentimentBackend, TextBlobBackend, TransformerSentimentBackend
+from benchmarks.stubs import tiny_sentiment_model
+
+# Lengths deliberately out of order so length bucketing reorders them
+TEXTS = [
+    "shares of the chipmaker rallied after earnings beat forecasts and guidance was raised for the year",
+    "stock falls",
+    "regulators opened an inquiry into the bank",
+    "record revenue",
+    "the retailer cut its outlook as margins shrank and inventory piled up in warehouses",
+    "analysts upgrade the carmaker",
+    "profit warning",
+]
+
+
+def make_backend(batch_size: int, quantize: bool = False, num_labels: int = 3) -> TransformerSentimentBackend:
+    torch.manual_seed(0)
+    model, tokenizer = tiny_sentiment_model(TEXTS, num_labels=num_labels)
+    return TransformerSentimentBackend(
+        "tiny", batch_size=batch_size, quantize=quantize, model=model, tokenizer=tokenizer
+    )
+
+
+def assert_same_results(actual, expected):
+    assert len(actual) == len(expected)
+    for got, want in zip(actual, expected):
+        assert got.sentiment == want.sentiment
+        assert got.confidence == pytest.approx(want.confidence, abs=2e-3)
+        assert got.polarity == pytest.approx(want.polarity, abs=2e-3)
+
+
+def test_sentiment_backend_is_abstract():
+    with pytest.raises(TypeError):
+        SentimentBackend()
+    
+    class Incomplete(SentimentBackend):
+        name = "incomplete"
+    
+    with pytest.raises(TypeError):
+        Incomplete()
+    
+    assert isinstance(TextBlobBackend(), SentimentBackend)
+
+
+def test_batched_results_follow_input_order():
+    backend = make_backend(batch_size=3)
+    expected = [backend.score_batch([text])[0] for text in TEXTS]
+    
+    assert_same_results(backend.score_batch(TEXTS), expected)
+    assert_same_results(backend.score_batch(TEXTS[::-1]), expected[::-1])
+
+
+def test_batch_size_does_not_change_results():
+    single = make_backend(batch_size=1).score_batch(TEXTS)
+    bucketed = make_backend(batch_size=4).score_batch(TEXTS)
+    whole = make_backend(batch_size=len(TEXTS)).score_batch(TEXTS)
+    
+    assert_same_results(bucketed, single)
+    assert_same_results(whole, single)
+
+
+def test_empty_batch():
+    backend = make_backend(batch_size=2)
+    assert backend.score_batch([]) == []
+    assert not backend.ready
+
+
+def test_unquantized_model_is_used_as_given():
+    backend = make_backend(batch_size=4, quantize=False)
+    model = backend.model
+    results = backend.score_batch(TEXTS)
+    
+    assert backend.model is model
+    assert isinstance(backend.model.classifier, torch.nn.Linear)
+    assert backend.version == "transformer:tiny:fp32:1"
+    assert all(isinstance(result, SentimentResult) for result in results)
+
+
+def test_quantized_model_replaces_linear_layers():
+    backend = make_backend(batch_size=4, quantize=True)
+    results = backend.score_batch(TEXTS)
+    
+    assert backend.ready
+    assert type(backend.model.classifier) is not torch.nn.Linear
+    assert "quantized" in type(backend.model.classifier).__module__
+    assert backend.version == "transformer:tiny:int8:1"
+    assert all(isinstance(result, SentimentResult) for result in results)
+    assert {result.sentiment for result in results} <= {"Positive", "Negative", "Neutral"}
+
+
+def test_results_are_probability_based():
+    backend = make_backend(batch_size=4)
+    for result in backend.score_batch(TEXTS):
+        assert 1 / 3 <= result.confidence <= 1.0
+        assert -1.0 <= result.polarity <= 1.0
+
+
+def test_to_result_maps_probabilities():
+    backend = TransformerSentimentBackend("tiny", model=object(), tokenizer=object())
+    backend.labels = ["Negative", "Neutral", "Positive"]
+    
+    result = backend._to_result([0.1, 0.2, 0.7])
+    assert result == SentimentResult(sentiment="Positive", confidence=0.7, polarity=0.6)
+    
+    result = backend._to_result([0.5, 0.3, 0.2])
+    assert result == SentimentResult(sentiment="Negative", confidence=0.5, polarity=-0.3)
+
+
+def test_resolve_labels():
+    class Config:
+        def __init__(self, id2label, num_labels):
+            self.id2label = id2label
+            self.num_labels = num_labels
+    
+    named = Config({0: "positive", 1: "negative", 2: "neutral"}, 3)
+    assert TransformerSentimentBackend._resolve_labels(named) == ["Positive", "Negative", "Neutral"]
+    
+    generic = Config({0: "LABEL_0", 1: "LABEL_1", 2: "LABEL_2"}, 3)
+    assert TransformerSentimentBackend._resolve_labels(generic) == ["Negative", "Neutral", "Positive"]
+    
+    binary = Config({0: "LABEL_0", 1: "LABEL_1"}, 2)
+    assert TransformerSentimentBackend._resolve_labels(binary) == ["Negative", "Positive"]
+    
+    with pytest.raises(ValueError):
+        TransformerSentimentBackend._resolve_labels(Config({}, 5))
+
+
+def test_two_label_model_has_no_neutral():
+    backend = make_backend(batch_size=4, num_labels=2)
+    results = backend.score_batch(TEXTS)
+    
+    assert backend.labels == ["Negative", "Positive"]
+    assert {result.sentiment for result in results} <= {"Positive", "Negative"}
+    for result in results:
+        assert result.confidence >= 0.5
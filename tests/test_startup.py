@@ -0,0 +1,38 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.bench_startup import HEAVY_MODULES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# `import app.main` measured about 0.87s; the margin absorbs slower CI machines
+STARTUP_BUDGET_SECONDS = 2.0
+
+PROBE = f"""
+import json, sys
+import app.main
+print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))
+"""
+
+
+def test_import_app_main_is_fast_and_lazy(tmp_path):
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'startup.db'}")
+    
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60
+    )
+    elapsed = time.perf_counter() - started
+    
+    assert completed.returncode == 0, completed.stderr
+    heavy = json.loads(completed.stdout.strip().splitlines()[-1])
+    assert heavy == [], f"imported at startup: {', '.join(heavy)}"
+    assert elapsed < STARTUP_BUDGET_SECONDS, f"import app.main took {elapsed:.2f}s"